@@ -1,12 +1,14 @@
 """
 Announcements API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 from app.database import get_db
 from app.models.announcement import Announcement
+from app.services.resource_versions import ANNOUNCEMENTS, bump_version, conditional_response, version_etag
 
 router = APIRouter()
 
@@ -28,57 +30,66 @@ class AnnouncementResponse(BaseModel):
 
 @router.get("/", response_model=List[AnnouncementResponse])
 async def get_announcements(
+    request: Request,
+    response: Response,
     active_only: bool = True,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get all announcements"""
-    query = db.query(Announcement)
+    """Get all announcements (ETag: 304 if unchanged since If-None-Match)"""
+    not_modified = conditional_response(request, response, version_etag(ANNOUNCEMENTS, int(active_only)))
+    if not_modified:
+        return not_modified
+    
+    query = select(Announcement)
     if active_only:
-        query = query.filter(Announcement.is_active == True)
-    announcements = query.order_by(Announcement.display_order).all()
+        query = query.where(Announcement.is_active == True)
+    announcements = (await db.scalars(query.order_by(Announcement.display_order))).all()
     return [AnnouncementResponse.model_validate(a).model_dump() for a in announcements]
 
 @router.post("/", response_model=AnnouncementResponse)
 async def create_announcement(
     announcement: AnnouncementCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new announcement (admin only)"""
     new_announcement = Announcement(**announcement.dict())
     db.add(new_announcement)
-    db.commit()
-    db.refresh(new_announcement)
+    await db.commit()
+    bump_version(ANNOUNCEMENTS)
+    await db.refresh(new_announcement)
     return AnnouncementResponse.model_validate(new_announcement).model_dump()
 
 @router.put("/{announcement_id}", response_model=AnnouncementResponse)
 async def update_announcement(
     announcement_id: int,
     announcement: AnnouncementCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update an announcement (admin only)"""
-    db_announcement = db.query(Announcement).filter(Announcement.id == announcement_id).first()
+    db_announcement = await db.scalar(select(Announcement).where(Announcement.id == announcement_id))
     if not db_announcement:
         raise HTTPException(status_code=404, detail="Announcement not found")
     
     for key, value in announcement.dict().items():
         setattr(db_announcement, key, value)
     
-    db.commit()
-    db.refresh(db_announcement)
+    await db.commit()
+    bump_version(ANNOUNCEMENTS)
+    await db.refresh(db_announcement)
     return AnnouncementResponse.model_validate(db_announcement).model_dump()
 
 @router.delete("/{announcement_id}")
 async def delete_announcement(
     announcement_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete an announcement (admin only)"""
-    announcement = db.query(Announcement).filter(Announcement.id == announcement_id).first()
+    announcement = await db.scalar(select(Announcement).where(Announcement.id == announcement_id))
     if not announcement:
         raise HTTPException(status_code=404, detail="Announcement not found")
     
-    db.delete(announcement)
-    db.commit()
+    await db.delete(announcement)
+    await db.commit()
+    bump_version(ANNOUNCEMENTS)
     return {"message": "Announcement deleted successfully"}
 
@@ -0,0 +1,148 @@
+"""
+Archive API endpoints: search sessions and visits moved out of the hot tables
+(see app.services.archive_service); staff only
+Results are paginated with skip/limit, newest office date first
+"""
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date, datetime
+import asyncio
+
+from app.database import get_db
+from app.models.archive import ArchivedInfoSession, ArchivedTeamVisit
+from app.models.recruiter import Recruiter
+from app.models.user import User
+from app.api.auth import get_current_admin, get_current_user
+from app.api.info_session import InfoSessionResponse, InfoSessionStepModel
+from app.api.visits import VisitResponse
+from app.services.archive_service import ARCHIVE_AFTER_DAYS, VISIT_ARCHIVES, archive_horizon, run_archive
+from app.services.step_catalog import step_items
+
+router = APIRouter()
+
+# Largest page the search returns
+MAX_ARCHIVE_PAGE = 200
+
+class ArchivedInfoSessionResponse(InfoSessionResponse):
+    archived_at: Optional[datetime] = None
+
+class ArchivedInfoSessionWithSteps(ArchivedInfoSessionResponse):
+    steps: List[InfoSessionStepModel]
+
+class ArchivedVisitResponse(VisitResponse):
+    archived_at: Optional[datetime] = None
+
+class ArchivedInfoSessionPage(BaseModel):
+    items: List[ArchivedInfoSessionResponse]
+    skip: int
+    limit: int
+    has_more: bool
+
+class ArchivedVisitPage(BaseModel):
+    items: List[ArchivedVisitResponse]
+    skip: int
+    limit: int
+    has_more: bool
+
+def search_query(model, date_from: Optional[date], date_to: Optional[date], skip: int, limit: int):
+    """Archive rows in an office date range, newest first, one extra row to tell if there is a next page"""
+    query = select(model)
+    if date_from:
+        query = query.where(model.business_date >= date_from)
+    if date_to:
+        query = query.where(model.business_date <= date_to)
+    return query.order_by(model.business_date.desc(), model.id.desc()).offset(skip).limit(limit + 1)
+
+def name_condition(columns, name: str):
+    """Case-insensitive partial match on any of the name columns"""
+    return or_(*[column.ilike(f"%{name}%") for column in columns])
+
+@router.get("/info-sessions", response_model=ArchivedInfoSessionPage)
+async def search_archived_info_sessions(
+    name: Optional[str] = None,
+    email: Optional[str] = None,
+    recruiter_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=MAX_ARCHIVE_PAGE),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Search archived info sessions by visitor name, email, recruiter and office date range"""
+    query = search_query(ArchivedInfoSession, date_from, date_to, skip, limit)
+    if name:
+        query = query.where(name_condition([ArchivedInfoSession.first_name, ArchivedInfoSession.last_name], name))
+    if email:
+        query = query.where(ArchivedInfoSession.email.ilike(email))
+    if recruiter_id is not None:
+        query = query.where(ArchivedInfoSession.assigned_recruiter_id == recruiter_id)
+    sessions = (await db.scalars(query)).all()
+
+    # Recruiter names in one query (archived rows have no relationship)
+    recruiter_ids = {session.assigned_recruiter_id for session in sessions if session.assigned_recruiter_id}
+    names = dict((await db.execute(select(Recruiter.id, Recruiter.name).where(Recruiter.id.in_(recruiter_ids)))).all()) if recruiter_ids else {}
+    items = []
+    for session in sessions[:limit]:
+        item = ArchivedInfoSessionResponse.model_validate(session).model_dump()
+        item["assigned_recruiter_name"] = names.get(session.assigned_recruiter_id)
+        items.append(item)
+    return {"items": items, "skip": skip, "limit": limit, "has_more": len(sessions) > limit}
+
+@router.get("/info-sessions/{session_id}", response_model=ArchivedInfoSessionWithSteps)
+async def get_archived_info_session(
+    session_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """One archived info session with its steps"""
+    session = await db.get(ArchivedInfoSession, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Archived info session not found")
+    data = ArchivedInfoSessionResponse.model_validate(session).model_dump()
+    if session.assigned_recruiter_id:
+        data["assigned_recruiter_name"] = await db.scalar(select(Recruiter.name).where(Recruiter.id == session.assigned_recruiter_id))
+    data["steps"] = step_items(session.steps_version, session.steps_completed)
+    return data
+
+@router.get("/visits/{kind}", response_model=ArchivedVisitPage)
+async def search_archived_visits(
+    kind: str,
+    name: Optional[str] = None,
+    email: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=MAX_ARCHIVE_PAGE),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Search archived visits of one kind (new-hire-orientation, badges, fingerprints, team-visit)"""
+    if kind not in VISIT_ARCHIVES:
+        raise HTTPException(status_code=404, detail=f"Unknown visit kind '{kind}'")
+    model = VISIT_ARCHIVES[kind][1]
+    query = search_query(model, date_from, date_to, skip, limit)
+    if model is ArchivedTeamVisit:
+        name_columns, email_column = [model.visitor_name], model.visitor_email
+    else:
+        name_columns, email_column = [model.first_name, model.last_name], model.email
+    if name:
+        query = query.where(name_condition(name_columns, name))
+    if email:
+        query = query.where(email_column.ilike(email))
+    visits = (await db.scalars(query)).all()
+    return {
+        "items": [ArchivedVisitResponse.model_validate(visit).model_dump() for visit in visits[:limit]],
+        "skip": skip,
+        "limit": limit,
+        "has_more": len(visits) > limit
+    }
+
+@router.post("/run")
+async def run_archive_now(current_admin: User = Depends(get_current_admin)):
+    """Archive everything older than the horizon now (admin only); rows moved per table"""
+    moved = await asyncio.to_thread(run_archive)
+    return {"archive_after_days": ARCHIVE_AFTER_DAYS, "horizon": archive_horizon().isoformat(), "moved": moved}
@@ -3,7 +3,8 @@ Authentication API endpoints
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr, ConfigDict
 from datetime import datetime, timedelta
 from typing import Optional
@@ -11,6 +12,7 @@ from jose import JWTError, jwt
 
 from app.database import get_db
 from app.models.user import User
+from app.models.visit import TeamVisit
 
 router = APIRouter()
 
@@ -75,10 +77,10 @@ def verify_token(token: str) -> TokenData:
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
     """Get current authenticated user"""
     token_data = verify_token(token)
-    user = db.query(User).filter(User.email == token_data.email).first()
+    user = await db.scalar(select(User).where(User.email == token_data.email))
     if user is None:
         raise HTTPException(status_code=401, detail="User not found")
     if not user.is_active:
@@ -92,9 +94,9 @@ def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 @router.post("/login", response_model=LoginResponse)
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_db)):
     """Login endpoint"""
-    user = db.query(User).filter(User.email == login_data.email).first()
+    user = await db.scalar(select(User).where(User.email == login_data.email))
     
     if not user:
         raise HTTPException(
@@ -135,11 +137,11 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
 async def register_user(
     user_data: UserCreate,
     current_admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new user (admin only)"""
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -165,8 +167,8 @@ async def register_user(
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     return UserResponse.model_validate(new_user).model_dump()
 
@@ -178,20 +180,20 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 @router.get("/users", response_model=list[UserResponse])
 async def list_users(
     current_admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """List all users (admin only)"""
-    users = db.query(User).all()
+    users = (await db.scalars(select(User))).all()
     return [UserResponse.model_validate(user).model_dump() for user in users]
 
 @router.delete("/users/{user_id}")
 async def delete_user(
     user_id: int,
     current_admin: User = Depends(get_current_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a user (admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -199,7 +201,9 @@ async def delete_user(
     if user.id == current_admin.id:
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
     
-    db.delete(user)
-    db.commit()
+    # Past team visits keep the staff member's name and email but no longer point at the user
+    await db.execute(update(TeamVisit).where(TeamVisit.team_member_id == user.id).values(team_member_id=None))
+    await db.delete(user)
+    await db.commit()
     return {"message": "User deleted successfully"}
 
@@ -0,0 +1,41 @@
+"""
+Server-Sent Events endpoint
+Dashboards and kiosks keep one connection open and re-fetch data only when
+an event for something they show arrives
+"""
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from app.services.event_broker import TOPICS, event_stream, subscribe
+
+router = APIRouter()
+
+@router.get("/stream")
+async def stream_events(
+    topics: Optional[str] = Query(None, description="Comma separated: sessions, recruiters, visits"),
+    last_event_id: Optional[str] = Header(None)
+):
+    """
+    Event stream (text/event-stream)
+    Events: session.created, session.updated, step.completed, sessions.rematched,
+    sessions.synced, recruiter.status, visit.created, visit.updated, visits.synced,
+    and resync if the client missed events and has to reload. Payloads only carry
+    ids and statuses; clients fetch the details they need.
+    The stream ends every few seconds; EventSource reconnects with Last-Event-ID
+    and gets the events it missed replayed.
+    """
+    selected = None
+    if topics:
+        selected = {topic.strip() for topic in topics.split(",") if topic.strip()}
+        unknown = selected - set(TOPICS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown topics: {', '.join(sorted(unknown))}")
+
+    replay_from = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    subscriber = subscribe(selected, last_event_id=replay_from)
+    return StreamingResponse(
+        event_stream(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
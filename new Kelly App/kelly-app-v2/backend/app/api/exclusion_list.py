@@ -3,18 +3,30 @@ Exclusion List API endpoints
 For managing the exclusion list (PC/RR list)
 """
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 from datetime import datetime
-import pandas as pd
-import io
-from dateutil import parser
+import asyncio
+import os
 
 from app.database import get_db
-from app.models.exclusion_list import ExclusionList
+from app.models.exclusion_list import ExclusionList, ExclusionListVersion
 from app.models.user import User
 from app.api.auth import get_current_admin
+from app.services.exclusion_index import rebuild_exclusion_index
+from app.services.exclusion_jobs import get_upload_job, run_list_change, start_upload_job
+from app.services.exclusion_service import OPEN_SESSION_STATUSES, rematch_info_sessions
+from app.services.exclusion_reader import SUPPORTED_EXTENSIONS, MissingColumnsError, check_exclusion_header, spool_upload
+from app.services.exclusion_versions import (
+    active_rows_filter,
+    activate_version,
+    create_staging_version,
+    rollback_to_previous,
+)
 
 router = APIRouter()
 
@@ -33,116 +45,86 @@ class ExclusionListResponse(BaseModel):
     items: List[ExclusionListItem]
     total: int
 
-@router.post("/upload", status_code=status.HTTP_200_OK)
+class ExclusionListVersionItem(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: int
+    source_filename: Optional[str] = None
+    status: str
+    row_count: Optional[int] = 0
+    created_at: Optional[datetime] = None
+    activated_at: Optional[datetime] = None
+
+@router.post("/upload", status_code=status.HTTP_202_ACCEPTED)
 async def upload_exclusion_list(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    rematch_open_sessions: bool = False,
     current_admin: User = Depends(get_current_admin)
 ):
     """
-    Upload Excel file with exclusion list
+    Upload Excel or CSV file with exclusion list
     Expected columns: name, Code, DOB, SSN
+    The file is spooled to disk and loaded by a background job (off the event loop);
+    poll GET /jobs/{job_id} for progress
+    With rematch_open_sessions, open info sessions are re-checked against the new list
+    The job loads rows under a new version while the current list stays active,
+    then swaps the new version in at once (the old one is kept for rollback)
     """
-    if not file.filename.endswith(('.xlsx', '.xls')):
+    if not file.filename.lower().endswith(SUPPORTED_EXTENSIONS):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File must be an Excel file (.xlsx or .xls)"
+            detail="File must be an Excel file (.xlsx or .xls) or a CSV file (.csv)"
         )
     
+    path = await spool_upload(file)
     try:
-        # Read Excel file
-        contents = await file.read()
-        df = pd.read_excel(io.BytesIO(contents))
-        
-        # Normalize column names (case-insensitive)
-        df.columns = df.columns.str.strip().str.lower()
-        
-        # Check required columns
-        required_columns = ['name']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Missing required columns: {', '.join(missing_columns)}"
-            )
-        
-        # Clear existing exclusion list
-        db.query(ExclusionList).delete()
-        db.commit()
-        
-        # Process and insert rows
-        added_count = 0
-        errors = []
-        
-        for index, row in df.iterrows():
-            try:
-                # Get name (required)
-                name = str(row.get('name', '')).strip()
-                if not name or name == 'nan':
-                    continue
-                
-                # Convert name to uppercase for storage (as specified)
-                name_upper = name.upper()
-                
-                # Get optional fields
-                code = str(row.get('code', '')).strip() if pd.notna(row.get('code')) else None
-                code = code if code and code != 'nan' else None
-                
-                ssn = str(row.get('ssn', '')).strip() if pd.notna(row.get('ssn')) else None
-                ssn = ssn if ssn and ssn != 'nan' else None
-                
-                # Parse DOB
-                dob = None
-                if pd.notna(row.get('dob')):
-                    try:
-                        dob_value = row.get('dob')
-                        if isinstance(dob_value, str):
-                            dob = parser.parse(dob_value).date()
-                        elif hasattr(dob_value, 'date'):
-                            dob = dob_value.date()
-                        else:
-                            dob = pd.to_datetime(dob_value).date()
-                    except:
-                        pass
-                
-                # Create exclusion list item
-                exclusion_item = ExclusionList(
-                    name=name_upper,
-                    code=code,
-                    dob=dob,
-                    ssn=ssn
-                )
-                db.add(exclusion_item)
-                added_count += 1
-                
-            except Exception as e:
-                errors.append(f"Row {index + 2}: {str(e)}")
-        
-        db.commit()
-        
-        return {
-            "message": f"Exclusion list uploaded successfully",
-            "added": added_count,
-            "errors": errors if errors else None
-        }
-        
+        # Validate the header before queuing (reads only the first row)
+        await run_in_threadpool(check_exclusion_header, path)
+    except MissingColumnsError as e:
+        os.remove(path)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
-        db.rollback()
+        os.remove(path)
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error processing file: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error reading file: {str(e)}"
         )
+    
+    job = start_upload_job(path, file.filename, rematch_open_sessions=rematch_open_sessions)
+    
+    return {
+        "message": "Exclusion list upload started",
+        "job_id": job.id,
+        "status": job.status
+    }
+
+@router.get("/jobs/{job_id}")
+async def get_upload_job_status(
+    job_id: str,
+    current_admin: User = Depends(get_current_admin)
+):
+    """Progress of an exclusion list upload job: rows processed, errors and ETA (admin only)"""
+    job = get_upload_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    return job.to_dict()
 
 @router.get("/list", response_model=ExclusionListResponse)
 async def list_exclusion_items(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin)
 ):
-    """List all exclusion list items (admin only)"""
-    items = db.query(ExclusionList).offset(skip).limit(limit).all()
-    total = db.query(ExclusionList).count()
+    """List all exclusion list items of the active version (admin only)"""
+    active_filter = await db.run_sync(active_rows_filter)
+    items = (await db.scalars(
+        select(ExclusionList).where(active_filter).order_by(ExclusionList.id).offset(skip).limit(limit)
+    )).all()
+    total = await db.scalar(select(func.count()).select_from(ExclusionList).where(active_filter))
     
     return {
         "items": items,
@@ -151,14 +133,60 @@ async def list_exclusion_items(
 
 @router.delete("/clear")
 async def clear_exclusion_list(
-    db: Session = Depends(get_db),
+    rematch_open_sessions: bool = False,
     current_admin: User = Depends(get_current_admin)
 ):
-    """Clear all exclusion list items (admin only)"""
-    count = db.query(ExclusionList).delete()
-    db.commit()
+    """
+    Clear all exclusion list items (admin only)
+    Activates an empty version, so the cleared list can still be restored with /rollback
+    """
+    def clear(sync_db: Session):
+        count = sync_db.query(ExclusionList).filter(active_rows_filter(sync_db)).count()
+        version = create_staging_version(sync_db, None)
+        activate_version(sync_db, version, row_count=0)
+        rebuild_exclusion_index(sync_db)
+        rematched = rematch_info_sessions(sync_db, statuses=OPEN_SESSION_STATUSES) if rematch_open_sessions else 0
+        return count, rematched
+    
+    # On the upload worker: rebuilding the index and re-matching take seconds on a large list
+    count, rematched = await asyncio.wrap_future(run_list_change(clear))
     
     return {
-        "message": f"Exclusion list cleared. {count} items removed."
+        "message": f"Exclusion list cleared. {count} items removed.",
+        "rematched": rematched
     }
 
+@router.get("/versions", response_model=List[ExclusionListVersionItem])
+async def list_exclusion_versions(
+    db: AsyncSession = Depends(get_db),
+    current_admin: User = Depends(get_current_admin)
+):
+    """List exclusion list uploads, newest first (admin only)"""
+    versions = (await db.scalars(select(ExclusionListVersion).order_by(ExclusionListVersion.id.desc()).limit(50))).all()
+    return [ExclusionListVersionItem.model_validate(v).model_dump() for v in versions]
+
+@router.post("/rollback")
+async def rollback_exclusion_list(
+    rematch_open_sessions: bool = False,
+    current_admin: User = Depends(get_current_admin)
+):
+    """Restore the previous exclusion list version (admin only)"""
+    def rollback(sync_db: Session):
+        version = rollback_to_previous(sync_db)
+        if not version:
+            return None, 0, 0
+        # Read before the worker's session closes
+        version_id, row_count = version.id, version.row_count or 0
+        rebuild_exclusion_index(sync_db)
+        rematched = rematch_info_sessions(sync_db, statuses=OPEN_SESSION_STATUSES) if rematch_open_sessions else 0
+        return version_id, row_count, rematched
+    
+    version_id, row_count, rematched = await asyncio.wrap_future(run_list_change(rollback))
+    if not version_id:
+        raise HTTPException(status_code=404, detail="No previous exclusion list version to restore")
+    
+    return {
+        "message": f"Exclusion list restored to version {version_id}. {row_count} items active.",
+        "version_id": version_id,
+        "rematched": rematched
+    }
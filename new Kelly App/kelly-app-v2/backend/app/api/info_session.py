@@ -1,24 +1,38 @@
 """
 Info Session API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, Header, HTTPException, status, UploadFile, File, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from pydantic import BaseModel, EmailStr, ConfigDict
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
+import csv
+import io
 
 from app.database import get_db
-from app.models.info_session import InfoSession, InfoSessionStep
-from app.models.recruiter import Recruiter
-from app.services.exclusion_service import check_name_in_exclusion_list, is_in_exclusion_list
-from app.models.exclusion_list import ExclusionList
-from app.services.recruiter_service import get_next_recruiter, initialize_default_recruiters
-from datetime import date
-from typing import Optional
+from app.models.info_session import InfoSession, next_change_seq
+from app.services.exclusion_index import get_exclusion_index
+from app.services.exclusion_service import check_name_in_exclusion_list, check_name_fuzzy, match_names
+from app.services.name_matching import EXCLUSION_FUZZY_MATCHING, EXCLUSION_FUZZY_THRESHOLD
+from app.services.recruiter_service import get_next_recruiter, release_recruiter
+from app.services.registration_service import register_session
+from app.services.idempotency import IdempotencyKeyInProgress, IdempotencyKeyReused, MAX_IDEMPOTENCY_KEY_LENGTH, claim_idempotency_key
+from app.services.event_broker import publish_event
+from app.services.lobby_queue import ensure_lobby_queue, lobby_queue_current, queue_status, track_session
+from app.services.resource_versions import conditional_response, make_etag
+from app.services.business_day import business_today
+from app.services.step_catalog import all_steps_mask, step_bits, step_items
 
 router = APIRouter()
 
+# Maximum names per batch exclusion check
+MAX_BATCH_EXCLUSION_CHECK = 1000
+# Larger batches are checked for exact matches only (fuzzy matching takes tens of ms per name)
+MAX_BATCH_FUZZY_CHECK = 100
+
 # Pydantic models for request/response
 class InfoSessionRegistration(BaseModel):
     first_name: str
@@ -63,6 +77,14 @@ class InfoSessionResponse(BaseModel):
     completed_at: Optional[datetime] = None
     duration_minutes: Optional[int] = None
     created_at: datetime
+    business_date: Optional[date] = None  # Office date (Miami time) the session belongs to
+
+class ExclusionCheckName(BaseModel):
+    first_name: str
+    last_name: str
+
+class ExclusionCheckBatchRequest(BaseModel):
+    names: List[ExclusionCheckName]
 
 class InfoSessionStepModel(BaseModel):
     step_name: str
@@ -72,347 +94,273 @@ class InfoSessionStepModel(BaseModel):
 class InfoSessionWithSteps(InfoSessionResponse):
     steps: List[InfoSessionStepModel]
 
-def get_exclusion_match_info(db: Session, first_name: str, last_name: str) -> Optional[ExclusionMatchInfo]:
-    """Get exclusion match info for a name"""
-    exclusion_matches = check_name_in_exclusion_list(db, first_name, last_name)
-    if exclusion_matches:
-        first_match = exclusion_matches[0]
-        return ExclusionMatchInfo(
-            name=first_match.name,
-            code=first_match.code,
-            ssn=first_match.ssn
-        )
-    return None
-
-# Default steps for Info Session
-DEFAULT_STEPS = [
-    {
-        "step_name": "english_communication",
-        "step_description": "For our process you must be able to communicate in English"
-    },
-    {
-        "step_name": "education_proof",
-        "step_description": "Have your Education Proof. If your Education Proof is not from the U.S., you must have the equivalence. If you don't have it, our representatives will inform you how to do it"
-    },
-    {
-        "step_name": "two_government_ids",
-        "step_description": "Two Forms of Government ID such as: Driver's License, Social Security Card, U.S. Passport, Birth Certificate, Permanent Resident Card, Work Permit Card. Documents must be physical originals, not copies, and must not be expired"
-    }
-]
+class QueuePositionResponse(BaseModel):
+    session_id: int
+    status: str
+    recruiter_id: Optional[int] = None
+    time_slot: str
+    position: Optional[int] = None  # 1 = next for the recruiter, 0 = already with the recruiter
+    waiting_ahead: int = 0  # Visitors the recruiter sees first (earlier time slots included)
+    average_service_minutes: Optional[float] = None
+    estimated_wait_minutes: Optional[int] = None
+    estimated_start: Optional[datetime] = None  # UTC
 
 @router.post("/register", response_model=InfoSessionWithSteps, status_code=status.HTTP_201_CREATED)
 async def register_info_session(
     registration: InfoSessionRegistration,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=MAX_IDEMPOTENCY_KEY_LENGTH)
 ):
     """
     Register a new info session
-    Checks exclusion list, assigns recruiter, and creates default steps
+    Checks exclusion list, assigns recruiter, and starts the visitor on the current step catalog
+    (one transaction, see app.services.registration_service)
+    A retry with the same Idempotency-Key gets the first response back (Idempotent-Replayed: true)
+    instead of a second session
     """
-    # Initialize default recruiters if needed
-    initialize_default_recruiters(db)
-    
-    # Check exclusion list
-    exclusion_matches = check_name_in_exclusion_list(
-        db, 
-        registration.first_name, 
-        registration.last_name
-    )
-    is_excluded = len(exclusion_matches) > 0
-    
-    # Get exclusion match info (use first match if any)
-    exclusion_match_info = None
-    if exclusion_matches:
-        first_match = exclusion_matches[0]
-        exclusion_match_info = ExclusionMatchInfo(
-            name=first_match.name,
-            code=first_match.code,
-            ssn=first_match.ssn
-        )
-    
-    # Assign recruiter equitably
-    assigned_recruiter = get_next_recruiter(db, registration.time_slot, date.today())
-    
-    # Create info session record
-    info_session = InfoSession(
-        first_name=registration.first_name,
-        last_name=registration.last_name,
-        email=registration.email,
-        phone=registration.phone,
-        zip_code=registration.zip_code,
-        session_type=registration.session_type,
-        time_slot=registration.time_slot,
-        is_in_exclusion_list=is_excluded,
-        exclusion_warning_shown=is_excluded,
-        status="registered",
-        assigned_recruiter_id=assigned_recruiter.id if assigned_recruiter else None
-    )
-    
-    db.add(info_session)
-    db.commit()
-    db.refresh(info_session)
-    
-    # Create default steps
-    for step_data in DEFAULT_STEPS:
-        step = InfoSessionStep(
-            info_session_id=info_session.id,
-            step_name=step_data["step_name"],
-            step_description=step_data["step_description"],
-            is_completed=False
-        )
-        db.add(step)
-    
-    db.commit()
-    db.refresh(info_session)
-    
-    # Return with steps
-    # Get recruiter name if assigned
-    recruiter_name = None
-    if assigned_recruiter:
-        recruiter_name = assigned_recruiter.name
-    
-    # Get steps
-    steps_data = [
-        {
-            "step_name": step.step_name,
-            "step_description": step.step_description,
-            "is_completed": step.is_completed
-        }
-        for step in info_session.steps
-    ]
+    try:
+        claim = await claim_idempotency_key("register", idempotency_key, registration.model_dump())
+    except IdempotencyKeyReused:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different registration")
+    except IdempotencyKeyInProgress:
+        raise HTTPException(status_code=409, detail="A registration with this Idempotency-Key is still in progress, retry later")
+    if claim.replay:
+        status_code, body = claim.replay
+        return Response(content=body, status_code=status_code, media_type="application/json", headers={"Idempotent-Replayed": "true"})
     
-    response_data = InfoSessionResponse.model_validate(info_session).model_dump()
-    response_data["assigned_recruiter_name"] = recruiter_name
-    response_data["exclusion_match"] = exclusion_match_info.model_dump() if exclusion_match_info else None
-    response_data["steps"] = steps_data
+    try:
+        info_session, assigned_recruiter = await db.run_sync(register_session, registration.model_dump())
+        response_data = InfoSessionResponse.model_validate(info_session).model_dump()
+        response_data["assigned_recruiter_name"] = assigned_recruiter.name if assigned_recruiter else None
+        response_data["steps"] = step_items(info_session.steps_version, info_session.steps_completed)
+        claim.complete(status.HTTP_201_CREATED, response_data)
+    finally:
+        # Failed or cancelled before complete(): a retry runs the registration again
+        claim.release()
+    
+    publish_event("sessions", "session.created", {"session_id": info_session.id, "status": info_session.status})
+    await db.run_sync(track_session, info_session)
     return response_data
 
+# Statuses shown on the live board
+LIVE_STATUSES = ["registered", "in-progress"]
+
+def session_board_item(session: InfoSession) -> dict:
+    """Dashboard representation of a session (recruiter must be loaded)"""
+    recruiter_name = session.assigned_recruiter.name if session.assigned_recruiter else None
+    
+    # Stored at registration (or by a list reload re-match)
+    exclusion_match = session.exclusion_match if session.is_in_exclusion_list else None
+    
+    return {
+        "id": session.id,
+        "first_name": session.first_name,
+        "last_name": session.last_name,
+        "email": session.email,
+        "phone": session.phone,
+        "zip_code": session.zip_code if session.zip_code else "",
+        "session_type": session.session_type,
+        "time_slot": session.time_slot,
+        "is_in_exclusion_list": bool(session.is_in_exclusion_list),
+        "exclusion_warning_shown": bool(session.exclusion_warning_shown),
+        "status": session.status,
+        "ob365_sent": bool(session.ob365_sent) if hasattr(session, 'ob365_sent') and session.ob365_sent is not None else False,
+        "i9_sent": bool(session.i9_sent) if hasattr(session, 'i9_sent') and session.i9_sent is not None else False,
+        "existing_i9": bool(session.existing_i9) if hasattr(session, 'existing_i9') and session.existing_i9 is not None else False,
+        "ineligible": bool(session.ineligible) if hasattr(session, 'ineligible') and session.ineligible is not None else False,
+        "rejected": bool(session.rejected) if hasattr(session, 'rejected') and session.rejected is not None else False,
+        "drug_screen": bool(session.drug_screen) if hasattr(session, 'drug_screen') and session.drug_screen is not None else False,
+        "questions": bool(session.questions) if hasattr(session, 'questions') and session.questions is not None else False,
+        "assigned_recruiter_id": session.assigned_recruiter_id,
+        "assigned_recruiter_name": recruiter_name,
+        "started_at": session.started_at.isoformat() if session.started_at else None,
+        "completed_at": session.completed_at.isoformat() if session.completed_at else None,
+        "duration_minutes": session.duration_minutes,
+        "created_at": session.created_at.isoformat(),
+        "business_date": session.business_date.isoformat() if session.business_date else None,
+        "exclusion_match": exclusion_match,
+        "steps": step_items(session.steps_version, session.steps_completed)
+    }
+
+def board_query():
+    """Info sessions with their recruiter loaded in the same query"""
+    return select(InfoSession).options(joinedload(InfoSession.assigned_recruiter))
+
+async def load_board_session(db: AsyncSession, session_id: int) -> Optional[InfoSession]:
+    """One session with freshly loaded progress and recruiter"""
+    result = await db.scalars(
+        board_query().where(InfoSession.id == session_id).execution_options(populate_existing=True)
+    )
+    return result.unique().first()
+
 @router.get("/live")
-async def get_live_info_sessions(db: Session = Depends(get_db)):
-    """Get live info sessions (registered but not completed)"""
-    sessions = db.query(InfoSession).options(joinedload(InfoSession.steps)).filter(
-        InfoSession.status.in_(["registered", "in-progress"])
-    ).order_by(InfoSession.created_at.desc()).all()
-    
-    result = []
-    for session in sessions:
-        recruiter_name = None
-        if session.assigned_recruiter_id:
-            recruiter = db.query(Recruiter).filter(Recruiter.id == session.assigned_recruiter_id).first()
-            if recruiter:
-                recruiter_name = recruiter.name
-        
-        exclusion_match = None
-        if session.is_in_exclusion_list:
-            try:
-                matches = check_name_in_exclusion_list(db, session.first_name, session.last_name)
-                if matches and len(matches) > 0:
-                    first_match = matches[0]
-                    exclusion_match = {
-                        "name": first_match.name if first_match.name else None,
-                        "code": first_match.code if first_match.code else None,
-                        "ssn": first_match.ssn if first_match.ssn else None
-                    }
-            except Exception as e:
-                print(f"Error getting exclusion match: {e}")
-                exclusion_match = None
-        
-        steps = []
-        for step in session.steps:
-            steps.append({
-                "step_name": step.step_name,
-                "step_description": step.step_description if step.step_description else "",
-                "is_completed": step.is_completed
-            })
-        
-        item = {
-            "id": session.id,
-            "first_name": session.first_name,
-            "last_name": session.last_name,
-            "email": session.email,
-            "phone": session.phone,
-            "zip_code": session.zip_code if session.zip_code else "",
-            "session_type": session.session_type,
-            "time_slot": session.time_slot,
-            "is_in_exclusion_list": bool(session.is_in_exclusion_list),
-            "exclusion_warning_shown": bool(session.exclusion_warning_shown),
-            "status": session.status,
-            "ob365_sent": bool(session.ob365_sent) if hasattr(session, 'ob365_sent') and session.ob365_sent is not None else False,
-            "i9_sent": bool(session.i9_sent) if hasattr(session, 'i9_sent') and session.i9_sent is not None else False,
-            "existing_i9": bool(session.existing_i9) if hasattr(session, 'existing_i9') and session.existing_i9 is not None else False,
-            "ineligible": bool(session.ineligible) if hasattr(session, 'ineligible') and session.ineligible is not None else False,
-            "rejected": bool(session.rejected) if hasattr(session, 'rejected') and session.rejected is not None else False,
-            "drug_screen": bool(session.drug_screen) if hasattr(session, 'drug_screen') and session.drug_screen is not None else False,
-            "questions": bool(session.questions) if hasattr(session, 'questions') and session.questions is not None else False,
-            "assigned_recruiter_id": session.assigned_recruiter_id,
-            "assigned_recruiter_name": recruiter_name,
-            "started_at": session.started_at.isoformat() if session.started_at else None,
-            "completed_at": session.completed_at.isoformat() if session.completed_at else None,
-            "duration_minutes": session.duration_minutes,
-            "created_at": session.created_at.isoformat(),
-            "exclusion_match": exclusion_match,
-            "steps": steps
-        }
-        result.append(item)
-    
-    return result
+async def get_live_info_sessions(
+    request: Request,
+    response: Response,
+    since: Optional[int] = Query(None, ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get live info sessions (registered but not completed)
+    With since=<cursor> only the changes after that cursor are returned:
+    {"cursor", "full", "sessions": live sessions created or changed, "removed": ids that left the board}
+    since=0 (or a cursor the server does not know) returns the whole board with full=true
+    The ETag is the latest change_seq: If-None-Match gets a 304 after one indexed lookup
+    """
+    # Read the cursor first: anything committed after this is sent again next time
+    cursor = await db.scalar(select(func.max(InfoSession.change_seq))) or 0
+    not_modified = conditional_response(request, response, make_etag("sessions", cursor, "all" if since is None else since))
+    if not_modified:
+        return not_modified
+    
+    if since is None:
+        sessions = (await db.scalars(board_query().where(
+            InfoSession.status.in_(LIVE_STATUSES)
+        ).order_by(InfoSession.created_at.desc()))).unique().all()
+        return [session_board_item(session) for session in sessions]
+    
+    if 0 < since == cursor:
+        # Nothing changed (one indexed lookup)
+        return {"cursor": cursor, "full": False, "sessions": [], "removed": []}
+    
+    if since == 0 or since > cursor:
+        sessions = (await db.scalars(board_query().where(
+            InfoSession.status.in_(LIVE_STATUSES)
+        ).order_by(InfoSession.created_at.desc()))).unique().all()
+        return {"cursor": cursor, "full": True, "sessions": [session_board_item(session) for session in sessions], "removed": []}
+    
+    changed = (await db.scalars(
+        board_query().where(InfoSession.change_seq > since).order_by(InfoSession.created_at.desc())
+    )).unique().all()
+    return {
+        "cursor": max([cursor] + [session.change_seq or 0 for session in changed]),
+        "full": False,
+        "sessions": [session_board_item(session) for session in changed if session.status in LIVE_STATUSES],
+        "removed": [session.id for session in changed if session.status not in LIVE_STATUSES]
+    }
 
 @router.get("/completed")
-async def get_completed_info_sessions(db: Session = Depends(get_db)):
+async def get_completed_info_sessions(db: AsyncSession = Depends(get_db)):
     """Get completed info sessions"""
-    sessions = db.query(InfoSession).options(joinedload(InfoSession.steps)).filter(
+    sessions = (await db.scalars(board_query().where(
         InfoSession.status == "completed"
-    ).order_by(InfoSession.completed_at.desc()).all()
-    
-    result = []
-    for session in sessions:
-        recruiter_name = None
-        if session.assigned_recruiter_id:
-            recruiter = db.query(Recruiter).filter(Recruiter.id == session.assigned_recruiter_id).first()
-            if recruiter:
-                recruiter_name = recruiter.name
-        
-        exclusion_match = None
-        if session.is_in_exclusion_list:
-            try:
-                matches = check_name_in_exclusion_list(db, session.first_name, session.last_name)
-                if matches and len(matches) > 0:
-                    first_match = matches[0]
-                    exclusion_match = {
-                        "name": first_match.name if first_match.name else None,
-                        "code": first_match.code if first_match.code else None,
-                        "ssn": first_match.ssn if first_match.ssn else None
-                    }
-            except Exception as e:
-                print(f"Error getting exclusion match: {e}")
-                exclusion_match = None
-        
-        steps = []
-        for step in session.steps:
-            steps.append({
-                "step_name": step.step_name,
-                "step_description": step.step_description if step.step_description else "",
-                "is_completed": step.is_completed
-            })
-        
-        item = {
-            "id": session.id,
-            "first_name": session.first_name,
-            "last_name": session.last_name,
-            "email": session.email,
-            "phone": session.phone,
-            "zip_code": session.zip_code if session.zip_code else "",
-            "session_type": session.session_type,
-            "time_slot": session.time_slot,
-            "is_in_exclusion_list": bool(session.is_in_exclusion_list),
-            "exclusion_warning_shown": bool(session.exclusion_warning_shown),
-            "status": session.status,
-            "ob365_sent": bool(session.ob365_sent) if hasattr(session, 'ob365_sent') and session.ob365_sent is not None else False,
-            "i9_sent": bool(session.i9_sent) if hasattr(session, 'i9_sent') and session.i9_sent is not None else False,
-            "existing_i9": bool(session.existing_i9) if hasattr(session, 'existing_i9') and session.existing_i9 is not None else False,
-            "ineligible": bool(session.ineligible) if hasattr(session, 'ineligible') and session.ineligible is not None else False,
-            "rejected": bool(session.rejected) if hasattr(session, 'rejected') and session.rejected is not None else False,
-            "drug_screen": bool(session.drug_screen) if hasattr(session, 'drug_screen') and session.drug_screen is not None else False,
-            "questions": bool(session.questions) if hasattr(session, 'questions') and session.questions is not None else False,
-            "assigned_recruiter_id": session.assigned_recruiter_id,
-            "assigned_recruiter_name": recruiter_name,
-            "started_at": session.started_at.isoformat() if session.started_at else None,
-            "completed_at": session.completed_at.isoformat() if session.completed_at else None,
-            "duration_minutes": session.duration_minutes,
-            "created_at": session.created_at.isoformat(),
-            "exclusion_match": exclusion_match,
-            "steps": steps
-        }
-        result.append(item)
+    ).order_by(InfoSession.completed_at.desc()))).unique().all()
     
-    return result
+    return [session_board_item(session) for session in sessions]
 
 @router.get("/{session_id}", response_model=InfoSessionWithSteps)
 async def get_info_session(
     session_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
 ):
-    """Get info session by ID"""
-    info_session = db.query(InfoSession).filter(InfoSession.id == session_id).first()
+    """Get info session by ID (ETag: 304 if unchanged since If-None-Match)"""
+    # change_seq moves on every change to the session or its steps
+    version = (await db.execute(select(InfoSession.change_seq).where(InfoSession.id == session_id))).first()
+    if not version:
+        raise HTTPException(status_code=404, detail="Info session not found")
+    not_modified = conditional_response(request, response, make_etag("session", session_id, version.change_seq))
+    if not_modified:
+        return not_modified
+    
+    info_session = (await db.scalars(board_query().where(InfoSession.id == session_id))).unique().first()
     if not info_session:
         raise HTTPException(status_code=404, detail="Info session not found")
     
     # Get recruiter name if assigned
-    recruiter_name = None
-    if info_session.assigned_recruiter_id:
-        recruiter = db.query(Recruiter).filter(Recruiter.id == info_session.assigned_recruiter_id).first()
-        if recruiter:
-            recruiter_name = recruiter.name
-    
-    # Get steps
-    steps_data = [
-        {
-            "step_name": step.step_name,
-            "step_description": step.step_description,
-            "is_completed": step.is_completed
-        }
-        for step in info_session.steps
-    ]
-    
-    # Get exclusion match info if in exclusion list
-    exclusion_match_info = None
-    if info_session.is_in_exclusion_list:
-        exclusion_match_info = get_exclusion_match_info(
-            db, info_session.first_name, info_session.last_name
-        )
+    recruiter_name = info_session.assigned_recruiter.name if info_session.assigned_recruiter else None
     
     response_data = InfoSessionResponse.model_validate(info_session).model_dump()
     response_data["assigned_recruiter_name"] = recruiter_name
-    response_data["exclusion_match"] = exclusion_match_info.model_dump() if exclusion_match_info else None
-    response_data["steps"] = steps_data
+    response_data["exclusion_match"] = info_session.exclusion_match if info_session.is_in_exclusion_list else None
+    response_data["steps"] = step_items(info_session.steps_version, info_session.steps_completed)
     return response_data
 
+@router.get("/{session_id}/queue", response_model=QueuePositionResponse)
+async def get_queue_position(
+    session_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Place of a session in its recruiter's lobby queue (for its time slot) and estimated start
+    Answered from the in-memory queue model; the database is only read to load it once a day
+    """
+    if not lobby_queue_current():
+        await db.run_sync(ensure_lobby_queue)
+    position = queue_status(session_id)
+    if position is None:
+        if not lobby_queue_current():
+            # Another request is loading today's queue
+            raise HTTPException(status_code=503, detail="Lobby queue is loading, try again")
+        raise HTTPException(status_code=404, detail="Info session is not waiting or in progress today")
+    return position
+
 @router.patch("/{session_id}/steps/{step_name}/complete")
 async def complete_step(
     session_id: int,
     step_name: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Mark a step as completed"""
-    step = db.query(InfoSessionStep).filter(
-        InfoSessionStep.info_session_id == session_id,
-        InfoSessionStep.step_name == step_name
-    ).first()
-    
-    if not step:
+    """
+    Mark a step as completed: one UPDATE sets the step's bit in the session's progress
+    (the bit comes from the session's own catalog version), so concurrent steps never
+    overwrite each other
+    """
+    bits = step_bits(step_name)
+    if not bits:
+        raise HTTPException(status_code=404, detail="Step not found")
+    progress = (await db.execute(
+        update(InfoSession)
+        .where(InfoSession.id == session_id, InfoSession.steps_version.in_(bits))
+        .values(
+            steps_completed=InfoSession.steps_completed.bitwise_or(case(bits, value=InfoSession.steps_version)),
+            change_seq=next_change_seq()
+        )
+        .returning(InfoSession.steps_version, InfoSession.steps_completed, InfoSession.assigned_recruiter_id, InfoSession.status)
+        .execution_options(synchronize_session=False)
+    )).first()
+    if not progress:
         raise HTTPException(status_code=404, detail="Step not found")
-    
-    step.is_completed = True
-    step.completed_at = datetime.utcnow()
     
     # Check if all steps are completed, then assign recruiter if not assigned
-    info_session = db.query(InfoSession).filter(InfoSession.id == session_id).first()
-    if info_session:
-        all_steps_completed = all(s.is_completed for s in info_session.steps)
-        if all_steps_completed and not info_session.assigned_recruiter_id:
-            # Mark as completed and assign recruiter
-            info_session.status = "completed"
-            info_session.completed_at = datetime.utcnow()
-            
-            # Assign recruiter when all steps are completed
-            from app.services.recruiter_service import get_next_recruiter, initialize_default_recruiters
-            from datetime import date
-            initialize_default_recruiters(db)
-            recruiter = get_next_recruiter(db, info_session.time_slot, date.today())
-            if recruiter:
-                info_session.assigned_recruiter_id = recruiter.id
+    session_status = progress.status
+    recruiter = None
+    assignment_date = None
+    info_session = None
+    if progress.steps_completed == all_steps_mask(progress.steps_version) and not progress.assigned_recruiter_id:
+        info_session = await db.get(InfoSession, session_id)
+        # Mark as completed and assign recruiter
+        info_session.status = "completed"
+        info_session.completed_at = datetime.utcnow()
+        
+        # Assign recruiter when all steps are completed
+        # Counted on the day the session was registered, like the ledger loads it
+        assignment_date = info_session.business_date or business_today()
+        recruiter = await db.run_sync(get_next_recruiter, info_session.time_slot, assignment_date)
+        if recruiter:
+            info_session.assigned_recruiter_id = recruiter.id
+        session_status = info_session.status
     
-    db.commit()
+    try:
+        await db.commit()
+    except Exception:
+        if recruiter:
+            release_recruiter(recruiter.id, info_session.time_slot, assignment_date)
+        raise
+    publish_event("sessions", "step.completed", {"session_id": session_id, "step_name": step_name, "status": session_status})
+    if info_session:
+        await db.run_sync(track_session, info_session)
     
     return {"message": "Step completed successfully", "step": step_name}
 
 @router.post("/{session_id}/complete")
 async def complete_info_session(
     session_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Mark info session as completed and assign recruiter"""
-    info_session = db.query(InfoSession).filter(InfoSession.id == session_id).first()
+    info_session = await db.get(InfoSession, session_id)
     if not info_session:
         raise HTTPException(status_code=404, detail="Info session not found")
     
@@ -429,14 +377,22 @@ async def complete_info_session(
         info_session.duration_minutes = int(duration.total_seconds() / 60)
     
     # Assign recruiter if not already assigned
+    recruiter = None
     if not info_session.assigned_recruiter_id:
-        initialize_default_recruiters(db)
-        recruiter = get_next_recruiter(db, info_session.time_slot, date.today())
+        assignment_date = info_session.business_date or business_today()
+        recruiter = await db.run_sync(get_next_recruiter, info_session.time_slot, assignment_date)
         if recruiter:
             info_session.assigned_recruiter_id = recruiter.id
     
-    db.commit()
-    db.refresh(info_session)
+    try:
+        await db.commit()
+    except Exception:
+        if recruiter:
+            release_recruiter(recruiter.id, info_session.time_slot, assignment_date)
+        raise
+    await db.refresh(info_session)
+    publish_event("sessions", "session.updated", {"session_id": session_id, "status": "completed"})
+    await db.run_sync(track_session, info_session)
     
     return {"message": "Info session completed successfully", "session_id": session_id}
 
@@ -445,27 +401,26 @@ async def list_info_sessions(
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    business_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_db)
 ):
-    """List all info sessions (for staff dashboard)"""
-    query = db.query(InfoSession)
+    """List all info sessions (for staff dashboard); business_date limits it to one office day"""
+    query = select(InfoSession).options(joinedload(InfoSession.assigned_recruiter))
     
+    if business_date:
+        query = query.where(InfoSession.business_date == business_date)
     if status:
-        query = query.filter(InfoSession.status == status)
+        query = query.where(InfoSession.status == status)
     
-    sessions = query.order_by(InfoSession.created_at.desc()).offset(skip).limit(limit).all()
+    sessions = (await db.scalars(query.order_by(InfoSession.created_at.desc()).offset(skip).limit(limit))).all()
     result = []
     for session in sessions:
         session_data = InfoSessionResponse.model_validate(session).model_dump()
-        # Get recruiter name if assigned
-        if session.assigned_recruiter_id:
-            recruiter = db.query(Recruiter).filter(Recruiter.id == session.assigned_recruiter_id).first()
-            if recruiter:
-                session_data["assigned_recruiter_name"] = recruiter.name
-        # Get exclusion match info if in exclusion list
-        if session.is_in_exclusion_list:
-            exclusion_match_info = get_exclusion_match_info(db, session.first_name, session.last_name)
-            session_data["exclusion_match"] = exclusion_match_info.model_dump() if exclusion_match_info else None
+        # Recruiter loaded with the sessions (no query per row)
+        if session.assigned_recruiter:
+            session_data["assigned_recruiter_name"] = session.assigned_recruiter.name
+        # Exclusion match stored with the session
+        session_data["exclusion_match"] = session.exclusion_match if session.is_in_exclusion_list else None
         # Include all new fields
         session_data["rejected"] = session.rejected
         session_data["drug_screen"] = session.drug_screen
@@ -477,35 +432,122 @@ async def list_info_sessions(
     return result
 
 
+def exclusion_check_payload(matches) -> dict:
+    """Response body of an exclusion check for one name"""
+    is_excluded = len(matches) > 0
+    return {
+        "is_in_exclusion_list": is_excluded,
+        "matches": [
+            {
+                "id": match.id,
+                "name": match.name,
+                "code": match.code,
+                "ssn": match.ssn,
+                "dob": match.dob.isoformat() if match.dob else None,
+                "notes": match.notes
+            }
+            for match in matches
+        ],
+        "warning_message": "Please verify social and data to verify that this person is on the PC or RR list" if is_excluded else None
+    }
+
+async def batch_exclusion_payload(db: AsyncSession, names: List[ExclusionCheckName]) -> dict:
+    """
+    Response body of a batch exclusion check
+    Matching runs in a worker thread against the in-memory index, so a large roster does not stall other requests
+    """
+    index = await db.run_sync(get_exclusion_index)
+    fuzzy = EXCLUSION_FUZZY_MATCHING and len(names) <= MAX_BATCH_FUZZY_CHECK
+    all_matches = await run_in_threadpool(match_names, index, [(name.first_name, name.last_name) for name in names], fuzzy)
+    results = []
+    for name, matches in zip(names, all_matches):
+        item = {"first_name": name.first_name, "last_name": name.last_name}
+        item.update(exclusion_check_payload(matches))
+        results.append(item)
+    return {
+        "results": results,
+        "total": len(results),
+        "flagged": sum(1 for item in results if item["is_in_exclusion_list"]),
+        "fuzzy": fuzzy  # False: exact matches only (fuzzy matching off, or more than MAX_BATCH_FUZZY_CHECK names)
+    }
+
 @router.get("/exclusion-check/{first_name}/{last_name}")
 async def check_exclusion(
     first_name: str,
     last_name: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Check if a name is in exclusion list"""
     try:
-        matches = check_name_in_exclusion_list(db, first_name, last_name)
-        is_excluded = len(matches) > 0
-        
-        return {
-            "is_in_exclusion_list": is_excluded,
-            "matches": [
-                {
-                    "id": match.id,
-                    "name": match.name,
-                    "code": match.code,
-                    "ssn": match.ssn,
-                    "dob": match.dob.isoformat() if match.dob else None,
-                    "notes": match.notes
-                }
-                for match in matches
-            ],
-            "warning_message": "Please verify social and data to verify that this person is on the PC or RR list" if is_excluded else None
-        }
+        matches = await db.run_sync(check_name_in_exclusion_list, first_name, last_name)
+        return exclusion_check_payload(matches)
     except Exception as e:
         import traceback
         print(f"Error in check_exclusion: {e}")
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Error checking exclusion list: {str(e)}")
 
+@router.get("/exclusion-check/{first_name}/{last_name}/fuzzy")
+async def check_exclusion_fuzzy(
+    first_name: str,
+    last_name: str,
+    threshold: Optional[float] = Query(None, ge=0, le=1),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Fuzzy matches for a name with their score, best first
+    threshold defaults to the EXCLUSION_FUZZY_THRESHOLD setting (useful to tune it)
+    """
+    index = await db.run_sync(get_exclusion_index)
+    # Tens of ms on a large list: keep it off the event loop
+    matches = await run_in_threadpool(check_name_fuzzy, index, first_name, last_name, threshold)
+    return {
+        "threshold": threshold if threshold is not None else EXCLUSION_FUZZY_THRESHOLD,
+        "matches": [
+            dict(exclusion_check_payload([entry])["matches"][0], score=score)
+            for entry, score in matches
+        ]
+    }
+
+@router.post("/exclusion-check/batch")
+async def check_exclusion_batch(
+    request: ExclusionCheckBatchRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Check many names against the exclusion list in one call (e.g. a day's roster)
+    Each result has the same fields as the single-name check; batches of more than
+    MAX_BATCH_FUZZY_CHECK names get exact matches only
+    """
+    if len(request.names) > MAX_BATCH_EXCLUSION_CHECK:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_EXCLUSION_CHECK} names per batch")
+    return await batch_exclusion_payload(db, request.names)
+
+@router.post("/exclusion-check/batch/csv")
+async def check_exclusion_batch_csv(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Batch exclusion check from a CSV roster
+    Expected columns: first_name, last_name (case-insensitive; "first name"/"last name" also accepted)
+    """
+    contents = (await file.read()).decode("utf-8-sig", errors="replace")
+    reader = csv.reader(io.StringIO(contents))
+    header = [column.strip().lower().replace(" ", "_") for column in next(reader, [])]
+    if "first_name" not in header or "last_name" not in header:
+        raise HTTPException(status_code=400, detail="CSV must have first_name and last_name columns")
+    first_index = header.index("first_name")
+    last_index = header.index("last_name")
+    
+    names = []
+    for row in reader:
+        if len(row) <= max(first_index, last_index):
+            continue
+        first_name, last_name = row[first_index].strip(), row[last_index].strip()
+        if first_name or last_name:
+            names.append(ExclusionCheckName(first_name=first_name, last_name=last_name))
+    
+    if len(names) > MAX_BATCH_EXCLUSION_CHECK:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_EXCLUSION_CHECK} names per batch")
+    return await batch_exclusion_payload(db, names)
@@ -2,12 +2,14 @@
 Info Session Configuration API endpoints
 Admin endpoints for managing info session settings
 """
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, ConfigDict
 from typing import List
 from app.database import get_db
 from app.models.info_session_config import InfoSessionConfig
+from app.services.resource_versions import INFO_SESSION_CONFIG, bump_version, conditional_response, version_etag
 import json
 
 router = APIRouter()
@@ -26,9 +28,9 @@ class InfoSessionConfigResponse(BaseModel):
     is_active: bool
 
 @router.get("/", response_model=InfoSessionConfigResponse)
-async def get_info_session_config(db: Session = Depends(get_db)):
+async def get_info_session_config(db: AsyncSession = Depends(get_db)):
     """Get current info session configuration"""
-    config = db.query(InfoSessionConfig).filter(InfoSessionConfig.is_active == True).first()
+    config = await db.scalar(select(InfoSessionConfig).where(InfoSessionConfig.is_active == True))
     
     if not config:
         # Create default config if none exists
@@ -38,8 +40,9 @@ async def get_info_session_config(db: Session = Depends(get_db)):
             is_active=True
         )
         db.add(default_config)
-        db.commit()
-        db.refresh(default_config)
+        await db.commit()
+        bump_version(INFO_SESSION_CONFIG)
+        await db.refresh(default_config)
         return InfoSessionConfigResponse.model_validate(default_config).model_dump()
     
     config_data = InfoSessionConfigResponse.model_validate(config).model_dump()
@@ -51,11 +54,11 @@ async def get_info_session_config(db: Session = Depends(get_db)):
 @router.put("/", response_model=InfoSessionConfigResponse)
 async def update_info_session_config(
     config_data: InfoSessionConfigCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update info session configuration (admin only)"""
     # Deactivate all existing configs
-    db.query(InfoSessionConfig).update({InfoSessionConfig.is_active: False})
+    await db.execute(update(InfoSessionConfig).values({InfoSessionConfig.is_active: False}))
     
     # Create new active config
     # Convert list to JSON string for storage
@@ -66,15 +69,20 @@ async def update_info_session_config(
         is_active=True
     )
     db.add(new_config)
-    db.commit()
-    db.refresh(new_config)
+    await db.commit()
+    bump_version(INFO_SESSION_CONFIG)
+    await db.refresh(new_config)
     
     return InfoSessionConfigResponse.model_validate(new_config).model_dump()
 
 @router.get("/time-slots", response_model=List[str])
-async def get_available_time_slots(db: Session = Depends(get_db)):
-    """Get available time slots for info sessions"""
-    config = db.query(InfoSessionConfig).filter(InfoSessionConfig.is_active == True).first()
+async def get_available_time_slots(request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    """Get available time slots for info sessions (ETag: 304 if unchanged since If-None-Match)"""
+    not_modified = conditional_response(request, response, version_etag(INFO_SESSION_CONFIG))
+    if not_modified:
+        return not_modified
+    
+    config = await db.scalar(select(InfoSessionConfig).where(InfoSessionConfig.is_active == True))
     
     if not config:
         # Return default time slots
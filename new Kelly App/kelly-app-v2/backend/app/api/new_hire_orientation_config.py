@@ -3,7 +3,8 @@ New Hire Orientation Configuration API endpoints
 Admin endpoints for managing new hire orientation settings
 """
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, ConfigDict
 from typing import List
 from app.database import get_db
@@ -26,9 +27,9 @@ class NewHireOrientationConfigResponse(BaseModel):
     is_active: bool
 
 @router.get("/", response_model=NewHireOrientationConfigResponse)
-async def get_new_hire_orientation_config(db: Session = Depends(get_db)):
+async def get_new_hire_orientation_config(db: AsyncSession = Depends(get_db)):
     """Get current new hire orientation configuration"""
-    config = db.query(NewHireOrientationConfig).filter(NewHireOrientationConfig.is_active == True).first()
+    config = await db.scalar(select(NewHireOrientationConfig).where(NewHireOrientationConfig.is_active == True))
     
     if not config:
         # Create default config if none exists
@@ -38,8 +39,8 @@ async def get_new_hire_orientation_config(db: Session = Depends(get_db)):
             is_active=True
         )
         db.add(default_config)
-        db.commit()
-        db.refresh(default_config)
+        await db.commit()
+        await db.refresh(default_config)
         return NewHireOrientationConfigResponse.model_validate(default_config).model_dump()
     
     config_data = NewHireOrientationConfigResponse.model_validate(config).model_dump()
@@ -51,11 +52,11 @@ async def get_new_hire_orientation_config(db: Session = Depends(get_db)):
 @router.put("/", response_model=NewHireOrientationConfigResponse)
 async def update_new_hire_orientation_config(
     config_data: NewHireOrientationConfigCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update new hire orientation configuration (admin only)"""
     # Deactivate all existing configs
-    db.query(NewHireOrientationConfig).update({NewHireOrientationConfig.is_active: False})
+    await db.execute(update(NewHireOrientationConfig).values({NewHireOrientationConfig.is_active: False}))
     
     # Create new active config
     # Convert list to JSON string for storage
@@ -66,8 +67,8 @@ async def update_new_hire_orientation_config(
         is_active=True
     )
     db.add(new_config)
-    db.commit()
-    db.refresh(new_config)
+    await db.commit()
+    await db.refresh(new_config)
     
     config_response = NewHireOrientationConfigResponse.model_validate(new_config).model_dump()
     if isinstance(config_response.get('time_slots'), str):
@@ -75,9 +76,9 @@ async def update_new_hire_orientation_config(
     return config_response
 
 @router.get("/time-slots", response_model=List[str])
-async def get_available_time_slots(db: Session = Depends(get_db)):
+async def get_available_time_slots(db: AsyncSession = Depends(get_db)):
     """Get available time slots for new hire orientations"""
-    config = db.query(NewHireOrientationConfig).filter(NewHireOrientationConfig.is_active == True).first()
+    config = await db.scalar(select(NewHireOrientationConfig).where(NewHireOrientationConfig.is_active == True))
     
     if not config:
         # Return default time slots
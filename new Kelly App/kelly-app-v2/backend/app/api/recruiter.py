@@ -3,13 +3,17 @@ Recruiter API endpoints
 For recruiters to manage their status and view their assigned visitors
 """
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 from datetime import datetime
 from app.database import get_db
 from app.models.recruiter import Recruiter
 from app.models.info_session import InfoSession
+from app.services.event_broker import publish_event
+from app.services.lobby_queue import track_session
 
 router = APIRouter()
 
@@ -39,10 +43,10 @@ class InfoSessionUpdate(BaseModel):
 @router.get("/{recruiter_id}/status", response_model=RecruiterResponse)
 async def get_recruiter_status(
     recruiter_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get recruiter status"""
-    recruiter = db.query(Recruiter).filter(Recruiter.id == recruiter_id).first()
+    recruiter = await db.scalar(select(Recruiter).where(Recruiter.id == recruiter_id))
     if not recruiter:
         raise HTTPException(status_code=404, detail="Recruiter not found")
     return RecruiterResponse.model_validate(recruiter).model_dump()
@@ -51,19 +55,20 @@ async def get_recruiter_status(
 async def update_recruiter_status(
     recruiter_id: int,
     status_update: RecruiterStatusUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update recruiter status (available/busy)"""
     if status_update.status not in ["available", "busy"]:
         raise HTTPException(status_code=400, detail="Status must be 'available' or 'busy'")
     
-    recruiter = db.query(Recruiter).filter(Recruiter.id == recruiter_id).first()
+    recruiter = await db.scalar(select(Recruiter).where(Recruiter.id == recruiter_id))
     if not recruiter:
         raise HTTPException(status_code=404, detail="Recruiter not found")
     
     recruiter.status = status_update.status
-    db.commit()
-    db.refresh(recruiter)
+    await db.commit()
+    await db.refresh(recruiter)
+    publish_event("recruiters", "recruiter.status", {"recruiter_id": recruiter_id, "status": status_update.status})
     
     return {"message": f"Recruiter status updated to {status_update.status}", "recruiter": RecruiterResponse.model_validate(recruiter).model_dump()}
 
@@ -71,19 +76,19 @@ async def update_recruiter_status(
 async def get_assigned_sessions(
     recruiter_id: int,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all info sessions assigned to a recruiter"""
-    recruiter = db.query(Recruiter).filter(Recruiter.id == recruiter_id).first()
+    recruiter = await db.scalar(select(Recruiter).where(Recruiter.id == recruiter_id))
     if not recruiter:
         raise HTTPException(status_code=404, detail="Recruiter not found")
     
-    query = db.query(InfoSession).filter(InfoSession.assigned_recruiter_id == recruiter_id)
+    query = select(InfoSession).where(InfoSession.assigned_recruiter_id == recruiter_id)
     
     if status:
-        query = query.filter(InfoSession.status == status)
+        query = query.where(InfoSession.status == status)
     
-    sessions = query.order_by(InfoSession.created_at.desc()).all()
+    sessions = (await db.scalars(query.order_by(InfoSession.created_at.desc()))).all()
     
     result = []
     for session in sessions:
@@ -118,16 +123,16 @@ async def get_assigned_sessions(
 async def start_session(
     recruiter_id: int,
     session_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Mark that recruiter has started with a visitor and generate row from template"""
     from app.models.row_template import RowTemplate
     from datetime import date
     
-    session = db.query(InfoSession).filter(
+    session = await db.scalar(select(InfoSession).where(
         InfoSession.id == session_id,
         InfoSession.assigned_recruiter_id == recruiter_id
-    ).first()
+    ))
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found or not assigned to this recruiter")
@@ -149,7 +154,7 @@ async def start_session(
     session.status = "in-progress"
     
     # Mark recruiter as busy
-    recruiter = db.query(Recruiter).filter(Recruiter.id == recruiter_id).first()
+    recruiter = await db.scalar(select(Recruiter).where(Recruiter.id == recruiter_id))
     if recruiter:
         recruiter.status = "busy"
     
@@ -167,7 +172,9 @@ async def start_session(
     generated_row = None
     try:
         # Get the first active template
-        template = db.query(RowTemplate).filter(RowTemplate.is_active == True).first()
+        template = await db.scalar(
+            select(RowTemplate).options(selectinload(RowTemplate.columns)).where(RowTemplate.is_active == True)
+        )
         
         if template:
             # Prepare data mapping: first_name + last_name -> applicant name, phone -> numero, email -> email
@@ -219,7 +226,11 @@ async def start_session(
     if generated_row:
         session.generated_row = generated_row
     
-    db.commit()
+    await db.commit()
+    publish_event("sessions", "session.updated", {"session_id": session_id, "status": "in-progress"})
+    await db.run_sync(track_session, session)
+    if recruiter:
+        publish_event("recruiters", "recruiter.status", {"recruiter_id": recruiter_id, "status": "busy"})
     
     response = {"message": "Session started", "started_at": session.started_at.isoformat()}
     if generated_row:
@@ -232,13 +243,13 @@ async def complete_session(
     recruiter_id: int,
     session_id: int,
     update_data: InfoSessionUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Mark that recruiter has completed with a visitor and update document status"""
-    session = db.query(InfoSession).filter(
+    session = await db.scalar(select(InfoSession).where(
         InfoSession.id == session_id,
         InfoSession.assigned_recruiter_id == recruiter_id
-    ).first()
+    ))
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found or not assigned to this recruiter")
@@ -270,12 +281,16 @@ async def complete_session(
             session.duration_minutes = int(duration.total_seconds() / 60)
     
     # Mark recruiter as available again
-    recruiter = db.query(Recruiter).filter(Recruiter.id == recruiter_id).first()
+    recruiter = await db.scalar(select(Recruiter).where(Recruiter.id == recruiter_id))
     if recruiter:
         recruiter.status = "available"
     
-    db.commit()
-    db.refresh(session)
+    await db.commit()
+    await db.refresh(session)
+    publish_event("sessions", "session.updated", {"session_id": session_id, "status": session.status})
+    await db.run_sync(track_session, session)
+    if recruiter:
+        publish_event("recruiters", "recruiter.status", {"recruiter_id": recruiter_id, "status": "available"})
     
     return {
         "message": "Session completed",
@@ -288,13 +303,13 @@ async def update_session_documents(
     recruiter_id: int,
     session_id: int,
     update_data: InfoSessionUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update document status for a session (without completing it)"""
-    session = db.query(InfoSession).filter(
+    session = await db.scalar(select(InfoSession).where(
         InfoSession.id == session_id,
         InfoSession.assigned_recruiter_id == recruiter_id
-    ).first()
+    ))
     
     if not session:
         raise HTTPException(status_code=404, detail="Session not found or not assigned to this recruiter")
@@ -317,8 +332,10 @@ async def update_session_documents(
     if update_data.status is not None:
         session.status = update_data.status
     
-    db.commit()
-    db.refresh(session)
+    await db.commit()
+    await db.refresh(session)
+    publish_event("sessions", "session.updated", {"session_id": session_id, "status": session.status})
+    await db.run_sync(track_session, session)
     
     return {"message": "Session updated successfully"}
 
@@ -2,8 +2,10 @@
 Row Template API endpoints
 For managing row templates and generating Excel rows
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from pydantic import BaseModel, ConfigDict, field_serializer
 from typing import List, Optional, Dict, Any
 from datetime import datetime
@@ -11,6 +13,7 @@ from app.database import get_db
 from app.models.row_template import RowTemplate, ColumnDefinition
 from app.models.user import User
 from app.api.auth import get_current_admin, get_current_user
+from app.services.resource_versions import ROW_TEMPLATES, bump_version, conditional_response, version_etag
 
 router = APIRouter()
 
@@ -86,17 +89,27 @@ class RowOutput(BaseModel):
     row_text: str  # Tab-separated values for Excel
     row_array: List[str]  # Array of values
 
+def template_query():
+    """Row templates with their columns loaded (no lazy loads on the async session)"""
+    return select(RowTemplate).options(selectinload(RowTemplate.columns))
+
+async def load_template(db: AsyncSession, template_id: int) -> Optional[RowTemplate]:
+    """Template with freshly loaded columns"""
+    return await db.scalar(
+        template_query().where(RowTemplate.id == template_id).execution_options(populate_existing=True)
+    )
+
 # CRUD endpoints
 @router.post("/", response_model=RowTemplateResponse, status_code=status.HTTP_201_CREATED)
 async def create_row_template(
     template_data: RowTemplateCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin)
 ):
     """Create a new row template (admin only)"""
     try:
         # Check if name already exists
-        existing = db.query(RowTemplate).filter(RowTemplate.name == template_data.name).first()
+        existing = await db.scalar(select(RowTemplate).where(RowTemplate.name == template_data.name))
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -110,7 +123,7 @@ async def create_row_template(
             is_active=template_data.is_active
         )
         db.add(template)
-        db.flush()  # Get template ID
+        await db.flush()  # Get template ID
         
         # Create columns
         for col_data in template_data.columns:
@@ -127,8 +140,9 @@ async def create_row_template(
             )
             db.add(column)
         
-        db.commit()
-        db.refresh(template)
+        await db.commit()
+        bump_version(ROW_TEMPLATES)
+        template = await load_template(db, template.id)
         
         # Convert to dict and serialize dates manually
         response = RowTemplateResponse.model_validate(template)
@@ -137,7 +151,7 @@ async def create_row_template(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating template: {str(e)}"
@@ -145,26 +159,32 @@ async def create_row_template(
 
 @router.get("/", response_model=List[RowTemplateResponse])
 async def list_row_templates(
+    request: Request,
+    response: Response,
     active_only: bool = False,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List all row templates"""
-    query = db.query(RowTemplate)
+    """List all row templates (ETag: 304 if unchanged since If-None-Match)"""
+    not_modified = conditional_response(request, response, version_etag(ROW_TEMPLATES, int(active_only)))
+    if not_modified:
+        return not_modified
+    
+    query = template_query()
     if active_only:
-        query = query.filter(RowTemplate.is_active == True)
+        query = query.where(RowTemplate.is_active == True)
     
-    templates = query.order_by(RowTemplate.created_at.desc()).all()
+    templates = (await db.scalars(query.order_by(RowTemplate.created_at.desc()))).all()
     return [RowTemplateResponse.model_validate(t).model_dump(mode='json') for t in templates]
 
 @router.get("/{template_id}", response_model=RowTemplateResponse)
 async def get_row_template(
     template_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific row template"""
-    template = db.query(RowTemplate).filter(RowTemplate.id == template_id).first()
+    template = await db.scalar(template_query().where(RowTemplate.id == template_id))
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
     
@@ -177,22 +197,22 @@ async def get_row_template(
 async def update_row_template(
     template_id: int,
     template_data: RowTemplateUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin)
 ):
     """Update a row template (admin only)"""
     try:
-        template = db.query(RowTemplate).filter(RowTemplate.id == template_id).first()
+        template = await db.scalar(select(RowTemplate).where(RowTemplate.id == template_id))
         if not template:
             raise HTTPException(status_code=404, detail="Template not found")
         
         # Update template fields
         if template_data.name is not None:
             # Check if new name conflicts
-            existing = db.query(RowTemplate).filter(
+            existing = await db.scalar(select(RowTemplate).where(
                 RowTemplate.name == template_data.name,
                 RowTemplate.id != template_id
-            ).first()
+            ))
             if existing:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -210,7 +230,7 @@ async def update_row_template(
         if template_data.columns is not None:
             try:
                 # Delete existing columns
-                db.query(ColumnDefinition).filter(ColumnDefinition.template_id == template_id).delete()
+                await db.execute(delete(ColumnDefinition).where(ColumnDefinition.template_id == template_id))
                 
                 # Create new columns
                 for col_data in template_data.columns:
@@ -227,14 +247,15 @@ async def update_row_template(
                     )
                     db.add(column)
             except Exception as e:
-                db.rollback()
+                await db.rollback()
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail=f"Error updating columns: {str(e)}"
                 )
         
-        db.commit()
-        db.refresh(template)
+        await db.commit()
+        bump_version(ROW_TEMPLATES)
+        template = await load_template(db, template.id)
         
         # Convert to dict and serialize dates manually
         response = RowTemplateResponse.model_validate(template)
@@ -243,7 +264,7 @@ async def update_row_template(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error updating template: {str(e)}"
@@ -252,16 +273,17 @@ async def update_row_template(
 @router.delete("/{template_id}")
 async def delete_row_template(
     template_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin)
 ):
     """Delete a row template (admin only)"""
-    template = db.query(RowTemplate).filter(RowTemplate.id == template_id).first()
+    template = await db.scalar(template_query().where(RowTemplate.id == template_id))
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
     
-    db.delete(template)
-    db.commit()
+    await db.delete(template)
+    await db.commit()
+    bump_version(ROW_TEMPLATES)
     
     return {"message": "Template deleted successfully"}
 
@@ -269,14 +291,14 @@ async def delete_row_template(
 @router.post("/generate-row", response_model=RowOutput)
 async def generate_row(
     row_input: RowDataInput,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Generate a row from template and data"""
-    template = db.query(RowTemplate).filter(
+    template = await db.scalar(template_query().where(
         RowTemplate.id == row_input.template_id,
         RowTemplate.is_active == True
-    ).first()
+    ))
     
     if not template:
         raise HTTPException(status_code=404, detail="Template not found or inactive")
@@ -0,0 +1,146 @@
+"""
+Offline sync API endpoint: a kiosk sends the registrations and visits it
+collected while the network was down, in one request
+(see app.services.sync_service)
+"""
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field, ValidationError
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime, timedelta, timezone
+
+from app.database import get_db
+from app.api.info_session import InfoSessionRegistration
+from app.api.visits import NewHireOrientationCreate, BadgeCreate, FingerprintCreate, TeamVisitCreate
+from app.models.info_session import InfoSession
+from app.services.business_day import business_today
+from app.services.event_broker import publish_event
+from app.services.idempotency import IdempotencyKeyInProgress, IdempotencyKeyReused, MAX_IDEMPOTENCY_KEY_LENGTH, claim_idempotency_key
+from app.services.lobby_queue import track_session
+from app.services.sync_service import (
+    INFO_SESSION_KIND, MAX_SYNC_BATCH, SYNC_CLOCK_SKEW_SECONDS, SYNC_MAX_AGE_DAYS, OfflineRecord, save_offline_records
+)
+
+router = APIRouter()
+
+# Item kind -> form it is validated with (the same as the live endpoint's)
+ITEM_FORMS = {
+    INFO_SESSION_KIND: InfoSessionRegistration,
+    "new-hire-orientation": NewHireOrientationCreate,
+    "badges": BadgeCreate,
+    "fingerprints": FingerprintCreate,
+    "team-visit": TeamVisitCreate,
+}
+
+class OfflineItem(BaseModel):
+    kind: str  # info-session, new-hire-orientation, badges, fingerprints or team-visit
+    created_at: datetime  # When the kiosk collected it (without a timezone it is UTC)
+    client_id: Optional[str] = Field(None, max_length=100)  # Kiosk's own id, echoed in the result
+    data: Dict[str, Any]  # Form fields, as the live endpoint takes them
+
+class OfflineBatch(BaseModel):
+    items: List[OfflineItem] = Field(..., max_length=MAX_SYNC_BATCH)
+
+class OfflineItemResult(BaseModel):
+    index: int
+    client_id: Optional[str] = None
+    kind: str
+    status: str  # created or rejected
+    id: Optional[int] = None
+    business_date: Optional[date] = None
+    assigned_recruiter_id: Optional[int] = None
+    assigned_recruiter_name: Optional[str] = None
+    is_in_exclusion_list: Optional[bool] = None
+    errors: Optional[List[str]] = None
+
+class OfflineBatchResponse(BaseModel):
+    created: int
+    rejected: int
+    results: List[OfflineItemResult]
+
+def collected_at(moment: datetime, now: datetime) -> datetime:
+    """Collection time as stored (naive UTC); raises ValueError if it cannot be a backlog item"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    if moment > now + timedelta(seconds=SYNC_CLOCK_SKEW_SECONDS):
+        raise ValueError("created_at is in the future")
+    if moment < now - timedelta(days=SYNC_MAX_AGE_DAYS):
+        raise ValueError(f"created_at is more than {SYNC_MAX_AGE_DAYS} days old")
+    return moment
+
+def validation_messages(error: ValidationError) -> List[str]:
+    return [f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" for detail in error.errors()]
+
+@router.post("/batch", response_model=OfflineBatchResponse)
+async def sync_offline_batch(
+    batch: OfflineBatch,
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=MAX_IDEMPOTENCY_KEY_LENGTH)
+):
+    """
+    Save a kiosk's offline backlog in one transaction, with each item's original created_at
+    Items that do not validate are rejected one by one (errors in their result) and the rest
+    are saved; results come back in input order. Info sessions get the exclusion check and a
+    recruiter like a live registration. Send an Idempotency-Key so a retried batch is not saved twice
+    """
+    try:
+        claim = await claim_idempotency_key("sync", idempotency_key, batch.model_dump())
+    except IdempotencyKeyReused:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different batch")
+    except IdempotencyKeyInProgress:
+        raise HTTPException(status_code=409, detail="A batch with this Idempotency-Key is still in progress, retry later")
+    if claim.replay:
+        status_code, body = claim.replay
+        return Response(content=body, status_code=status_code, media_type="application/json", headers={"Idempotent-Replayed": "true"})
+
+    try:
+        now = datetime.utcnow()
+        results: List[Dict] = []
+        records: List[OfflineRecord] = []
+        accepted: List[int] = []
+        for index, item in enumerate(batch.items):
+            result = {"index": index, "client_id": item.client_id, "kind": item.kind, "status": "rejected"}
+            results.append(result)
+            form = ITEM_FORMS.get(item.kind)
+            if form is None:
+                result["errors"] = [f"kind: unknown kind '{item.kind}'"]
+                continue
+            try:
+                created_at = collected_at(item.created_at, now)
+                fields = form.model_validate(item.data).model_dump()
+            except ValueError as e:
+                # ValidationError is a ValueError too
+                result["errors"] = validation_messages(e) if isinstance(e, ValidationError) else [f"created_at: {e}"]
+                continue
+            records.append(OfflineRecord(kind=item.kind, created_at=created_at, fields=fields))
+            accepted.append(index)
+
+        synced = await db.run_sync(save_offline_records, records) if records else []
+
+        sessions = []
+        for index, record in zip(accepted, synced):
+            results[index].update(status="created", id=record.row.id, business_date=record.row.business_date)
+            if isinstance(record.row, InfoSession):
+                sessions.append(record.row)
+                results[index].update(
+                    assigned_recruiter_id=record.row.assigned_recruiter_id,
+                    assigned_recruiter_name=record.recruiter.name if record.recruiter else None,
+                    is_in_exclusion_list=bool(record.row.is_in_exclusion_list)
+                )
+        response_data = OfflineBatchResponse(created=len(synced), rejected=len(results) - len(synced), results=results).model_dump()
+        claim.complete(200, response_data)
+    finally:
+        # Failed or cancelled before complete(): a retry saves the batch again
+        claim.release()
+
+    # One event per topic: dashboards reload once for the whole backlog
+    if sessions:
+        publish_event("sessions", "sessions.synced", {"count": len(sessions)})
+        # Only today's sessions join the lobby queue; a backlog from other days never does
+        today = business_today()
+        for session in sessions:
+            if session.business_date == today:
+                await db.run_sync(track_session, session)
+    if len(synced) > len(sessions):
+        publish_event("visits", "visits.synced", {"count": len(synced) - len(sessions)})
+    return response_data
@@ -2,15 +2,17 @@
 Visits API endpoints for different visit types
 """
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr, ConfigDict
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 
 from app.database import get_db
 from app.models.visit import NewHireOrientation, Badge, Fingerprint, TeamVisit
 from app.models.user import User
 from app.api.auth import get_current_user
+from app.services.event_broker import publish_event
 
 router = APIRouter()
 
@@ -70,120 +72,142 @@ class VisitResponse(BaseModel):
     reason: Optional[str] = None
     status: str
     created_at: datetime
+    business_date: Optional[date] = None  # Office date (Miami time) of the visit
 
 # New Hire Orientation
 @router.post("/new-hire-orientation", response_model=VisitResponse)
 async def register_new_hire_orientation(
     data: NewHireOrientationCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Register a new hire orientation"""
     orientation = NewHireOrientation(**data.dict())
     db.add(orientation)
-    db.commit()
-    db.refresh(orientation)
+    await db.commit()
+    await db.refresh(orientation)
+    publish_event("visits", "visit.created", {"kind": "new-hire-orientation", "visit_id": orientation.id})
     return VisitResponse.model_validate(orientation).model_dump()
 
 @router.get("/new-hire-orientation", response_model=List[VisitResponse])
 async def list_new_hire_orientations(
-    db: Session = Depends(get_db),
+    business_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List all new hire orientations (staff only)"""
-    orientations = db.query(NewHireOrientation).order_by(NewHireOrientation.created_at.desc()).all()
+    """List all new hire orientations (staff only); business_date limits it to one office day"""
+    query = select(NewHireOrientation)
+    if business_date:
+        query = query.where(NewHireOrientation.business_date == business_date)
+    orientations = (await db.scalars(query.order_by(NewHireOrientation.created_at.desc()))).all()
     return [VisitResponse.model_validate(o).model_dump() for o in orientations]
 
 # Badges
 @router.post("/badges", response_model=VisitResponse)
 async def register_badge(
     data: BadgeCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Register a badge appointment"""
     badge = Badge(**data.dict())
     db.add(badge)
-    db.commit()
-    db.refresh(badge)
+    await db.commit()
+    await db.refresh(badge)
+    publish_event("visits", "visit.created", {"kind": "badge", "visit_id": badge.id})
     return VisitResponse.model_validate(badge).model_dump()
 
 @router.get("/badges", response_model=List[VisitResponse])
 async def list_badges(
-    db: Session = Depends(get_db),
+    business_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List all badge appointments (staff only)"""
-    badges = db.query(Badge).order_by(Badge.created_at.desc()).all()
+    """List all badge appointments (staff only); business_date limits it to one office day"""
+    query = select(Badge)
+    if business_date:
+        query = query.where(Badge.business_date == business_date)
+    badges = (await db.scalars(query.order_by(Badge.created_at.desc()))).all()
     return [VisitResponse.model_validate(b).model_dump() for b in badges]
 
 # Fingerprints
 @router.post("/fingerprints", response_model=VisitResponse)
 async def register_fingerprint(
     data: FingerprintCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Register a fingerprint appointment"""
     fingerprint = Fingerprint(**data.dict())
     db.add(fingerprint)
-    db.commit()
-    db.refresh(fingerprint)
+    await db.commit()
+    await db.refresh(fingerprint)
+    publish_event("visits", "visit.created", {"kind": "fingerprint", "visit_id": fingerprint.id})
     return VisitResponse.model_validate(fingerprint).model_dump()
 
 @router.get("/fingerprints", response_model=List[VisitResponse])
 async def list_fingerprints(
-    db: Session = Depends(get_db),
+    business_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List all fingerprint appointments (staff only)"""
-    fingerprints = db.query(Fingerprint).order_by(Fingerprint.created_at.desc()).all()
+    """List all fingerprint appointments (staff only); business_date limits it to one office day"""
+    query = select(Fingerprint)
+    if business_date:
+        query = query.where(Fingerprint.business_date == business_date)
+    fingerprints = (await db.scalars(query.order_by(Fingerprint.created_at.desc()))).all()
     return [VisitResponse.model_validate(f).model_dump() for f in fingerprints]
 
 # Team Visits
 @router.post("/team-visit", response_model=VisitResponse)
 async def register_team_visit(
     data: TeamVisitCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Register a team visit"""
     team_visit = TeamVisit(**data.dict())
     db.add(team_visit)
-    db.commit()
-    db.refresh(team_visit)
+    await db.commit()
+    await db.refresh(team_visit)
+    publish_event("visits", "visit.created", {"kind": "team-visit", "visit_id": team_visit.id, "team_member_id": team_visit.team_member_id})
     return VisitResponse.model_validate(team_visit).model_dump()
 
 @router.get("/team-visit/my-visits", response_model=List[VisitResponse])
 async def get_my_visits(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get team visits assigned to current staff member"""
-    visits = db.query(TeamVisit).filter(
+    visits = (await db.scalars(select(TeamVisit).where(
         TeamVisit.team_member_id == current_user.id
-    ).order_by(TeamVisit.created_at.desc()).all()
+    ).order_by(TeamVisit.created_at.desc()))).all()
     return [VisitResponse.model_validate(v).model_dump() for v in visits]
 
 @router.get("/team-visit", response_model=List[VisitResponse])
 async def list_team_visits(
-    db: Session = Depends(get_db),
+    business_date: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List all team visits (staff only)"""
-    visits = db.query(TeamVisit).order_by(TeamVisit.created_at.desc()).all()
+    """List all team visits (staff only); business_date limits it to one office day"""
+    query = select(TeamVisit)
+    if business_date:
+        query = query.where(TeamVisit.business_date == business_date)
+    visits = (await db.scalars(query.order_by(TeamVisit.created_at.desc()))).all()
     return [VisitResponse.model_validate(v).model_dump() for v in visits]
 
 @router.patch("/team-visit/{visit_id}/notify")
 async def notify_team_visit(
     visit_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Mark team visit as notified"""
-    visit = db.query(TeamVisit).filter(TeamVisit.id == visit_id).first()
+    visit = await db.scalar(select(TeamVisit).where(TeamVisit.id == visit_id))
     if not visit:
         raise HTTPException(status_code=404, detail="Visit not found")
     
     visit.status = "notified"
     visit.notified_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
+    publish_event("visits", "visit.updated", {"kind": "team-visit", "visit_id": visit_id, "status": "notified"})
     
     return {"message": "Visit marked as notified"}
 
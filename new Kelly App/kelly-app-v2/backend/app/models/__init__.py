@@ -1,5 +1,5 @@
-from app.models.info_session import InfoSession, InfoSessionStep
-from app.models.exclusion_list import ExclusionList
+from app.models.info_session import InfoSession
+from app.models.exclusion_list import ExclusionList, ExclusionListVersion
 from app.models.announcement import Announcement
 from app.models.recruiter import Recruiter
 from app.models.info_session_config import InfoSessionConfig
@@ -7,6 +7,7 @@ from app.models.new_hire_orientation_config import NewHireOrientationConfig
 from app.models.row_template import RowTemplate, ColumnDefinition
 from app.models.user import User, UserRole
 from app.models.visit import NewHireOrientation, Badge, Fingerprint, TeamVisit
+from app.models.archive import ArchivedInfoSession, ArchivedNewHireOrientation, ArchivedBadge, ArchivedFingerprint, ArchivedTeamVisit
 
-__all__ = ["InfoSession", "InfoSessionStep", "ExclusionList", "Announcement", "Recruiter", "InfoSessionConfig", "NewHireOrientationConfig", "RowTemplate", "ColumnDefinition", "User", "UserRole", "NewHireOrientation", "Badge", "Fingerprint", "TeamVisit"]
+__all__ = ["InfoSession", "ExclusionList", "ExclusionListVersion", "Announcement", "Recruiter", "InfoSessionConfig", "NewHireOrientationConfig", "RowTemplate", "ColumnDefinition", "User", "UserRole", "NewHireOrientation", "Badge", "Fingerprint", "TeamVisit", "ArchivedInfoSession", "ArchivedNewHireOrientation", "ArchivedBadge", "ArchivedFingerprint", "ArchivedTeamVisit"]
 
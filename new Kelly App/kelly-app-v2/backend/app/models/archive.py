@@ -0,0 +1,50 @@
+from sqlalchemy import Column, DateTime, Index, Table
+from sqlalchemy.sql import func
+from app.database import Base
+from app.models.info_session import InfoSession
+from app.models.visit import NewHireOrientation, Badge, Fingerprint, TeamVisit
+
+def archive_table(source: Table, *indexes: Index) -> Table:
+    """
+    Cold copy of a hot table (<name>_archive): same columns, without foreign keys or
+    defaults (rows are copied as they are), plus when each row was archived
+    """
+    return Table(
+        f"{source.name}_archive",
+        Base.metadata,
+        *[Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable) for column in source.columns],
+        Column("archived_at", DateTime(timezone=True), server_default=func.now()),
+        *indexes
+    )
+
+class ArchivedInfoSession(Base):
+    # Archive search: by office date (newest first), by recruiter
+    __table__ = archive_table(
+        InfoSession.__table__,
+        Index("ix_info_sessions_archive_day", "business_date", "id"),
+        Index("ix_info_sessions_archive_recruiter_day", "assigned_recruiter_id", "business_date"),
+    )
+
+class ArchivedNewHireOrientation(Base):
+    __table__ = archive_table(
+        NewHireOrientation.__table__,
+        Index("ix_new_hire_orientations_archive_day", "business_date", "id"),
+    )
+
+class ArchivedBadge(Base):
+    __table__ = archive_table(
+        Badge.__table__,
+        Index("ix_badges_archive_day", "business_date", "id"),
+    )
+
+class ArchivedFingerprint(Base):
+    __table__ = archive_table(
+        Fingerprint.__table__,
+        Index("ix_fingerprints_archive_day", "business_date", "id"),
+    )
+
+class ArchivedTeamVisit(Base):
+    __table__ = archive_table(
+        TeamVisit.__table__,
+        Index("ix_team_visits_archive_day", "business_date", "id"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Date
+from sqlalchemy import Column, Integer, String, Text, DateTime, Date, ForeignKey
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -7,10 +7,22 @@ class ExclusionList(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False, index=True)  # Stored in uppercase for comparison
+    name_normalized = Column(String(255), nullable=True)  # Accent-folded tokens for fuzzy matching
+    name_phonetic = Column(String(255), nullable=True)  # Phonetic key of each normalized token
     code = Column(String(50), nullable=True)
     dob = Column(Date, nullable=True)  # Date of Birth
     ssn = Column(String(20), nullable=True)  # Social Security Number
     notes = Column(Text, nullable=True)
+    version_id = Column(Integer, ForeignKey("exclusion_list_versions.id"), nullable=True, index=True)  # Upload this row belongs to
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+class ExclusionListVersion(Base):
+    __tablename__ = "exclusion_list_versions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    source_filename = Column(String(255), nullable=True)
+    status = Column(String(20), nullable=False, default="loading")  # loading, active, previous, retired, failed
+    row_count = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    activated_at = Column(DateTime(timezone=True), nullable=True)
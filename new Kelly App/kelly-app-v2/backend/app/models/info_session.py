@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Text, JSON, Index, event, select
+from sqlalchemy.orm import Session, relationship
 from sqlalchemy.sql import func
 from datetime import datetime
 from app.database import Base
+from app.services.business_day import business_today
+from app.services.step_catalog import CURRENT_STEP_CATALOG
 
 class InfoSession(Base):
     __tablename__ = "info_sessions"
@@ -17,6 +19,7 @@ class InfoSession(Base):
     time_slot = Column(String(20), nullable=False)  # 8:30 AM or 1:30 PM
     is_in_exclusion_list = Column(Boolean, default=False)
     exclusion_warning_shown = Column(Boolean, default=False)
+    exclusion_match = Column(JSON(none_as_null=True), nullable=True)  # Snapshot of the matched exclusion entry: {"name", "code", "ssn"}
     status = Column(String(50), default="registered")  # registered, in-progress, completed
     
     # Document status checkboxes
@@ -41,20 +44,50 @@ class InfoSession(Base):
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    business_date = Column(Date, default=business_today)  # Office date of the registration (day-scoped queries filter on it)
+    change_seq = Column(Integer, nullable=True, index=True)  # Bumped on every change to the session or its steps (delta sync cursor)
     
-    # Relationship with steps
-    steps = relationship("InfoSessionStep", back_populates="info_session", cascade="all, delete-orphan")
-
-class InfoSessionStep(Base):
-    __tablename__ = "info_session_steps"
+    # Kiosk steps: catalog version (app.services.step_catalog) and completed steps as a bitmask
+    steps_version = Column(Integer, nullable=False, default=CURRENT_STEP_CATALOG)
+    steps_completed = Column(Integer, nullable=False, default=0)
     
-    id = Column(Integer, primary_key=True, index=True)
-    info_session_id = Column(Integer, ForeignKey("info_sessions.id"), nullable=False)
-    step_name = Column(String(100), nullable=False)  # english-communication, education-proof, etc.
-    step_description = Column(Text)
-    is_completed = Column(Boolean, default=False)
-    completed_at = Column(DateTime(timezone=True), nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Assigned recruiter (list endpoints load it in the same query with joinedload)
+    assigned_recruiter = relationship("Recruiter")
     
-    # Relationship
-    info_session = relationship("InfoSession", back_populates="steps")
+    __table_args__ = (
+        # Assignment counts per recruiter and time slot, a recruiter's day
+        Index("ix_info_sessions_day_recruiter_slot", "business_date", "assigned_recruiter_id", "time_slot"),
+        # Today's sessions by status (lobby queue)
+        Index("ix_info_sessions_day_status", "business_date", "status"),
+        # Live board and lists by status, newest first
+        Index("ix_info_sessions_status_created", "status", "created_at"),
+        # Completed board, most recently completed first
+        Index("ix_info_sessions_status_completed", "status", "completed_at"),
+        # A recruiter's assigned sessions (optionally by status), newest first
+        Index("ix_info_sessions_recruiter_status_created", "assigned_recruiter_id", "status", "created_at"),
+        # Recently finished sessions (service time averages)
+        Index("ix_info_sessions_completed_at", "completed_at"),
+        # Full list, newest first (paged)
+        Index("ix_info_sessions_created_at", "created_at"),
+        # Ids are never handed out again: archived sessions keep theirs in info_sessions_archive
+        {"sqlite_autoincrement": True},
+    )
+
+def next_change_seq():
+    """change_seq for a row being written, computed inside the INSERT/UPDATE itself"""
+    return select(func.coalesce(func.max(InfoSession.change_seq), 0) + 1).scalar_subquery()
+
+@event.listens_for(Session, "before_flush")
+def bump_info_session_change_seq(session, flush_context, instances):
+    """
+    Give every info session written in this flush a new change_seq
+    The value is computed inside the INSERT/UPDATE itself, so on SQLite (one
+    writer at a time) sequence numbers become visible in increasing order
+    Statements that bypass the flush (registration, complete_step) set it with next_change_seq()
+    """
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, InfoSession) or obj in session.deleted:
+            continue
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        obj.change_seq = next_change_seq()
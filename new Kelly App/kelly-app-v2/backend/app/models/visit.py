@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.services.business_day import business_today
 
 class NewHireOrientation(Base):
     __tablename__ = "new_hire_orientations"
@@ -17,6 +18,15 @@ class NewHireOrientation(Base):
     assigned_recruiter_id = Column(Integer, ForeignKey("recruiters.id"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    business_date = Column(Date, default=business_today)  # Office date of the visit
+    
+    # Day views (by recruiter and time, by status) and the full list newest first
+    __table_args__ = (
+        Index("ix_new_hire_orientations_day_recruiter_slot", "business_date", "assigned_recruiter_id", "time_slot"),
+        Index("ix_new_hire_orientations_day_status", "business_date", "status"),
+        Index("ix_new_hire_orientations_created_at", "created_at"),
+        {"sqlite_autoincrement": True},  # Ids are never reused (archived visits keep theirs)
+    )
 
 class Badge(Base):
     __tablename__ = "badges"
@@ -32,6 +42,14 @@ class Badge(Base):
     assigned_recruiter_id = Column(Integer, ForeignKey("recruiters.id"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    business_date = Column(Date, default=business_today)  # Office date of the visit
+    
+    __table_args__ = (
+        Index("ix_badges_day_recruiter_time", "business_date", "assigned_recruiter_id", "appointment_time"),
+        Index("ix_badges_day_status", "business_date", "status"),
+        Index("ix_badges_created_at", "created_at"),
+        {"sqlite_autoincrement": True},  # Ids are never reused (archived visits keep theirs)
+    )
 
 class Fingerprint(Base):
     __tablename__ = "fingerprints"
@@ -48,6 +66,14 @@ class Fingerprint(Base):
     assigned_recruiter_id = Column(Integer, ForeignKey("recruiters.id"), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    business_date = Column(Date, default=business_today)  # Office date of the visit
+    
+    __table_args__ = (
+        Index("ix_fingerprints_day_recruiter_time", "business_date", "assigned_recruiter_id", "appointment_time"),
+        Index("ix_fingerprints_day_status", "business_date", "status"),
+        Index("ix_fingerprints_created_at", "created_at"),
+        {"sqlite_autoincrement": True},  # Ids are never reused (archived visits keep theirs)
+    )
 
 class TeamVisit(Base):
     __tablename__ = "team_visits"
@@ -64,5 +90,13 @@ class TeamVisit(Base):
     notified_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    business_date = Column(Date, default=business_today)  # Office date of the visit
+    
+    __table_args__ = (
+        Index("ix_team_visits_member_created", "team_member_id", "created_at"),
+        Index("ix_team_visits_day_status", "business_date", "status"),
+        Index("ix_team_visits_created_at", "created_at"),
+        {"sqlite_autoincrement": True},  # Ids are never reused (archived visits keep theirs)
+    )
 
 
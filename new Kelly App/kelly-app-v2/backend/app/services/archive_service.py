@@ -0,0 +1,111 @@
+"""
+Hot/cold archival of old sessions and visits
+Completed info sessions and visits whose office date is more than ARCHIVE_AFTER_DAYS
+ago are moved to the *_archive tables, so the hot tables that the boards and lists
+read stay sized to recent activity. Archived rows are found through the archive
+search API (/api/archive).
+
+Rows move in batches of ARCHIVE_BATCH_SIZE, each batch copied and deleted in one
+transaction, so the write lock is held briefly and a failure never loses or
+duplicates rows. Runs every ARCHIVE_INTERVAL_HOURS (0 disables it) and on demand.
+"""
+from datetime import date, timedelta
+from typing import Dict, Optional
+import os
+
+from sqlalchemy import delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.archive import (
+    ArchivedInfoSession, ArchivedNewHireOrientation, ArchivedBadge, ArchivedFingerprint, ArchivedTeamVisit
+)
+from app.models.info_session import InfoSession
+from app.models.visit import NewHireOrientation, Badge, Fingerprint, TeamVisit
+from app.services.business_day import business_today
+from app.services.event_broker import publish_event
+
+# Days a session or visit stays in the hot tables (keep it above SERVICE_AVERAGE_DAYS
+# so recruiter service averages still see their whole window)
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+# Hours between archive runs while the server is up (0 disables it)
+ARCHIVE_INTERVAL_HOURS = float(os.getenv("ARCHIVE_INTERVAL_HOURS", "24"))
+
+if ARCHIVE_AFTER_DAYS < 1:
+    raise ValueError(f"ARCHIVE_AFTER_DAYS must be at least 1, got {ARCHIVE_AFTER_DAYS}")
+if ARCHIVE_BATCH_SIZE < 1:
+    raise ValueError(f"ARCHIVE_BATCH_SIZE must be at least 1, got {ARCHIVE_BATCH_SIZE}")
+
+# Visit kind (as in the visits API) -> (hot model, archive model)
+VISIT_ARCHIVES = {
+    "new-hire-orientation": (NewHireOrientation, ArchivedNewHireOrientation),
+    "badges": (Badge, ArchivedBadge),
+    "fingerprints": (Fingerprint, ArchivedFingerprint),
+    "team-visit": (TeamVisit, ArchivedTeamVisit),
+}
+
+def archive_horizon(today: Optional[date] = None) -> date:
+    """Rows with an office date before this one are archived"""
+    return (today or business_today()) - timedelta(days=ARCHIVE_AFTER_DAYS)
+
+def _move_rows(db: Session, source, target, condition) -> int:
+    """Copy the matching rows into the archive table and delete them from the hot one (no commit)"""
+    columns = [column.name for column in source.__table__.columns]
+    db.execute(insert(target.__table__).from_select(columns, select(*source.__table__.columns).where(condition)))
+    return db.execute(delete(source.__table__).where(condition)).rowcount
+
+def archive_info_sessions(db: Session, horizon: date) -> Dict[str, int]:
+    """Move completed sessions from before horizon (their step progress is on the row)"""
+    # The session holding the newest change_seq stays: the delta sync cursor is max(change_seq)
+    # and must never go back
+    newest_change = db.scalar(select(func.max(InfoSession.change_seq))) or 0
+    moved = {"info_sessions": 0}
+    while True:
+        ids = db.scalars(select(InfoSession.id).where(
+            InfoSession.business_date < horizon,
+            InfoSession.status == "completed",
+            or_(InfoSession.change_seq.is_(None), InfoSession.change_seq < newest_change)
+        ).limit(ARCHIVE_BATCH_SIZE)).all()
+        if not ids:
+            return moved
+        moved["info_sessions"] += _move_rows(db, InfoSession, ArchivedInfoSession, InfoSession.id.in_(ids))
+        db.commit()
+
+def archive_visits(db: Session, horizon: date) -> Dict[str, int]:
+    """Move visits (any status) from before horizon"""
+    moved = {}
+    for model, archive in VISIT_ARCHIVES.values():
+        moved[model.__tablename__] = 0
+        while True:
+            ids = db.scalars(select(model.id).where(model.business_date < horizon).limit(ARCHIVE_BATCH_SIZE)).all()
+            if not ids:
+                break
+            moved[model.__tablename__] += _move_rows(db, model, archive, model.id.in_(ids))
+            db.commit()
+    return moved
+
+def archive_old_records(db: Session, today: Optional[date] = None) -> Dict[str, int]:
+    """Move everything older than the horizon to the archive; rows moved per hot table"""
+    horizon = archive_horizon(today)
+    try:
+        moved = archive_info_sessions(db, horizon)
+        moved.update(archive_visits(db, horizon))
+    except Exception:
+        db.rollback()
+        raise
+    return moved
+
+def run_archive() -> Dict[str, int]:
+    """Archive with its own session and tell open dashboards to reload what moved"""
+    db = SessionLocal()
+    try:
+        moved = archive_old_records(db)
+    finally:
+        db.close()
+    if moved["info_sessions"]:
+        publish_event("sessions", "sessions.archived", {"count": moved["info_sessions"]})
+    visits_moved = sum(count for table, count in moved.items() if table != "info_sessions")
+    if visits_moved:
+        publish_event("visits", "visits.archived", {"count": visits_moved})
+    return moved
@@ -0,0 +1,27 @@
+"""
+Business day of the office: the calendar date in the office's timezone
+Sessions and visits store it at insert (business_date), so "today" matches what the
+front desk sees (the frontend groups by Miami time) and day-scoped queries compare
+an indexed column instead of converting created_at, which is stored in UTC
+"""
+from datetime import date, datetime, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import os
+
+OFFICE_TIMEZONE = os.getenv("OFFICE_TIMEZONE", "America/New_York")
+
+try:
+    office_timezone = ZoneInfo(OFFICE_TIMEZONE)
+except (ZoneInfoNotFoundError, ValueError):
+    raise ValueError(f"Unknown OFFICE_TIMEZONE '{OFFICE_TIMEZONE}' (on Windows install tzdata)")
+
+def business_date(moment: datetime) -> date:
+    """Office date of a moment; naive datetimes are UTC (like created_at)"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(office_timezone).date()
+
+def business_today(now: Optional[datetime] = None) -> date:
+    """Today's date at the office"""
+    return business_date(now or datetime.now(timezone.utc))
@@ -0,0 +1,127 @@
+"""
+In-process publish/subscribe for dashboard events (Server-Sent Events)
+Write handlers publish a small event after they commit and every open
+/api/events/stream connection gets it pushed, so screens only fetch data
+when something actually changed instead of polling.
+
+Streams are closed after STREAM_LIFETIME_SECONDS so the server can restart
+or reload without waiting on open dashboards; EventSource reconnects on its
+own and sends Last-Event-ID, and the events it missed in between are
+replayed from a short in-memory backlog.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+import asyncio
+import json
+import threading
+import time
+
+# Topics a client can subscribe to
+TOPICS = ("sessions", "recruiters", "visits")
+# Events buffered per connection; a client that falls this far behind is told to resync
+MAX_QUEUED_EVENTS = 100
+# Recent events kept for replay on reconnect
+BACKLOG_SIZE = 500
+# Seconds a stream stays open before the client is asked to reconnect
+STREAM_LIFETIME_SECONDS = 15
+# Reconnect delay suggested to EventSource clients (milliseconds)
+RETRY_MILLISECONDS = 1000
+
+@dataclass(eq=False)
+class EventSubscriber:
+    """One open event stream"""
+    loop: asyncio.AbstractEventLoop
+    topics: Set[str]
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(maxsize=MAX_QUEUED_EVENTS))
+    overflowed: bool = False
+
+_subscribers: Set[EventSubscriber] = set()
+_backlog: Deque[Tuple[int, str, str]] = deque(maxlen=BACKLOG_SIZE)  # (event id, topic, message)
+_last_event_id = 0
+_lock = threading.Lock()
+
+def _format_event(event_id: Optional[int], event_type: str, data: Dict) -> str:
+    """SSE wire format"""
+    id_line = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{id_line}event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def subscribe(topics: Optional[Set[str]] = None, last_event_id: Optional[int] = None) -> EventSubscriber:
+    """
+    Register a stream for the given topics (all topics if None); call from the event loop
+    With last_event_id (a reconnect) the events published since then are queued first,
+    or a resync event if they are no longer in the backlog
+    """
+    subscriber = EventSubscriber(loop=asyncio.get_running_loop(), topics=set(topics or TOPICS))
+    with _lock:
+        if last_event_id is not None:
+            oldest_kept = _backlog[0][0] if _backlog else _last_event_id + 1
+            if last_event_id > _last_event_id or last_event_id + 1 < oldest_kept:
+                # Server restarted or the backlog moved on: the client must reload its data
+                replay = [_format_event(_last_event_id, "resync", {})]
+            else:
+                replay = [
+                    message for event_id, topic, message in _backlog
+                    if event_id > last_event_id and topic in subscriber.topics
+                ]
+            for message in replay[-MAX_QUEUED_EVENTS:]:
+                subscriber.queue.put_nowait(message)
+        _subscribers.add(subscriber)
+    return subscriber
+
+def unsubscribe(subscriber: EventSubscriber):
+    with _lock:
+        _subscribers.discard(subscriber)
+
+def subscriber_count() -> int:
+    with _lock:
+        return len(_subscribers)
+
+def _deliver(subscriber: EventSubscriber, message: str):
+    """Queue a message on the subscriber's loop; on overflow drop the backlog and ask for a resync"""
+    if subscriber.overflowed:
+        return
+    try:
+        subscriber.queue.put_nowait(message)
+    except asyncio.QueueFull:
+        subscriber.overflowed = True
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(_format_event(None, "resync", {}))
+
+def publish_event(topic: str, event_type: str, data: Optional[Dict] = None):
+    """
+    Push an event to every stream subscribed to topic
+    Safe to call from request handlers and from worker threads; never blocks
+    """
+    global _last_event_id
+    with _lock:
+        _last_event_id += 1
+        message = _format_event(_last_event_id, event_type, dict(data or {}, topic=topic))
+        _backlog.append((_last_event_id, topic, message))
+        subscribers: List[EventSubscriber] = [subscriber for subscriber in _subscribers if topic in subscriber.topics]
+    for subscriber in subscribers:
+        try:
+            subscriber.loop.call_soon_threadsafe(_deliver, subscriber, message)
+        except RuntimeError:
+            # Loop already closed: the connection is gone
+            unsubscribe(subscriber)
+
+async def event_stream(subscriber: EventSubscriber) -> AsyncIterator[str]:
+    """SSE body for one subscriber: queued events until the stream lifetime is over"""
+    deadline = time.monotonic() + STREAM_LIFETIME_SECONDS
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                message = await asyncio.wait_for(subscriber.queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            if subscriber.overflowed and subscriber.queue.empty():
+                subscriber.overflowed = False
+            yield message
+    finally:
+        unsubscribe(subscriber)
@@ -0,0 +1,298 @@
+"""
+In-memory index for exclusion list name matching
+Keeps an n-gram inverted index of the uppercase names so a name check
+does not need a full scan of the exclusion_list table, plus a token index
+(trigrams and phonetic keys of the normalized name tokens) for fuzzy matching
+"""
+from sqlalchemy.orm import Session
+from collections import Counter
+from dataclasses import dataclass
+from itertools import chain
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+import threading
+
+from app.models.exclusion_list import ExclusionList
+from app.services.name_matching import min_token_similarity, name_keys, phonetic_key, query_tokens, token_similarity
+from app.services.exclusion_versions import active_rows_filter
+
+# Length of the substrings stored in the inverted index
+GRAM_SIZE = 3
+# Stop intersecting posting lists once the next one is this many times longer than the candidates
+INTERSECT_RATIO = 4
+# Length of the n-grams of name tokens used to find fuzzy candidates
+TOKEN_GRAM_SIZE = 2
+# Query tokens whose similar vocabulary tokens are kept per index (first names repeat a lot)
+SIMILAR_TOKEN_CACHE_SIZE = 4096
+
+@dataclass(frozen=True)
+class ExclusionEntry:
+    """Read-only snapshot of an exclusion list row (same attributes as ExclusionList)"""
+    id: int
+    name: str
+    code: Optional[str] = None
+    dob: Optional[date] = None
+    ssn: Optional[str] = None
+    notes: Optional[str] = None
+    name_normalized: Optional[str] = None
+    name_phonetic: Optional[str] = None
+
+def _grams(text: str) -> set:
+    """All distinct substrings of GRAM_SIZE characters in text"""
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+def _token_grams(token: str) -> set:
+    """
+    Distinct n-grams of a name token padded with "$" (short tokens still have some)
+    One edit changes at most TOKEN_GRAM_SIZE of them, which is what the candidate filter relies on
+    """
+    padded = f"${token}$"
+    return {padded[i:i + TOKEN_GRAM_SIZE] for i in range(len(padded) - TOKEN_GRAM_SIZE + 1)}
+
+class ExclusionIndex:
+    """
+    Immutable n-gram index over the exclusion list
+    Every substring query of GRAM_SIZE or more characters can only match names
+    that contain all of its n-grams, so candidates come from intersecting the
+    posting lists and are then verified with a plain substring check.
+    This gives exactly the same results as the previous LIKE '%...%' search.
+    """
+
+    def __init__(self, entries: List[ExclusionEntry]):
+        self.entries: Dict[int, ExclusionEntry] = {}
+        self._names: Dict[int, str] = {}
+        postings: Dict[str, List[int]] = {}
+        for entry in sorted(entries, key=lambda e: e.id):
+            name_upper = (entry.name or "").upper()
+            self.entries[entry.id] = entry
+            self._names[entry.id] = name_upper
+            for gram in _grams(name_upper):
+                postings.setdefault(gram, []).append(entry.id)
+        self._postings: Dict[str, Tuple[int, ...]] = {gram: tuple(ids) for gram, ids in postings.items()}
+        self._build_token_index()
+
+    def _build_token_index(self):
+        """
+        Token-level structures for fuzzy search, built from the stored name keys
+        Fuzzy lookups work on the vocabulary of distinct tokens (much smaller
+        than the list) and only then expand to the entries using those tokens
+        """
+        self._entry_tokens: Dict[int, Tuple[str, ...]] = {}
+        token_entries: Dict[str, List[int]] = {}
+        self._token_phonetic: Dict[str, str] = {}
+        for entry_id, entry in self.entries.items():
+            normalized, phonetic = entry.name_normalized, entry.name_phonetic
+            if normalized is None:
+                normalized, phonetic = name_keys(entry.name)
+            tokens = tuple(normalized.split()) if normalized else ()
+            phonetics = phonetic.split() if phonetic else []
+            self._entry_tokens[entry_id] = tokens
+            for position, token in enumerate(tokens):
+                ids = token_entries.setdefault(token, [])
+                if not ids or ids[-1] != entry_id:
+                    ids.append(entry_id)
+                if token not in self._token_phonetic:
+                    self._token_phonetic[token] = phonetics[position] if position < len(phonetics) else phonetic_key(token)
+        self._token_entries: Dict[str, Tuple[int, ...]] = {token: tuple(ids) for token, ids in token_entries.items()}
+
+        length_gram_tokens: Dict[Tuple[str, int], List[str]] = {}
+        phonetic_tokens: Dict[str, List[str]] = {}
+        self._token_gram_count: Dict[str, int] = {}
+        length_tokens: Dict[int, List[str]] = {}
+        for token, key in self._token_phonetic.items():
+            length_tokens.setdefault(len(token), []).append(token)
+            grams = _token_grams(token)
+            self._token_gram_count[token] = len(grams)
+            for gram in grams:
+                length_gram_tokens.setdefault((gram, len(token)), []).append(token)
+            phonetic_tokens.setdefault(key, []).append(token)
+        # (n-gram, token length) -> vocabulary tokens of that length with the n-gram
+        self._length_gram_tokens: Dict[Tuple[str, int], Tuple[str, ...]] = {
+            gram_length: tuple(tokens) for gram_length, tokens in length_gram_tokens.items()
+        }
+        self._phonetic_tokens: Dict[str, Tuple[str, ...]] = {key: tuple(tokens) for key, tokens in phonetic_tokens.items()}
+        self._length_tokens: Dict[int, Tuple[str, ...]] = {length: tuple(tokens) for length, tokens in length_tokens.items()}
+        self._similar_cache: Dict[Tuple[str, float], Dict[str, float]] = {}
+        self._similar_cache_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _posting_lists(self, term: str) -> Optional[List[Tuple[int, ...]]]:
+        """Posting lists of the n-grams of term, or None if term is too short to narrow the search"""
+        if len(term) < GRAM_SIZE:
+            return None
+        return [self._postings.get(gram, ()) for gram in _grams(term)]
+
+    def search(self, first_name_upper: str, last_name_upper: str) -> List[ExclusionEntry]:
+        """Entries whose name contains both terms, ordered by id"""
+        lists = [
+            ids
+            for posting_lists in (self._posting_lists(first_name_upper), self._posting_lists(last_name_upper))
+            if posting_lists is not None
+            for ids in posting_lists
+        ]
+
+        if not lists:
+            candidates = self._names.keys()
+        else:
+            # Smallest list first (usually a surname n-gram); once the candidates are few,
+            # checking their names is cheaper than intersecting the long lists of common n-grams
+            lists.sort(key=len)
+            candidates = set(lists[0])
+            for ids in lists[1:]:
+                if not candidates or len(ids) > INTERSECT_RATIO * len(candidates):
+                    break
+                candidates.intersection_update(ids)
+
+        matches = []
+        for entry_id in sorted(candidates):
+            name_upper = self._names[entry_id]
+            if first_name_upper in name_upper and last_name_upper in name_upper:
+                matches.append(self.entries[entry_id])
+        return matches
+
+    def _similar_tokens(self, token: str, min_similarity: float) -> Dict[str, float]:
+        """
+        Vocabulary tokens similar to token, with their similarity (cached per index)
+        Candidates have the same phonetic key, or a compatible length and enough
+        shared n-grams to be within the allowed edit distance (q-gram filter);
+        only those are scored with the bounded edit distance
+        """
+        cache_key = (token, min_similarity)
+        similar = self._similar_cache.get(cache_key)
+        if similar is not None:
+            return similar
+
+        grams = _token_grams(token)
+        query_gram_count = len(grams)
+
+        # Edit distance allowed for a vocabulary token of each length that can still be close enough
+        lost_by_length: Dict[int, int] = {}
+        for candidate_length in range(1, int(len(token) / min_similarity) + 1 if min_similarity > 0 else 256):
+            max_distance = int((1 - min_similarity) * max(len(token), candidate_length))
+            if abs(candidate_length - len(token)) <= max_distance:
+                lost_by_length[candidate_length] = TOKEN_GRAM_SIZE * max_distance
+
+        key = phonetic_key(token)
+        same_sound = set(self._phonetic_tokens.get(key, ()))
+        candidates = set(same_sound)
+        # Shared n-grams are counted per group of vocabulary token lengths allowing the same
+        # edit distance (lengths that cannot be close enough are never counted). Each edit loses
+        # at most TOKEN_GRAM_SIZE n-grams from either token; walking the most shared first stops
+        # at the first token that cannot pass
+        lengths_by_lost: Dict[int, List[int]] = {}
+        for candidate_length, lost in lost_by_length.items():
+            lengths_by_lost.setdefault(lost, []).append(candidate_length)
+        length_grams = self._length_gram_tokens
+        gram_count_of = self._token_gram_count
+        for lost, lengths in lengths_by_lost.items():
+            shared = Counter(chain.from_iterable(
+                length_grams.get((gram, candidate_length), ()) for gram in grams for candidate_length in lengths
+            ))
+            for candidate, count in shared.most_common():
+                if count + lost < query_gram_count:
+                    break
+                if count + lost >= gram_count_of[candidate]:
+                    candidates.add(candidate)
+        # At low thresholds a token can be close enough without sharing any n-gram
+        for candidate_length, lost in lost_by_length.items():
+            if lost >= query_gram_count:
+                for candidate in self._length_tokens.get(candidate_length, ()):
+                    if lost >= gram_count_of[candidate]:
+                        candidates.add(candidate)
+
+        similar = {}
+        for candidate in candidates:
+            similarity = token_similarity(token, candidate, min_similarity, same_sound=candidate in same_sound)
+            if similarity:
+                similar[candidate] = similarity
+
+        with self._similar_cache_lock:
+            if len(self._similar_cache) >= SIMILAR_TOKEN_CACHE_SIZE:
+                self._similar_cache.clear()
+            self._similar_cache[cache_key] = similar
+        return similar
+
+    def search_fuzzy(self, first_name: str, last_name: str, threshold: float) -> List[Tuple[ExclusionEntry, float]]:
+        """
+        Entries whose name tokens are close to every token of first + last name
+        The score is the mean, over the query tokens, of the best token similarity
+        in the entry (word order does not matter). Returns (entry, score) pairs
+        scoring at least threshold, best first
+        """
+        tokens = list(dict.fromkeys(query_tokens(first_name, last_name)))
+        if not tokens:
+            return []
+        min_similarity = min_token_similarity(threshold)
+
+        similar_by_token = []
+        for token in tokens:
+            similar = self._similar_tokens(token, min_similarity)
+            if not similar:
+                return []
+            similar_by_token.append(similar)
+
+        candidate_sets = []
+        for similar in similar_by_token:
+            ids = set()
+            for candidate in similar:
+                ids.update(self._token_entries[candidate])
+            candidate_sets.append(ids)
+        candidate_sets.sort(key=len)
+        candidates = candidate_sets[0]
+        for ids in candidate_sets[1:]:
+            candidates = candidates & ids
+            if not candidates:
+                return []
+
+        matches = []
+        for entry_id in candidates:
+            entry_tokens = self._entry_tokens[entry_id]
+            total = sum(max(similar.get(token, 0.0) for token in entry_tokens) for similar in similar_by_token)
+            score = total / len(tokens)
+            if score >= threshold:
+                matches.append((self.entries[entry_id], round(score, 3)))
+        matches.sort(key=lambda match: (-match[1], match[0].id))
+        return matches
+
+_index: Optional[ExclusionIndex] = None
+_rebuild_lock = threading.Lock()
+
+def build_exclusion_index(db: Session) -> ExclusionIndex:
+    """Load the active exclusion list version from the database and build a new index"""
+    rows = db.query(
+        ExclusionList.id,
+        ExclusionList.name,
+        ExclusionList.code,
+        ExclusionList.dob,
+        ExclusionList.ssn,
+        ExclusionList.notes,
+        ExclusionList.name_normalized,
+        ExclusionList.name_phonetic
+    ).filter(active_rows_filter(db)).all()
+    return ExclusionIndex([
+        ExclusionEntry(
+            id=row.id, name=row.name, code=row.code, dob=row.dob, ssn=row.ssn, notes=row.notes,
+            name_normalized=row.name_normalized, name_phonetic=row.name_phonetic
+        )
+        for row in rows
+    ])
+
+def rebuild_exclusion_index(db: Session) -> ExclusionIndex:
+    """
+    Rebuild the index and swap it in atomically
+    Readers keep using the previous index until the new one is complete
+    """
+    global _index
+    with _rebuild_lock:
+        new_index = build_exclusion_index(db)
+        _index = new_index
+    return new_index
+
+def get_exclusion_index(db: Session) -> ExclusionIndex:
+    """Current index, built on first use if the app has not built it yet"""
+    index = _index
+    if index is None:
+        index = rebuild_exclusion_index(db)
+    return index
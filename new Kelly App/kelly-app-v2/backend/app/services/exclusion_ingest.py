@@ -0,0 +1,197 @@
+"""
+Bulk ingestion of the exclusion list (PC/RR list) from a DataFrame
+Cleans whole columns at once and writes with chunked executemany inserts
+instead of walking the rows and adding one ORM object at a time
+"""
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, update, bindparam
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import pandas as pd
+
+from app.models.exclusion_list import ExclusionList
+from app.services.name_matching import name_keys
+
+# Rows per executemany batch
+INSERT_CHUNK_SIZE = 5000
+
+def _clean_text_column(series: pd.Series) -> pd.Series:
+    """
+    Strip a column to text, None for NaN/empty values
+    Whole-number floats (Excel turns numeric columns with blanks into floats)
+    are written without the trailing '.0'
+    """
+    text = series.astype(str)
+    if pd.api.types.is_float_dtype(series):
+        whole = series.notna() & (series % 1 == 0)
+        text[whole] = series[whole].astype("int64").astype(str)
+    text = text.str.strip()
+    invalid = series.isna() | text.isin(["", "nan", "None", "NaT"])
+    return text.astype(object).where(~invalid, None)
+
+def _parse_dob_column(series: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    Parse a DOB column to dates
+    Returns (dates, failed) where failed marks values that were present but unparseable
+    """
+    present = series.notna() & (series.astype(str).str.strip() != "")
+    parsed = pd.to_datetime(series.where(present), errors="coerce")
+    # Values written in a different format than the inferred one: parse those element-wise
+    retry = present & parsed.isna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(series[retry].astype(str), errors="coerce", format="mixed")
+    failed = present & parsed.isna()
+    dates = parsed.dt.date.astype(object).where(parsed.notna(), None)
+    return dates, failed
+
+def prepare_exclusion_records(df: pd.DataFrame, first_row_number: int = 2) -> Tuple[List[Dict], List[str]]:
+    """
+    Turn a DataFrame (columns already lowercased) into insertable records
+    Names are uppercased for storage; rows without a name are skipped
+    The fuzzy matching keys (normalized name, phonetic keys) are computed here, once per upload
+    Returns (records, errors) - errors use the "Row N: message" format,
+    where N is the spreadsheet row (header is row 1)
+    """
+    errors: List[str] = []
+    row_numbers = pd.Series(range(first_row_number, first_row_number + len(df)), index=df.index)
+
+    names = _clean_text_column(df["name"]).str.upper()
+    keep = names.notna()
+
+    def optional_text(column: str) -> pd.Series:
+        if column in df.columns:
+            return _clean_text_column(df[column])
+        return pd.Series([None] * len(df), index=df.index, dtype=object)
+
+    codes = optional_text("code")
+    ssns = optional_text("ssn")
+
+    if "dob" in df.columns:
+        dobs, dob_failed = _parse_dob_column(df["dob"])
+        for row_number, value in zip(row_numbers[dob_failed & keep], df["dob"][dob_failed & keep]):
+            errors.append(f"Row {row_number}: Could not parse DOB '{value}'")
+    else:
+        dobs = pd.Series([None] * len(df), index=df.index, dtype=object)
+
+    keys = names[keep].map(name_keys)
+
+    frame = pd.DataFrame({
+        "name": names,
+        "name_normalized": keys.map(lambda key: key[0]),
+        "name_phonetic": keys.map(lambda key: key[1]),
+        "code": codes,
+        "dob": dobs,
+        "ssn": ssns,
+        "row_number": row_numbers,
+    })[keep]
+    frame = frame.astype(object).where(frame.notna(), None)
+    records = frame.to_dict("records")
+    return records, errors
+
+def insert_exclusion_records(
+    db: Session,
+    records: List[Dict],
+    version_id: Optional[int] = None,
+    commit_chunks: bool = False,
+    chunk_size: int = INSERT_CHUNK_SIZE
+) -> Tuple[int, List[str]]:
+    """
+    Insert prepared records in chunks with executemany
+    If a chunk fails, its rows are retried one by one so the failing rows
+    can be reported without losing the rest of the chunk
+    With commit_chunks each chunk is committed on its own, which releases the
+    SQLite write lock between chunks (only safe for rows of an inactive version);
+    otherwise the caller owns the transaction
+    """
+    added_count = 0
+    errors: List[str] = []
+    statement = insert(ExclusionList.__table__)
+
+    for start in range(0, len(records), chunk_size):
+        chunk = records[start:start + chunk_size]
+        rows = [
+            {
+                "name": record["name"],
+                "name_normalized": record["name_normalized"],
+                "name_phonetic": record["name_phonetic"],
+                "code": record["code"],
+                "dob": record["dob"],
+                "ssn": record["ssn"],
+                "version_id": version_id
+            }
+            for record in chunk
+        ]
+        try:
+            with db.begin_nested():
+                db.execute(statement, rows)
+            added_count += len(rows)
+        except Exception:
+            for record, row in zip(chunk, rows):
+                try:
+                    with db.begin_nested():
+                        db.execute(statement, row)
+                    added_count += 1
+                except Exception as e:
+                    errors.append(f"Row {record.get('row_number')}: {str(e)}")
+        if commit_chunks:
+            db.commit()
+
+    return added_count, errors
+
+def ingest_exclusion_frame(db: Session, df: pd.DataFrame, version_id: Optional[int] = None, commit_chunks: bool = False) -> Tuple[int, List[str]]:
+    """Prepare and insert a whole DataFrame; returns (added_count, errors)"""
+    records, errors = prepare_exclusion_records(df)
+    added_count, insert_errors = insert_exclusion_records(db, records, version_id=version_id, commit_chunks=commit_chunks)
+    return added_count, errors + insert_errors
+
+def ingest_exclusion_chunks(
+    db: Session,
+    chunks: Iterable[Tuple[pd.DataFrame, int]],
+    version_id: Optional[int] = None,
+    commit_chunks: bool = False,
+    progress: Optional[Callable[[int, int, List[str]], None]] = None
+) -> Tuple[int, List[str]]:
+    """
+    Prepare and insert a stream of (DataFrame, first row number) chunks
+    Only one chunk is held in memory at a time; returns (added_count, errors)
+    progress, if given, is called after each chunk with (rows_processed, added_count, errors)
+    """
+    rows_processed = 0
+    added_count = 0
+    errors: List[str] = []
+    for df, first_row_number in chunks:
+        records, chunk_errors = prepare_exclusion_records(df, first_row_number=first_row_number)
+        chunk_added, insert_errors = insert_exclusion_records(db, records, version_id=version_id, commit_chunks=commit_chunks)
+        added_count += chunk_added
+        errors.extend(chunk_errors)
+        errors.extend(insert_errors)
+        rows_processed += len(df)
+        if progress:
+            progress(rows_processed, added_count, errors)
+    return added_count, errors
+
+def backfill_exclusion_name_keys(db: Session, chunk_size: int = INSERT_CHUNK_SIZE) -> int:
+    """
+    Compute the fuzzy matching keys for rows loaded before they were stored
+    Returns the number of rows updated
+    """
+    statement = (
+        update(ExclusionList.__table__)
+        .where(ExclusionList.__table__.c.id == bindparam("row_id"))
+        .values(name_normalized=bindparam("normalized"), name_phonetic=bindparam("phonetic"))
+    )
+    updated = 0
+    while True:
+        rows = db.query(ExclusionList.id, ExclusionList.name).filter(
+            ExclusionList.name_normalized.is_(None)
+        ).order_by(ExclusionList.id).limit(chunk_size).all()
+        params = []
+        for row in rows:
+            normalized, phonetic = name_keys(row.name)
+            # Names without letters or digits get an empty key so they are not picked up again
+            params.append({"row_id": row.id, "normalized": normalized or "", "phonetic": phonetic or ""})
+        if not params:
+            break
+        db.execute(statement, params)
+        db.commit()
+        updated += len(params)
+    return updated
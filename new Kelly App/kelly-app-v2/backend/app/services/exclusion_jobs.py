@@ -0,0 +1,173 @@
+"""
+Background jobs for exclusion list uploads
+Parsing and inserting a large list runs in a worker thread, off the event loop,
+so kiosk registrations and dashboard polling keep being served while it loads.
+Job state lives in this process and is polled through /api/exclusion-list/jobs/{id}.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, TypeVar
+import os
+import threading
+import time
+import uuid
+
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.services.exclusion_index import rebuild_exclusion_index
+from app.services.exclusion_ingest import ingest_exclusion_chunks
+from app.services.exclusion_service import OPEN_SESSION_STATUSES, rematch_info_sessions
+from app.services.exclusion_reader import estimate_data_rows, iter_exclusion_chunks
+from app.services.exclusion_versions import activate_version, create_staging_version, discard_version
+
+# Finished jobs kept for polling (oldest are dropped first)
+MAX_FINISHED_JOBS = 20
+
+T = TypeVar("T")
+
+@dataclass
+class UploadJob:
+    """Progress of one exclusion list upload"""
+    id: str
+    filename: Optional[str]
+    status: str = "queued"  # queued, running, completed, failed
+    total_rows: Optional[int] = None  # Estimate, None if unknown
+    rows_processed: int = 0
+    added: int = 0
+    errors: List[str] = field(default_factory=list)
+    error: Optional[str] = None  # Fatal error message if the job failed
+    version_id: Optional[int] = None
+    rematch_open_sessions: bool = False  # Re-check open info sessions after the swap
+    rematched: int = 0
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    _started_clock: Optional[float] = None
+
+    def eta_seconds(self) -> Optional[int]:
+        """Remaining seconds estimated from the rate so far"""
+        if self.status != "running" or not self.total_rows or not self.rows_processed or self._started_clock is None:
+            return None
+        elapsed = time.monotonic() - self._started_clock
+        remaining_rows = max(self.total_rows - self.rows_processed, 0)
+        return int(elapsed / self.rows_processed * remaining_rows)
+
+    def to_dict(self) -> Dict:
+        percent = None
+        if self.status == "completed":
+            percent = 100
+        elif self.total_rows:
+            percent = min(int(self.rows_processed * 100 / self.total_rows), 99)
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "total_rows": self.total_rows,
+            "rows_processed": self.rows_processed,
+            "added": self.added,
+            "errors": list(self.errors) if self.errors else None,
+            "error": self.error,
+            "version_id": self.version_id,
+            "rematched": self.rematched,
+            "percent": percent,
+            "eta_seconds": self.eta_seconds(),
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+# One worker: uploads replace the whole list, so running them in order is enough
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="exclusion-upload")
+_jobs: Dict[str, UploadJob] = {}
+_jobs_lock = threading.Lock()
+
+def get_upload_job(job_id: str) -> Optional[UploadJob]:
+    """Job by id, or None if unknown (or already evicted)"""
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+def _evict_finished_jobs():
+    """Keep only the most recent finished jobs (caller holds _jobs_lock)"""
+    finished = [job for job in _jobs.values() if job.status in ("completed", "failed")]
+    finished.sort(key=lambda job: job.created_at)
+    for job in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+        del _jobs[job.id]
+
+def _run_upload_job(job: UploadJob, path: str):
+    """Worker: load the spooled file into a staging version and swap it in"""
+    db = SessionLocal()
+    version = None
+    try:
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        job._started_clock = time.monotonic()
+        job.total_rows = estimate_data_rows(path)
+
+        def report(rows_processed: int, added_count: int, errors: List[str]):
+            job.rows_processed = rows_processed
+            job.added = added_count
+            job.errors = list(errors)
+
+        version = create_staging_version(db, job.filename)
+        job.version_id = version.id
+        added_count, errors = ingest_exclusion_chunks(
+            db, iter_exclusion_chunks(path), version_id=version.id, commit_chunks=True, progress=report
+        )
+        activate_version(db, version, row_count=added_count)
+        version = None  # Swapped in: nothing to discard from here on
+        rebuild_exclusion_index(db)
+        if job.rematch_open_sessions:
+            try:
+                job.rematched = rematch_info_sessions(db, statuses=OPEN_SESSION_STATUSES)
+            except Exception as e:
+                print(f"Error re-matching open info sessions after upload {job.id}: {e}")
+                db.rollback()
+
+        job.added = added_count
+        job.errors = errors
+        job.status = "completed"
+    except Exception as e:
+        print(f"Error processing exclusion list upload {job.id}: {e}")
+        db.rollback()
+        if version is not None:
+            try:
+                discard_version(db, version)
+            except Exception as discard_error:
+                print(f"Error discarding exclusion list version {version.id}: {discard_error}")
+        job.error = f"Error processing file: {str(e)}"
+        job.status = "failed"
+    finally:
+        job.finished_at = datetime.utcnow()
+        db.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def start_upload_job(path: str, filename: Optional[str], rematch_open_sessions: bool = False) -> UploadJob:
+    """
+    Queue an upload of an already spooled file; the job owns (and deletes) the file
+    Returns immediately with the job in "queued" state
+    """
+    job = UploadJob(id=uuid.uuid4().hex, filename=filename, rematch_open_sessions=rematch_open_sessions)
+    with _jobs_lock:
+        _evict_finished_jobs()
+        _jobs[job.id] = job
+    _executor.submit(_run_upload_job, job, path)
+    return job
+
+def run_list_change(change: Callable[[Session], T]) -> "Future[T]":
+    """
+    Run change(db) on the upload worker with its own session (clear, rollback)
+    It waits for queued uploads instead of racing them, and the index rebuild and
+    re-match it does stay off the event loop
+    """
+    def run() -> T:
+        db = SessionLocal()
+        try:
+            return change(db)
+        finally:
+            db.close()
+    return _executor.submit(run)
@@ -0,0 +1,161 @@
+"""
+Streaming reader for exclusion list files
+Spools the upload to a temporary file and reads it back in fixed-size chunks
+(openpyxl read-only iterator for .xlsx, csv module for .csv) so memory use does
+not grow with the size of the workbook
+"""
+from fastapi import UploadFile
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+import csv
+import os
+import tempfile
+
+import pandas as pd
+
+# Rows per chunk handed to the ingestion pipeline
+READ_CHUNK_SIZE = 5000
+# Bytes copied per read while spooling the upload to disk
+SPOOL_BLOCK_SIZE = 1024 * 1024
+
+SUPPORTED_EXTENSIONS = (".xlsx", ".xls", ".csv")
+REQUIRED_COLUMNS = ["name"]
+
+class MissingColumnsError(ValueError):
+    """The file header does not contain the required columns"""
+
+    def __init__(self, missing: List[str]):
+        self.missing = missing
+        super().__init__(f"Missing required columns: {', '.join(missing)}")
+
+async def spool_upload(file: UploadFile) -> str:
+    """Copy the upload to a temporary file block by block; returns its path (caller deletes it)"""
+    suffix = Path(file.filename or "").suffix.lower()
+    handle, path = tempfile.mkstemp(suffix=suffix, prefix="exclusion_")
+    try:
+        with os.fdopen(handle, "wb") as spool:
+            while True:
+                block = await file.read(SPOOL_BLOCK_SIZE)
+                if not block:
+                    break
+                spool.write(block)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+def _iter_xlsx_rows(path: str) -> Iterator[Sequence]:
+    """Rows of the first sheet as value tuples (header first), read-only mode"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def _iter_csv_rows(path: str) -> Iterator[Sequence]:
+    """Rows of a CSV file as lists of strings (header first)"""
+    with open(path, newline="", encoding="utf-8-sig", errors="replace") as handle:
+        yield from csv.reader(handle)
+
+def _iter_xls_rows(path: str) -> Iterator[Sequence]:
+    """
+    Rows of a legacy .xls workbook
+    openpyxl cannot stream .xls, so it goes through pandas; the format is
+    capped at 65,536 rows so memory stays bounded anyway
+    """
+    df = pd.read_excel(path, header=None, dtype=object)
+    for row in df.itertuples(index=False, name=None):
+        yield row
+
+def iter_file_rows(path: str) -> Iterator[Sequence]:
+    """Raw rows of an exclusion list file, header first"""
+    extension = Path(path).suffix.lower()
+    if extension == ".csv":
+        return _iter_csv_rows(path)
+    if extension == ".xls":
+        return _iter_xls_rows(path)
+    return _iter_xlsx_rows(path)
+
+def _normalize_header(header: Sequence) -> List[str]:
+    """Lowercase/strip column names; blank headers get a placeholder name"""
+    columns = []
+    for position, value in enumerate(header):
+        name = str(value).strip().lower() if value is not None else ""
+        columns.append(name if name and name != "nan" else f"unnamed_{position}")
+    return columns
+
+def _check_required_columns(columns: List[str]):
+    """Raise MissingColumnsError if a required column is missing"""
+    missing = [column for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise MissingColumnsError(missing)
+
+def check_exclusion_header(path: str):
+    """Read only the header row; raises MissingColumnsError if required columns are missing"""
+    rows = iter_file_rows(path)
+    try:
+        columns = _normalize_header(next(rows, None) or [])
+    finally:
+        close = getattr(rows, "close", None)
+        if close:
+            close()
+    _check_required_columns(columns)
+
+def estimate_data_rows(path: str) -> Optional[int]:
+    """
+    Cheap estimate of the number of data rows (for progress/ETA), or None if unknown
+    Uses the sheet dimension for .xlsx and a newline count for .csv
+    """
+    extension = Path(path).suffix.lower()
+    try:
+        if extension == ".csv":
+            lines = 0
+            with open(path, "rb") as handle:
+                while True:
+                    block = handle.read(SPOOL_BLOCK_SIZE)
+                    if not block:
+                        break
+                    lines += block.count(b"\n")
+            return max(lines - 1, 0)
+        if extension == ".xlsx":
+            from openpyxl import load_workbook
+
+            workbook = load_workbook(path, read_only=True, data_only=True)
+            try:
+                max_row = workbook.active.max_row
+            finally:
+                workbook.close()
+            return max(max_row - 1, 0) if max_row else None
+    except Exception:
+        return None
+    return None
+
+def iter_exclusion_chunks(path: str, chunk_size: int = READ_CHUNK_SIZE) -> Iterator[Tuple[pd.DataFrame, int]]:
+    """
+    Read an exclusion list file in chunks
+    Yields (DataFrame with normalized column names, spreadsheet row number of its first row)
+    Raises MissingColumnsError before yielding anything if the header is incomplete
+    """
+    rows = iter_file_rows(path)
+    try:
+        header = next(rows, None)
+        columns = _normalize_header(header or [])
+        _check_required_columns(columns)
+
+        width = len(columns)
+        first_row_number = 2  # Row 1 is the header
+        while True:
+            batch = list(islice(rows, chunk_size))
+            if not batch:
+                break
+            # Pad/trim ragged rows to the header width
+            batch = [tuple(row[:width]) + (None,) * (width - len(row)) for row in batch]
+            yield pd.DataFrame(batch, columns=columns, dtype=object), first_row_number
+            first_row_number += len(batch)
+    finally:
+        close = getattr(rows, "close", None)
+        if close:
+            close()
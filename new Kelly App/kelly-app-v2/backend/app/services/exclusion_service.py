@@ -2,42 +2,75 @@
 Service for checking exclusion list
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
-from app.models.exclusion_list import ExclusionList
-from typing import List, Optional
+from app.models.info_session import InfoSession
+from app.services.event_broker import publish_event
+from app.services.exclusion_index import ExclusionEntry, ExclusionIndex, get_exclusion_index
+from app.services.name_matching import EXCLUSION_FUZZY_MATCHING, EXCLUSION_FUZZY_THRESHOLD
+from typing import Dict, List, Optional, Sequence, Tuple
 
-def check_name_in_exclusion_list(db: Session, first_name: str, last_name: str) -> List[ExclusionList]:
+# Sessions still in the lobby (re-matched when the list is reloaded)
+OPEN_SESSION_STATUSES = ["registered", "in-progress"]
+
+def check_name_in_exclusion_list(db: Session, first_name: str, last_name: str) -> List[ExclusionEntry]:
     """
     Check if a name is in the exclusion list
     Returns list of matching records
     Compares names case-insensitively (names in DB are stored in uppercase)
+    Both first and last name must appear (as substrings) in the matched name
+    Close spellings (accents, typos, same-sounding names, swapped surnames) are
+    appended after the exact matches unless fuzzy matching is turned off
+    Uses the in-memory exclusion index instead of scanning the table
     """
     if not first_name or not last_name:
         return []
-    
+    return _match_name(get_exclusion_index(db), first_name, last_name)
+
+def _match_name(index: ExclusionIndex, first_name: str, last_name: str, fuzzy: bool = EXCLUSION_FUZZY_MATCHING) -> List[ExclusionEntry]:
+    """Exact substring matches followed by fuzzy matches not already found"""
     # Normalize names for comparison - convert to uppercase to match DB storage
-    first_name_upper = first_name.strip().upper()
-    last_name_upper = last_name.strip().upper()
-    full_name_upper = f"{first_name_upper} {last_name_upper}"
-    
-    # Search for matches - names in DB are stored in uppercase
-    # Check if first and last name match any record
-    matches = db.query(ExclusionList).filter(
-        or_(
-            func.upper(ExclusionList.name).like(f"%{first_name_upper}%"),
-            func.upper(ExclusionList.name).like(f"%{last_name_upper}%"),
-            func.upper(ExclusionList.name).like(f"%{full_name_upper}%")
-        )
-    ).all()
-    
-    # Filter to ensure both first and last name are present in the match
-    filtered_matches = []
-    for match in matches:
-        match_name_upper = match.name.upper()
-        if first_name_upper in match_name_upper and last_name_upper in match_name_upper:
-            filtered_matches.append(match)
-    
-    return filtered_matches
+    matches = index.search(first_name.strip().upper(), last_name.strip().upper())
+    if fuzzy:
+        exact_ids = {match.id for match in matches}
+        matches = matches + [
+            entry for entry, score in index.search_fuzzy(first_name, last_name, EXCLUSION_FUZZY_THRESHOLD)
+            if entry.id not in exact_ids
+        ]
+    return matches
+
+def check_name_fuzzy(index: ExclusionIndex, first_name: str, last_name: str, threshold: Optional[float] = None) -> List[Tuple[ExclusionEntry, float]]:
+    """
+    Fuzzy matches for a name with their score (0-1), best first
+    threshold defaults to EXCLUSION_FUZZY_THRESHOLD; needs no session, so it can run in a worker thread
+    """
+    if not first_name or not last_name:
+        return []
+    if threshold is None:
+        threshold = EXCLUSION_FUZZY_THRESHOLD
+    return index.search_fuzzy(first_name, last_name, threshold)
+
+def check_names_in_exclusion_list(db: Session, names: Sequence[Tuple[str, str]]) -> List[List[ExclusionEntry]]:
+    """
+    Check many (first_name, last_name) pairs in one pass
+    Returns one list of matches per input pair, in input order
+    """
+    return match_names(get_exclusion_index(db), names)
+
+def match_names(index: ExclusionIndex, names: Sequence[Tuple[str, str]], fuzzy: bool = EXCLUSION_FUZZY_MATCHING) -> List[List[ExclusionEntry]]:
+    """
+    check_names_in_exclusion_list against a given index (needs no session, so it can run in a worker thread)
+    All names are matched against the same index snapshot; repeated names are matched once
+    """
+    cache: Dict[Tuple[str, str], List[ExclusionEntry]] = {}
+    results = []
+    for first_name, last_name in names:
+        if not first_name or not last_name:
+            results.append([])
+            continue
+        key = (first_name.strip().upper(), last_name.strip().upper())
+        if key not in cache:
+            cache[key] = _match_name(index, first_name, last_name, fuzzy)
+        results.append(cache[key])
+    return results
 
 def is_in_exclusion_list(db: Session, first_name: str, last_name: str) -> bool:
     """
@@ -47,4 +80,49 @@ def is_in_exclusion_list(db: Session, first_name: str, last_name: str) -> bool:
     matches = check_name_in_exclusion_list(db, first_name, last_name)
     return len(matches) > 0
 
+def get_exclusion_match_snapshot(db: Session, first_name: str, last_name: str) -> Optional[Dict]:
+    """
+    First exclusion list match for a name as a small dict ({"name", "code", "ssn"})
+    This is what gets stored on InfoSession.exclusion_match
+    """
+    matches = check_name_in_exclusion_list(db, first_name, last_name)
+    return match_snapshot(matches[0]) if matches else None
+
+def get_exclusion_match_snapshots(db: Session, names: Sequence[Tuple[str, str]]) -> List[Optional[Dict]]:
+    """get_exclusion_match_snapshot for many (first_name, last_name) pairs in one pass, in input order"""
+    return [match_snapshot(matches[0]) if matches else None for matches in check_names_in_exclusion_list(db, names)]
+
+def match_snapshot(match: ExclusionEntry) -> Dict:
+    """Stored form of an exclusion list entry"""
+    return {
+        "name": match.name if match.name else None,
+        "code": match.code if match.code else None,
+        "ssn": match.ssn if match.ssn else None
+    }
+
+def rematch_info_sessions(db: Session, statuses: Optional[List[str]] = None, only_missing: bool = False) -> int:
+    """
+    Re-run the exclusion check for stored info sessions and update their snapshot
+    statuses limits which sessions are checked (e.g. OPEN_SESSION_STATUSES after a list reload)
+    only_missing only fills flagged sessions that have no stored match yet
+    Returns the number of sessions updated
+    """
+    query = db.query(InfoSession)
+    if statuses:
+        query = query.filter(InfoSession.status.in_(statuses))
+    if only_missing:
+        query = query.filter(InfoSession.is_in_exclusion_list == True, InfoSession.exclusion_match.is_(None))
 
+    updated = 0
+    for session in query.all():
+        snapshot = get_exclusion_match_snapshot(db, session.first_name, session.last_name)
+        if only_missing and snapshot is None:
+            continue
+        if session.exclusion_match != snapshot or bool(session.is_in_exclusion_list) != (snapshot is not None):
+            session.exclusion_match = snapshot
+            session.is_in_exclusion_list = snapshot is not None
+            updated += 1
+    if updated:
+        db.commit()
+        publish_event("sessions", "sessions.rematched", {"count": updated})
+    return updated
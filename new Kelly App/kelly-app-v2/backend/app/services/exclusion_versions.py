@@ -0,0 +1,125 @@
+"""
+Versioned exclusion list reloads
+Each upload loads its rows under a new version while the current list stays
+active; the swap is a single pointer flip (version status update) in one
+transaction. The version replaced by the flip is kept as "previous" so a bad
+upload can be rolled back instantly.
+"""
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional
+
+from app.models.exclusion_list import ExclusionList, ExclusionListVersion
+
+def get_active_version(db: Session) -> Optional[ExclusionListVersion]:
+    """Currently active exclusion list version, if any"""
+    return db.query(ExclusionListVersion).filter(ExclusionListVersion.status == "active").first()
+
+def active_rows_filter(db: Session):
+    """
+    Filter criterion for the rows of the active version
+    Rows loaded before versioning existed have no version and are used
+    until the first versioned upload is activated
+    """
+    active_version = get_active_version(db)
+    if active_version:
+        return ExclusionList.version_id == active_version.id
+    return ExclusionList.version_id.is_(None)
+
+def ensure_active_version(db: Session) -> Optional[ExclusionListVersion]:
+    """
+    Adopt rows loaded before versioning existed into an active version
+    Called at startup; does nothing once a version is active
+    """
+    active_version = get_active_version(db)
+    if active_version:
+        return active_version
+
+    legacy_count = db.query(ExclusionList).filter(ExclusionList.version_id.is_(None)).count()
+    if legacy_count == 0:
+        return None
+
+    version = ExclusionListVersion(
+        source_filename=None,
+        status="active",
+        row_count=legacy_count,
+        activated_at=datetime.utcnow()
+    )
+    db.add(version)
+    db.flush()
+    db.query(ExclusionList).filter(ExclusionList.version_id.is_(None)).update(
+        {ExclusionList.version_id: version.id}, synchronize_session=False
+    )
+    db.commit()
+    return version
+
+def create_staging_version(db: Session, source_filename: Optional[str] = None) -> ExclusionListVersion:
+    """Create a new version in "loading" state; its rows are invisible until activated"""
+    version = ExclusionListVersion(source_filename=source_filename, status="loading", row_count=0)
+    db.add(version)
+    db.commit()
+    db.refresh(version)
+    return version
+
+def activate_version(db: Session, version: ExclusionListVersion, row_count: Optional[int] = None) -> Optional[ExclusionListVersion]:
+    """
+    Make version the active list in a single transaction
+    The active version becomes "previous" and the old previous is retired
+    Returns the version that was active before
+    """
+    # Rows loaded before versioning existed become the rollback target
+    previous_active = ensure_active_version(db)
+
+    db.query(ExclusionListVersion).filter(
+        ExclusionListVersion.status == "previous"
+    ).update({ExclusionListVersion.status: "retired"}, synchronize_session=False)
+    if previous_active:
+        previous_active.status = "previous"
+
+    version.status = "active"
+    version.activated_at = datetime.utcnow()
+    if row_count is not None:
+        version.row_count = row_count
+    db.commit()
+
+    prune_retired_versions(db)
+    return previous_active
+
+def rollback_to_previous(db: Session) -> Optional[ExclusionListVersion]:
+    """
+    Swap the active and previous versions
+    Returns the version that is active after the rollback, or None if there is no previous version
+    """
+    previous_version = db.query(ExclusionListVersion).filter(ExclusionListVersion.status == "previous").first()
+    if not previous_version:
+        return None
+
+    active_version = get_active_version(db)
+    if active_version:
+        active_version.status = "previous"
+    previous_version.status = "active"
+    previous_version.activated_at = datetime.utcnow()
+    db.commit()
+    return previous_version
+
+def discard_version(db: Session, version: ExclusionListVersion):
+    """Mark a version that failed to load and delete its rows"""
+    db.rollback()
+    db.query(ExclusionList).filter(ExclusionList.version_id == version.id).delete(synchronize_session=False)
+    db.query(ExclusionListVersion).filter(ExclusionListVersion.id == version.id).update(
+        {ExclusionListVersion.status: "failed"}, synchronize_session=False
+    )
+    db.commit()
+
+def prune_retired_versions(db: Session) -> int:
+    """Delete the rows of retired versions (the version records are kept as history)"""
+    retired_ids = [
+        version_id for (version_id,) in db.query(ExclusionListVersion.id).filter(
+            ExclusionListVersion.status.in_(["retired", "failed"])
+        ).all()
+    ]
+    if not retired_ids:
+        return 0
+    count = db.query(ExclusionList).filter(ExclusionList.version_id.in_(retired_ids)).delete(synchronize_session=False)
+    db.commit()
+    return count
@@ -0,0 +1,138 @@
+"""
+Idempotency keys for retried writes (Idempotency-Key header)
+The first request with a key runs and its response is kept for
+IDEMPOTENCY_TTL_SECONDS; a retry with the same key gets that response back
+without running the write again. A duplicate that arrives while the first one
+is still running waits for it (up to IDEMPOTENCY_WAIT_SECONDS).
+Claims are made and finished from request handlers, on the server's event loop.
+
+Each key keeps a 16-byte hash of the request body (a key reused with another
+body is refused) and the response as compact JSON. Keys expire oldest first
+and at most IDEMPOTENCY_MAX_KEYS are kept; the store lives in this process,
+like the assignment ledger.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+# Seconds a key and its response are kept
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+# Most keys kept at once (oldest are dropped first)
+IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+# Seconds a duplicate waits for the request that holds the key
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))
+# Longest key accepted in the header
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+if IDEMPOTENCY_TTL_SECONDS < 1:
+    raise ValueError(f"IDEMPOTENCY_TTL_SECONDS must be at least 1, got {IDEMPOTENCY_TTL_SECONDS}")
+if IDEMPOTENCY_MAX_KEYS < 1:
+    raise ValueError(f"IDEMPOTENCY_MAX_KEYS must be at least 1, got {IDEMPOTENCY_MAX_KEYS}")
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used with a different request body"""
+
+class IdempotencyKeyInProgress(Exception):
+    """The request holding the key did not finish within IDEMPOTENCY_WAIT_SECONDS"""
+
+@dataclass(eq=False)
+class _KeyEntry:
+    fingerprint: bytes
+    expires_at: float
+    finished: asyncio.Event = field(default_factory=asyncio.Event)
+    status_code: int = 200
+    body: Optional[bytes] = None  # Stored response; None while running or after a failure
+
+@dataclass
+class IdempotencyClaim:
+    """
+    Result of claiming a key: either a stored response to replay, or the right to run
+    the write (then call complete() with its response, and release() in a finally so a
+    failure or a cancelled request does not leave the key in progress)
+    """
+    scope_key: Optional[str] = None
+    entry: Optional[_KeyEntry] = None
+    replay: Optional[Tuple[int, bytes]] = None  # (status code, JSON body)
+
+    def complete(self, status_code: int, content: Any):
+        """Keep the response for retries and wake the duplicates waiting on it"""
+        if self.entry is None:
+            return
+        self.entry.status_code = status_code
+        self.entry.body = json.dumps(jsonable_encoder(content), separators=(",", ":")).encode()
+        self.entry.finished.set()
+
+    def release(self):
+        """Forget the key unless complete() ran, so a retry of a failed write runs it again"""
+        if self.entry is None or self.entry.body is not None:
+            return
+        with _lock:
+            if _entries.get(self.scope_key) is self.entry:
+                del _entries[self.scope_key]
+        self.entry.finished.set()
+
+_entries: "OrderedDict[str, _KeyEntry]" = OrderedDict()
+_lock = threading.Lock()
+
+def request_fingerprint(payload: Any) -> bytes:
+    """16-byte hash of a request body (key order does not matter)"""
+    encoded = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(encoded, digest_size=16).digest()
+
+def _evict(now: float):
+    """Drop expired keys, then the oldest ones until there is room for one more (call with the lock held)"""
+    # Every key gets the same TTL, so the oldest are at the front
+    while _entries:
+        oldest = next(iter(_entries.values()))
+        if oldest.expires_at > now and len(_entries) < IDEMPOTENCY_MAX_KEYS:
+            break
+        _entries.popitem(last=False)
+
+def _claim(scope_key: str, fingerprint: bytes) -> Tuple[bool, _KeyEntry]:
+    """(True, new entry) if this request holds the key now, else (False, the existing entry)"""
+    now = time.monotonic()
+    with _lock:
+        _evict(now)
+        entry = _entries.get(scope_key)
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                raise IdempotencyKeyReused(scope_key)
+            return False, entry
+        entry = _entries[scope_key] = _KeyEntry(fingerprint=fingerprint, expires_at=now + IDEMPOTENCY_TTL_SECONDS)
+        return True, entry
+
+async def claim_idempotency_key(scope: str, key: Optional[str], payload: Any) -> IdempotencyClaim:
+    """
+    Claim key for a write in scope (e.g. "register") with request body payload
+    Without a key the write just runs. Raises IdempotencyKeyReused or IdempotencyKeyInProgress
+    """
+    if not key:
+        return IdempotencyClaim()
+    scope_key = f"{scope}:{key}"
+    fingerprint = request_fingerprint(payload)
+    while True:
+        owner, entry = _claim(scope_key, fingerprint)
+        if owner:
+            return IdempotencyClaim(scope_key=scope_key, entry=entry)
+        if not entry.finished.is_set():
+            # Concurrent duplicate: wait for the request holding the key
+            try:
+                await asyncio.wait_for(entry.finished.wait(), IDEMPOTENCY_WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                raise IdempotencyKeyInProgress(scope_key)
+        if entry.body is not None:
+            return IdempotencyClaim(replay=(entry.status_code, entry.body))
+        # The first request failed and released the key: try to take it over
+
+def reset_idempotency_keys():
+    """Forget every key (tests and scripts)"""
+    with _lock:
+        _entries.clear()
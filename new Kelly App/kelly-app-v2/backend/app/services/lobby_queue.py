@@ -0,0 +1,241 @@
+"""
+Lobby queue model: who is waiting for each recruiter and when they should be seen
+Kept in memory for the current day and updated by the handlers that register,
+start and complete sessions (track_session after their commit), so a position
+lookup is a couple of dict reads instead of a scan of the day's sessions.
+It is loaded from the database the first time it is used each day.
+
+Waiting means registered and not started; each recruiter serves one session
+at a time, and every session is expected to take that recruiter's rolling
+average service time.
+"""
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Deque, Dict, List, Optional
+import threading
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.info_session import InfoSession
+from app.services.recruiter_service import (
+    DEFAULT_SERVICE_MINUTES, SERVICE_AVERAGE_WINDOW, load_recent_service_minutes, service_minutes
+)
+from app.services.business_day import business_today
+
+# Statuses the model keeps (anything else has left the lobby)
+WAITING_STATUS = "registered"
+IN_PROGRESS_STATUS = "in-progress"
+
+@dataclass
+class QueueEntry:
+    """What the model needs from a session"""
+    session_id: int
+    recruiter_id: Optional[int]
+    time_slot: str
+    status: str
+    created_at: Optional[datetime]
+    started_at: Optional[datetime]
+    completed_at: Optional[datetime]
+    duration_minutes: Optional[int]
+    change_seq: int
+    business_date: Optional[date]  # Office day the session belongs to
+
+    @property
+    def waiting(self) -> bool:
+        return self.status == WAITING_STATUS and self.started_at is None
+
+_lock = threading.Lock()
+_day: Optional[date] = None
+_loading = False
+_pending: List[QueueEntry] = []  # Changes tracked while the day is being loaded
+_entries: Dict[int, QueueEntry] = {}  # Today's waiting and in-progress sessions
+_queues: Dict[Optional[int], Dict[str, List[int]]] = {}  # Recruiter id (None: unassigned) -> time slot -> waiting session ids in order
+_positions: Dict[int, int] = {}  # Session id -> 1-based position in its queue
+_serving: Dict[int, QueueEntry] = {}  # Recruiter id -> session in progress
+_recent: Dict[int, Deque[float]] = {}  # Recruiter id -> recent service minutes
+_recent_totals: Dict[int, float] = {}
+_seen: Dict[int, int] = {}  # Session id -> change_seq last applied (older snapshots are ignored)
+
+def session_snapshot(session: InfoSession) -> QueueEntry:
+    return QueueEntry(
+        session_id=session.id,
+        recruiter_id=session.assigned_recruiter_id,
+        time_slot=session.time_slot,
+        status=session.status,
+        created_at=session.created_at,
+        started_at=session.started_at,
+        completed_at=session.completed_at,
+        duration_minutes=session.duration_minutes,
+        change_seq=session.change_seq or 0,
+        business_date=session.business_date
+    )
+
+def _slot_order(time_slot: str) -> datetime:
+    """Time slots sort by clock time ("8:30 AM" before "1:30 PM"); unknown ones last"""
+    try:
+        return datetime.strptime(time_slot, "%I:%M %p")
+    except (TypeError, ValueError):
+        return datetime.max
+
+def _reindex(recruiter_id: Optional[int], time_slot: str):
+    slots = _queues.get(recruiter_id, {})
+    queue = slots.get(time_slot)
+    if not queue:
+        slots.pop(time_slot, None)
+        if not slots:
+            _queues.pop(recruiter_id, None)
+        return
+    queue.sort(key=lambda session_id: (_entries[session_id].created_at or datetime.min, session_id))
+    for position, session_id in enumerate(queue, start=1):
+        _positions[session_id] = position
+
+def _record_service(recruiter_id: int, minutes: float):
+    """Add a finished session to the recruiter's rolling average"""
+    recent = _recent.setdefault(recruiter_id, deque())
+    if len(recent) == SERVICE_AVERAGE_WINDOW:
+        _recent_totals[recruiter_id] -= recent.popleft()
+    recent.append(minutes)
+    _recent_totals[recruiter_id] = _recent_totals.get(recruiter_id, 0.0) + minutes
+
+def _apply(entry: QueueEntry, day: date):
+    """
+    Move a session to where its new state puts it in the queue of day (call with the lock held)
+    Sessions of another office day (e.g. an older one still marked registered) are not in the lobby
+    """
+    if _seen.get(entry.session_id, -1) > entry.change_seq:
+        return
+    _seen[entry.session_id] = entry.change_seq
+
+    previous = _entries.pop(entry.session_id, None)
+    if previous:
+        if previous.session_id in _positions:
+            _queues[previous.recruiter_id][previous.time_slot].remove(previous.session_id)
+            del _positions[previous.session_id]
+            _reindex(previous.recruiter_id, previous.time_slot)
+        if previous.recruiter_id is not None and _serving.get(previous.recruiter_id) is previous:
+            del _serving[previous.recruiter_id]
+            # Session finished with the recruiter: counts toward the rolling average
+            minutes = service_minutes(previous.started_at, entry.completed_at, entry.duration_minutes)
+            if entry.status not in (WAITING_STATUS, IN_PROGRESS_STATUS) and minutes is not None:
+                _record_service(previous.recruiter_id, minutes)
+
+    if entry.business_date != day:
+        return
+    if entry.waiting:
+        _entries[entry.session_id] = entry
+        _queues.setdefault(entry.recruiter_id, {}).setdefault(entry.time_slot, []).append(entry.session_id)
+        _reindex(entry.recruiter_id, entry.time_slot)
+    elif entry.status == IN_PROGRESS_STATUS and entry.recruiter_id is not None:
+        _entries[entry.session_id] = entry
+        _serving[entry.recruiter_id] = entry
+
+def track_session(db: Session, session: InfoSession):
+    """
+    Update the model after a session was committed (registered, assigned, started, completed...)
+    Run with AsyncSession.run_sync: any attribute expired by the commit reloads here
+    """
+    entry = session_snapshot(session)
+    with _lock:
+        if _loading:
+            _pending.append(entry)
+        elif _day is not None:
+            _apply(entry, _day)
+
+def lobby_queue_current() -> bool:
+    """True if today's queue is loaded"""
+    return _day == business_today()
+
+def ensure_lobby_queue(db: Session):
+    """Load today's queue from the database unless it already is"""
+    global _day, _loading
+    today = business_today()
+    with _lock:
+        if _day == today or _loading:
+            return
+        _loading = True
+    try:
+        sessions = db.scalars(select(InfoSession).where(
+            InfoSession.business_date == today,
+            InfoSession.status.in_([WAITING_STATUS, IN_PROGRESS_STATUS])
+        )).all()
+        recent_minutes = load_recent_service_minutes(db)
+    except Exception:
+        with _lock:
+            _loading = False
+            _pending.clear()
+        raise
+    with _lock:
+        for state in (_entries, _queues, _positions, _serving, _recent, _recent_totals, _seen):
+            state.clear()
+        for recruiter_id, minutes in recent_minutes.items():
+            # Oldest first, so the newest stay in the window
+            for value in reversed(minutes):
+                _record_service(recruiter_id, value)
+        for session in sessions:
+            _apply(session_snapshot(session), today)
+        for entry in _pending:
+            _apply(entry, today)
+        _pending.clear()
+        _day = today
+        _loading = False
+
+def _average_minutes(recruiter_id: int) -> float:
+    recent = _recent.get(recruiter_id)
+    if recent:
+        return _recent_totals[recruiter_id] / len(recent)
+    averages = [_recent_totals[other] / len(values) for other, values in _recent.items() if values]
+    return sum(averages) / len(averages) if averages else DEFAULT_SERVICE_MINUTES
+
+def queue_status(session_id: int, now: Optional[datetime] = None) -> Optional[Dict]:
+    """
+    Position of a waiting session in its recruiter's queue for its time slot and the
+    estimated start (UTC); None if the session is not waiting or in progress today
+    """
+    now = now or datetime.utcnow()
+    with _lock:
+        entry = _entries.get(session_id)
+        if entry is None:
+            return None
+        status = {
+            "session_id": session_id,
+            "status": entry.status,
+            "recruiter_id": entry.recruiter_id,
+            "time_slot": entry.time_slot,
+            "position": None,
+            "waiting_ahead": 0,
+            "average_service_minutes": None,
+            "estimated_wait_minutes": None,
+            "estimated_start": None,
+        }
+        if not entry.waiting:
+            # Already with the recruiter
+            status["position"] = 0
+            status["estimated_wait_minutes"] = 0
+            status["estimated_start"] = entry.started_at
+            return status
+
+        position = _positions[session_id]
+        status["position"] = position
+        if entry.recruiter_id is None:
+            # No recruiter assigned yet: the position is among unassigned visitors, no estimate
+            status["waiting_ahead"] = position - 1
+            return status
+
+        # Visitors of earlier time slots for the same recruiter go first
+        ahead = position - 1 + sum(
+            len(queue) for time_slot, queue in _queues[entry.recruiter_id].items()
+            if _slot_order(time_slot) < _slot_order(entry.time_slot)
+        )
+        average = _average_minutes(entry.recruiter_id)
+        remaining = 0.0
+        serving = _serving.get(entry.recruiter_id)
+        if serving and serving.started_at:
+            remaining = max(0.0, average - (now - serving.started_at).total_seconds() / 60)
+        wait = remaining + ahead * average
+        status["waiting_ahead"] = ahead
+        status["average_service_minutes"] = round(average, 1)
+        status["estimated_wait_minutes"] = round(wait)
+        status["estimated_start"] = now + timedelta(minutes=wait)
+        return status
@@ -1,70 +1,261 @@
 """
 Service for recruiter assignment
 Implements equitable distribution among recruiters
+
+Assignments go through an in-process ledger of the day's counts per recruiter
+and time slot. It is loaded from the database once per day; after that, picking
+the recruiter and counting the assignment happen together under a lock, so two
+registrations at the same moment never see the same counts.
+
+Who gets picked depends on the assignment strategy (ASSIGNMENT_STRATEGY):
+- balanced: fewest assignments in the time slot among available recruiters (default)
+- soonest-free: whoever is expected to be free first, from the session in progress,
+  the visitors already waiting and each recruiter's recent service times
 """
+from dataclasses import dataclass
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import case, func, select
 from app.models.recruiter import Recruiter
 from app.models.info_session import InfoSession
-from typing import Optional
-from datetime import datetime, date
+from app.services.business_day import business_today
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from datetime import datetime, date, timedelta
+import os
+import random
+import threading
+import time as clock
+
+ASSIGNMENT_STRATEGY = os.getenv("ASSIGNMENT_STRATEGY", "balanced")
+# Minutes a session is expected to take when a recruiter has no history yet
+DEFAULT_SERVICE_MINUTES = 20.0
+# Most recent finished sessions per recruiter in the rolling average
+SERVICE_AVERAGE_WINDOW = 20
+# Only sessions finished in this many days count toward the averages
+SERVICE_AVERAGE_DAYS = 60
+# Seconds the service averages are reused before they are queried again
+SERVICE_AVERAGE_REFRESH_SECONDS = 300
+
+# {day: {recruiter id: {time slot: sessions assigned}}}
+_ledger: Dict[date, Dict[int, Dict[str, int]]] = {}
+_ledger_lock = threading.Lock()
+# (monotonic time loaded, {recruiter id: average service minutes})
+_service_averages: Tuple[float, Dict[int, float]] = (0.0, {})
+
+@dataclass
+class RecruiterLoad:
+    """What a strategy knows about one candidate recruiter"""
+    recruiter: Recruiter
+    slot_assignments: int  # Sessions assigned today in the requested time slot
+    day_assignments: int  # Sessions assigned today in any time slot
+    waiting: int = 0  # Assigned today and not started yet
+    remaining_minutes: float = 0.0  # Expected time left on the session in progress
+    average_minutes: float = DEFAULT_SERVICE_MINUTES  # Rolling average service time
+
+    @property
+    def expected_free_minutes(self) -> float:
+        """Minutes until this recruiter could start with a new visitor"""
+        return self.remaining_minutes + self.waiting * self.average_minutes
+
+@dataclass(frozen=True)
+class AssignmentStrategy:
+    pick: Callable[[List[RecruiterLoad]], RecruiterLoad]
+    include_busy: bool  # Also consider recruiters in a session (their load is estimated)
+
+def pick_balanced(loads: List[RecruiterLoad]) -> RecruiterLoad:
+    """Fewest assignments in the time slot, then fewest in the day, then random"""
+    min_assignments = min(load.slot_assignments for load in loads)
+    candidates = [load for load in loads if load.slot_assignments == min_assignments]
+    if len(candidates) > 1:
+        min_total = min(load.day_assignments for load in candidates)
+        candidates = [load for load in candidates if load.day_assignments == min_total]
+    return random.choice(candidates)
+
+def pick_soonest_free(loads: List[RecruiterLoad]) -> RecruiterLoad:
+    """Shortest expected wait (to the minute); ties are broken like balanced"""
+    soonest = min(round(load.expected_free_minutes) for load in loads)
+    return pick_balanced([load for load in loads if round(load.expected_free_minutes) == soonest])
+
+ASSIGNMENT_STRATEGIES: Dict[str, AssignmentStrategy] = {
+    "balanced": AssignmentStrategy(pick=pick_balanced, include_busy=False),
+    "soonest-free": AssignmentStrategy(pick=pick_soonest_free, include_busy=True),
+}
+
+if ASSIGNMENT_STRATEGY not in ASSIGNMENT_STRATEGIES:
+    raise ValueError(f"ASSIGNMENT_STRATEGY must be one of {', '.join(ASSIGNMENT_STRATEGIES)}, got '{ASSIGNMENT_STRATEGY}'")
+
+def load_day_counts(db: Session, session_date: date) -> Dict[int, Dict[str, int]]:
+    """Sessions assigned on a business day as {recruiter id: {time slot: count}}, in one grouped query over the day's index range"""
+    rows = db.execute(
+        select(InfoSession.assigned_recruiter_id, InfoSession.time_slot, func.count(InfoSession.id))
+        .where(
+            InfoSession.business_date == session_date,
+            InfoSession.assigned_recruiter_id.isnot(None)
+        )
+        .group_by(InfoSession.assigned_recruiter_id, InfoSession.time_slot)
+    ).all()
+    counts: Dict[int, Dict[str, int]] = {}
+    for recruiter_id, slot, count in rows:
+        counts.setdefault(recruiter_id, {})[slot] = count
+    return counts
+
+def _day_ledger(db: Session, session_date: date) -> Dict[int, Dict[str, int]]:
+    """The day's ledger, loaded from the database the first time (the query runs outside the lock)"""
+    with _ledger_lock:
+        if session_date in _ledger:
+            return _ledger[session_date]
+    counts = load_day_counts(db, session_date)
+    with _ledger_lock:
+        # Previous days are no longer assigned to
+        for day in [day for day in _ledger if day < session_date]:
+            del _ledger[day]
+        # If another request loaded it meanwhile, keep that one: it may already have assignments on top
+        return _ledger.setdefault(session_date, counts)
+
+def reset_assignment_ledger():
+    """Forget the loaded counts and service averages; the next assignment reloads them from the database"""
+    global _service_averages
+    with _ledger_lock:
+        _ledger.clear()
+        _service_averages = (0.0, {})
+
+def service_minutes(started_at: Optional[datetime], completed_at: Optional[datetime], duration_minutes: Optional[int]) -> Optional[float]:
+    """Time a recruiter spent with a visitor (start to completion, else the recorded duration)"""
+    if started_at and completed_at and completed_at > started_at:
+        return (completed_at - started_at).total_seconds() / 60
+    return float(duration_minutes) if duration_minutes else None
+
+def load_recent_service_minutes(db: Session) -> Dict[int, List[float]]:
+    """Service minutes of each recruiter's SERVICE_AVERAGE_WINDOW most recent finished sessions (in the last SERVICE_AVERAGE_DAYS), newest first"""
+    recent = (
+        select(
+            InfoSession.assigned_recruiter_id,
+            InfoSession.started_at,
+            InfoSession.completed_at,
+            InfoSession.duration_minutes,
+            func.row_number().over(
+                partition_by=InfoSession.assigned_recruiter_id,
+                order_by=InfoSession.completed_at.desc()
+            ).label("position")
+        )
+        .where(
+            InfoSession.assigned_recruiter_id.isnot(None),
+            InfoSession.completed_at >= datetime.utcnow() - timedelta(days=SERVICE_AVERAGE_DAYS)
+        )
+        .subquery()
+    )
+    minutes: Dict[int, List[float]] = {}
+    for recruiter_id, started_at, completed_at, duration in db.execute(
+        select(recent.c.assigned_recruiter_id, recent.c.started_at, recent.c.completed_at, recent.c.duration_minutes)
+        .where(recent.c.position <= SERVICE_AVERAGE_WINDOW)
+        .order_by(recent.c.position)
+    ):
+        value = service_minutes(started_at, completed_at, duration)
+        if value is not None:
+            minutes.setdefault(recruiter_id, []).append(value)
+    return minutes
 
-def get_next_recruiter(db: Session, time_slot: str, session_date: date = None) -> Optional[Recruiter]:
+def load_service_averages(db: Session) -> Dict[int, float]:
+    """Rolling average service minutes per recruiter"""
+    return {recruiter_id: sum(values) / len(values) for recruiter_id, values in load_recent_service_minutes(db).items()}
+
+def _cached_service_averages(db: Session) -> Dict[int, float]:
+    global _service_averages
+    loaded_at, averages = _service_averages
+    if not loaded_at or clock.monotonic() - loaded_at > SERVICE_AVERAGE_REFRESH_SECONDS:
+        averages = load_service_averages(db)
+        _service_averages = (clock.monotonic(), averages)
+    return averages
+
+def load_day_progress(db: Session, recruiter_ids, session_date: date) -> Tuple[Dict[int, int], Dict[int, datetime]]:
+    """Per recruiter, sessions of the day already started and when the one in progress started"""
+    rows = db.execute(
+        select(
+            InfoSession.assigned_recruiter_id,
+            func.count(InfoSession.started_at),
+            func.max(case((InfoSession.status == "in-progress", InfoSession.started_at)))
+        )
+        .where(
+            InfoSession.business_date == session_date,
+            InfoSession.assigned_recruiter_id.in_(recruiter_ids)
+        )
+        .group_by(InfoSession.assigned_recruiter_id)
+    ).all()
+    started = {recruiter_id: count for recruiter_id, count, _ in rows}
+    in_progress = {recruiter_id: started_at for recruiter_id, _, started_at in rows if started_at}
+    return started, in_progress
+
+def get_next_recruiter(db: Session, time_slot: str, session_date: date = None, strategy: str = None) -> Optional[Recruiter]:
     """
-    Get the next recruiter to assign based on equitable distribution
-    Only assigns to available (not busy) recruiters
-    Uses round-robin approach based on current assignments for the same time slot
+    Pick the next recruiter with the assignment strategy (ASSIGNMENT_STRATEGY unless given)
+    and count the assignment. Call release_recruiter if the session is not saved
     """
-    if session_date is None:
-        session_date = date.today()
-    
-    # Get all active AND available recruiters (not busy)
-    available_recruiters = db.query(Recruiter).filter(
-        Recruiter.is_active == True,
-        Recruiter.status == "available"
-    ).all()
-    
-    if not available_recruiters:
-        return None
-    
-    # Count assignments per recruiter for this time slot and date
-    assignments = {}
-    for recruiter in available_recruiters:
-        count = db.query(InfoSession).filter(
-            InfoSession.assigned_recruiter_id == recruiter.id,
-            InfoSession.time_slot == time_slot,
-            func.date(InfoSession.created_at) == session_date
-        ).count()
-        assignments[recruiter.id] = count
+    return get_next_recruiters(db, [(time_slot, session_date or business_today())], strategy)[0]
+
+def get_next_recruiters(db: Session, requests: Sequence[Tuple[str, date]], strategy: str = None) -> List[Optional[Recruiter]]:
+    """
+    Pick and count a recruiter for each (time slot, business day), in order, as successive
+    get_next_recruiter calls would, with the recruiters and each day's progress queried once
+    Call release_recruiter for every assignment whose session is not saved
+    """
+    assignment_strategy = ASSIGNMENT_STRATEGIES[strategy or ASSIGNMENT_STRATEGY]
     
-    # Find recruiter with minimum assignments (equitable distribution)
-    min_assignments = min(assignments.values()) if assignments else 0
-    candidates = [
-        recruiter for recruiter in available_recruiters
-        if assignments.get(recruiter.id, 0) == min_assignments
-    ]
+    # Active recruiters; only available ones (not busy) unless the strategy estimates busy ones' load
+    query = db.query(Recruiter).filter(Recruiter.is_active == True)
+    if not assignment_strategy.include_busy:
+        query = query.filter(Recruiter.status == "available")
+    recruiters = query.all()
+    if not recruiters:
+        return [None] * len(requests)
     
-    # If multiple candidates, use round-robin based on total assignments
-    if len(candidates) > 1:
-        # Get total assignments across all time slots for today
-        total_assignments = {}
-        for recruiter in candidates:
-            total = db.query(InfoSession).filter(
-                InfoSession.assigned_recruiter_id == recruiter.id,
-                func.date(InfoSession.created_at) == session_date
-            ).count()
-            total_assignments[recruiter.id] = total
-        
-        # Select recruiter with minimum total assignments
-        min_total = min(total_assignments.values())
-        candidates = [
-            recruiter for recruiter in candidates
-            if total_assignments.get(recruiter.id, 0) == min_total
-        ]
+    # Candidates, sessions started and session in progress per recruiter, and the ledger, per day
+    days: Dict[date, Tuple[List[Recruiter], Dict[int, int], Dict[int, datetime], Dict[int, Dict[str, int]]]] = {}
+    averages: Dict[int, float] = _cached_service_averages(db) if assignment_strategy.include_busy else {}
+    for session_date in sorted({session_date for _, session_date in requests}):
+        candidates = recruiters
+        started: Dict[int, int] = {}
+        in_progress: Dict[int, datetime] = {}
+        if assignment_strategy.include_busy:
+            started, in_progress = load_day_progress(db, [recruiter.id for recruiter in recruiters], session_date)
+            # Busy without a session in progress (e.g. on a break): no idea when they are back
+            candidates = [recruiter for recruiter in recruiters if recruiter.status == "available" or recruiter.id in in_progress]
+        days[session_date] = (candidates, started, in_progress, _day_ledger(db, session_date))
     
-    # Return first candidate (or random if still multiple)
-    import random
-    return random.choice(candidates) if candidates else available_recruiters[0]
+    default_minutes = sum(averages.values()) / len(averages) if averages else DEFAULT_SERVICE_MINUTES
+    now = datetime.utcnow()
+    chosen_recruiters: List[Optional[Recruiter]] = []
+    with _ledger_lock:
+        for time_slot, session_date in requests:
+            candidates, started, in_progress, ledger = days[session_date]
+            if not candidates:
+                chosen_recruiters.append(None)
+                continue
+            loads = []
+            for recruiter in candidates:
+                slots = ledger.get(recruiter.id, {})
+                average = averages.get(recruiter.id, default_minutes)
+                started_at = in_progress.get(recruiter.id)
+                loads.append(RecruiterLoad(
+                    recruiter=recruiter,
+                    slot_assignments=slots.get(time_slot, 0),
+                    day_assignments=sum(slots.values()),
+                    waiting=max(0, sum(slots.values()) - started.get(recruiter.id, 0)),
+                    remaining_minutes=max(0.0, average - (now - started_at).total_seconds() / 60) if started_at else 0.0,
+                    average_minutes=average
+                ))
+            chosen = assignment_strategy.pick(loads).recruiter
+            slots = ledger.setdefault(chosen.id, {})
+            slots[time_slot] = slots.get(time_slot, 0) + 1
+            chosen_recruiters.append(chosen)
+    return chosen_recruiters
+
+def release_recruiter(recruiter_id: int, time_slot: str, session_date: date = None):
+    """Undo an assignment counted by get_next_recruiter whose session was not saved"""
+    if session_date is None:
+        session_date = business_today()
+    with _ledger_lock:
+        slots = _ledger.get(session_date, {}).get(recruiter_id)
+        if slots and slots.get(time_slot, 0) > 0:
+            slots[time_slot] -= 1
 
 def initialize_default_recruiters(db: Session):
     """
@@ -0,0 +1,55 @@
+"""
+Kiosk registration: exclusion check, recruiter assignment and the new session
+row in one transaction, in one call from the request handler
+
+The session is written with a single INSERT ... RETURNING (id, created_at and
+change_seq come back with it), so nothing is read again after the commit.
+Default recruiters are seeded at startup, not on every registration.
+"""
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.info_session import InfoSession, next_change_seq
+from app.models.recruiter import Recruiter
+from app.services.business_day import business_today
+from app.services.exclusion_service import get_exclusion_match_snapshot
+from app.services.recruiter_service import get_next_recruiter, release_recruiter
+
+def register_session(db: Session, registration: Dict) -> Tuple[InfoSession, Optional[Recruiter]]:
+    """
+    Create and commit an info session from the kiosk form fields
+    Returns the session (fully loaded) and its recruiter; the assignment is released if the session is not saved
+    """
+    # First exclusion match is stored with the session
+    exclusion_match = get_exclusion_match_snapshot(db, registration["first_name"], registration["last_name"])
+    is_excluded = exclusion_match is not None
+
+    # Assign recruiter equitably (counted in the assignment ledger right away, under the session's business day)
+    assignment_date = business_today()
+    recruiter = get_next_recruiter(db, registration["time_slot"], assignment_date)
+
+    try:
+        # One INSERT returns the whole row (id, created_at, change_seq) as a loaded InfoSession
+        info_session = db.scalars(
+            insert(InfoSession)
+            .values(
+                **registration,
+                is_in_exclusion_list=is_excluded,
+                exclusion_warning_shown=is_excluded,
+                exclusion_match=exclusion_match,
+                status="registered",
+                assigned_recruiter_id=recruiter.id if recruiter else None,
+                business_date=assignment_date,
+                change_seq=next_change_seq()
+            )
+            .returning(InfoSession)
+        ).one()
+        db.commit()
+    except Exception:
+        db.rollback()
+        if recruiter:
+            release_recruiter(recruiter.id, registration["time_slot"], assignment_date)
+        raise
+    return info_session, recruiter
@@ -0,0 +1,66 @@
+"""
+Version stamps for conditional GETs (ETag / If-None-Match)
+Rarely changing resources (announcements, info session config, row templates)
+keep a change counter in this process that their write handlers bump; the
+ETag is built from it, so a matching If-None-Match is answered with 304
+before the resource is queried or serialized.
+The counters start over when the server restarts, so every ETag also
+carries a per-process token and old ones never match.
+"""
+from typing import Dict, Optional
+import threading
+import uuid
+
+from fastapi import Request, Response
+
+# Resource families with a version counter
+ANNOUNCEMENTS = "announcements"
+INFO_SESSION_CONFIG = "info-session-config"
+ROW_TEMPLATES = "row-templates"
+
+_BOOT_TOKEN = uuid.uuid4().hex[:8]
+_versions: Dict[str, int] = {}
+_lock = threading.Lock()
+
+def bump_version(family: str) -> int:
+    """Mark a resource family as changed; call after the write is committed"""
+    with _lock:
+        _versions[family] = _versions.get(family, 0) + 1
+        return _versions[family]
+
+def current_version(family: str) -> int:
+    with _lock:
+        return _versions.get(family, 0)
+
+def make_etag(*parts) -> str:
+    """Weak ETag from the given parts"""
+    return 'W/"' + ".".join(str(part) for part in parts) + '"'
+
+def version_etag(family: str, *variant) -> str:
+    """ETag for the current version of a family; variant tells apart responses that depend on query params"""
+    return make_etag(family, _BOOT_TOKEN, current_version(family), *variant)
+
+def _opaque_tag(tag: str) -> str:
+    """ETag without the weak prefix"""
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match contains etag (weak comparison)"""
+    header: Optional[str] = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return _opaque_tag(etag) in {_opaque_tag(tag) for tag in header.split(",")}
+
+def conditional_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    304 response if the client already has etag, otherwise None after setting
+    the ETag header on the response that is about to be built
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
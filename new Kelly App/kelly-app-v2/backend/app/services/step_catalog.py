@@ -0,0 +1,69 @@
+"""
+Versioned catalog of the steps a visitor completes at the kiosk
+Each info session stores the catalog version it was registered with (steps_version)
+and its progress as a bitmask (steps_completed): bit i is set once step i of that
+version is completed. Descriptions live here once instead of in every session.
+
+Never edit or reorder a published version; add a new one and point
+CURRENT_STEP_CATALOG at it, so existing sessions keep showing their own steps.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+@dataclass(frozen=True)
+class StepDefinition:
+    name: str
+    description: str
+
+STEP_CATALOGS: Dict[int, Tuple[StepDefinition, ...]] = {
+    1: (
+        StepDefinition(
+            "english_communication",
+            "For our process you must be able to communicate in English"
+        ),
+        StepDefinition(
+            "education_proof",
+            "Have your Education Proof. If your Education Proof is not from the U.S., you must have the equivalence. If you don't have it, our representatives will inform you how to do it"
+        ),
+        StepDefinition(
+            "two_government_ids",
+            "Two Forms of Government ID such as: Driver's License, Social Security Card, U.S. Passport, Birth Certificate, Permanent Resident Card, Work Permit Card. Documents must be physical originals, not copies, and must not be expired"
+        ),
+    ),
+}
+
+# Version given to new registrations
+CURRENT_STEP_CATALOG = 1
+
+if CURRENT_STEP_CATALOG not in STEP_CATALOGS:
+    raise ValueError(f"CURRENT_STEP_CATALOG {CURRENT_STEP_CATALOG} is not in STEP_CATALOGS")
+
+def catalog_steps(version: Optional[int]) -> Tuple[StepDefinition, ...]:
+    """Steps of a catalog version (unknown versions have none)"""
+    return STEP_CATALOGS.get(version, ())
+
+def all_steps_mask(version: Optional[int]) -> int:
+    """steps_completed value once every step of the version is done"""
+    return (1 << len(catalog_steps(version))) - 1
+
+def step_bits(step_name: str) -> Dict[int, int]:
+    """{catalog version: bit of the step} for the versions that have this step"""
+    return {
+        version: 1 << index
+        for version, steps in STEP_CATALOGS.items()
+        for index, step in enumerate(steps)
+        if step.name == step_name
+    }
+
+def step_items(version: Optional[int], completed: Optional[int]) -> List[Dict]:
+    """Steps as the API returns them: [{"step_name", "step_description", "is_completed"}]"""
+    completed = completed or 0
+    return [
+        {"step_name": step.name, "step_description": step.description, "is_completed": bool(completed & (1 << index))}
+        for index, step in enumerate(catalog_steps(version))
+    ]
+
+def steps_mask(version: Optional[int], completed_names) -> int:
+    """Bitmask of the named steps that exist in the version (names not in it are ignored)"""
+    names = set(completed_names)
+    return sum(1 << index for index, step in enumerate(catalog_steps(version)) if step.name in names)
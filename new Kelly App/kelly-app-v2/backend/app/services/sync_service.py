@@ -0,0 +1,129 @@
+"""
+Offline kiosk backlog: registrations and visits collected while the network was
+down are saved in one transaction with the time they were collected
+Each row gets the created_at and office date (business_date) of its collection
+time. Info sessions are checked against the exclusion list in one pass and get
+their recruiters in one assignment, oldest first, counted on the day they were
+collected, as if they had been registered live.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+import os
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models.info_session import InfoSession
+from app.models.recruiter import Recruiter
+from app.models.visit import NewHireOrientation, Badge, Fingerprint, TeamVisit
+from app.services.business_day import business_date
+from app.services.exclusion_service import get_exclusion_match_snapshots
+from app.services.recruiter_service import get_next_recruiters, release_recruiter
+
+# Most items in one batch
+MAX_SYNC_BATCH = int(os.getenv("MAX_SYNC_BATCH", "1000"))
+# Oldest collection time accepted, in days
+SYNC_MAX_AGE_DAYS = int(os.getenv("SYNC_MAX_AGE_DAYS", "7"))
+# Seconds a kiosk clock may run ahead of the server's
+SYNC_CLOCK_SKEW_SECONDS = 300
+
+if MAX_SYNC_BATCH < 1:
+    raise ValueError(f"MAX_SYNC_BATCH must be at least 1, got {MAX_SYNC_BATCH}")
+if SYNC_MAX_AGE_DAYS < 1:
+    raise ValueError(f"SYNC_MAX_AGE_DAYS must be at least 1, got {SYNC_MAX_AGE_DAYS}")
+
+INFO_SESSION_KIND = "info-session"
+# Visit kind (as in the visits API) -> model
+VISIT_MODELS = {
+    "new-hire-orientation": NewHireOrientation,
+    "badges": Badge,
+    "fingerprints": Fingerprint,
+    "team-visit": TeamVisit,
+}
+
+@dataclass
+class OfflineRecord:
+    """One validated backlog item"""
+    kind: str
+    created_at: datetime  # UTC, naive like the stored created_at
+    fields: Dict  # Form fields, as the live endpoint takes them
+
+@dataclass
+class SyncedRecord:
+    row: object  # InfoSession or visit model
+    recruiter: Optional[Recruiter] = None
+
+def save_offline_records(db: Session, records: Sequence[OfflineRecord]) -> List[SyncedRecord]:
+    """
+    Insert the records in one transaction and commit; results in input order
+    Recruiter assignments are released if the batch is not saved
+    """
+    sessions = sorted(
+        (position for position, record in enumerate(records) if record.kind == INFO_SESSION_KIND),
+        key=lambda position: records[position].created_at
+    )
+    snapshots = get_exclusion_match_snapshots(
+        db, [(records[position].fields["first_name"], records[position].fields["last_name"]) for position in sessions]
+    )
+    assignments = [(records[position].fields["time_slot"], business_date(records[position].created_at)) for position in sessions]
+    recruiters = get_next_recruiters(db, assignments)
+
+    results: List[Optional[SyncedRecord]] = [None] * len(records)
+    try:
+        # Sessions oldest first, so their ids and change_seq follow the collection order
+        rows = insert_rows(db, InfoSession, [
+            dict(
+                records[position].fields,
+                is_in_exclusion_list=exclusion_match is not None,
+                exclusion_warning_shown=exclusion_match is not None,
+                exclusion_match=exclusion_match,
+                status="registered",
+                assigned_recruiter_id=recruiter.id if recruiter else None,
+                created_at=records[position].created_at,
+                business_date=business_date(records[position].created_at)
+            )
+            for position, exclusion_match, recruiter in zip(sessions, snapshots, recruiters)
+        ])
+        assign_change_seqs(db, rows)
+        for position, row, recruiter in zip(sessions, rows, recruiters):
+            results[position] = SyncedRecord(row=row, recruiter=recruiter)
+        for kind, model in VISIT_MODELS.items():
+            visits = [position for position, record in enumerate(records) if record.kind == kind]
+            rows = insert_rows(db, model, [
+                dict(records[position].fields, created_at=records[position].created_at, business_date=business_date(records[position].created_at))
+                for position in visits
+            ])
+            for position, row in zip(visits, rows):
+                results[position] = SyncedRecord(row=row)
+        db.commit()
+    except Exception:
+        db.rollback()
+        for (time_slot, session_date), recruiter in zip(assignments, recruiters):
+            if recruiter:
+                release_recruiter(recruiter.id, time_slot, session_date)
+        raise
+    return results
+
+def insert_rows(db: Session, model, rows: List[Dict]) -> List:
+    """
+    INSERT ... RETURNING for many rows; the loaded objects come back in the order of rows
+    Results are paired with their records by position, so the order must be guaranteed
+    """
+    if not rows:
+        return []
+    return db.scalars(insert(model).returning(model, sort_by_parameter_order=True), rows).all()
+
+def assign_change_seqs(db: Session, sessions: List[InfoSession]):
+    """
+    Give inserted sessions consecutive change_seq values in one statement
+    The INSERT before holds SQLite's write lock until commit, so no other writer can take a
+    value between reading the current maximum and updating
+    """
+    if not sessions:
+        return
+    newest = db.scalar(select(func.max(InfoSession.change_seq))) or 0
+    db.execute(update(InfoSession), [{"id": session.id, "change_seq": newest + n} for n, session in enumerate(sessions, 1)])
+    for n, session in enumerate(sessions, 1):
+        set_committed_value(session, "change_seq", newest + n)
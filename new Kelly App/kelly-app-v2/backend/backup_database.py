@@ -2,10 +2,19 @@
 Script para hacer backup de la base de datos antes de cambios importantes
 """
 import sqlite3
-import shutil
 from pathlib import Path
 from datetime import datetime
 
+def copy_database(source: Path, target: Path):
+    """Copia consistente con la API de backup de SQLite (incluye lo que aún está en el WAL)"""
+    origen = sqlite3.connect(str(source))
+    destino = sqlite3.connect(str(target))
+    try:
+        origen.backup(destino)
+    finally:
+        destino.close()
+        origen.close()
+
 def backup_database():
     """Crea un backup de la base de datos"""
     db_path = Path(__file__).parent / "kelly_app.db"
@@ -24,12 +33,12 @@ def backup_database():
     
     try:
         # Copiar la base de datos
-        shutil.copy2(db_path, backup_path)
+        copy_database(db_path, backup_path)
         print(f"✅ Backup creado: {backup_path}")
         
         # También mantener el último backup como "latest"
         latest_backup = backup_dir / "kelly_app_latest.db"
-        shutil.copy2(db_path, latest_backup)
+        copy_database(db_path, latest_backup)
         print(f"✅ Último backup guardado como: {latest_backup}")
         
         return True
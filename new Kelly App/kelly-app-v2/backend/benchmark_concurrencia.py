@@ -0,0 +1,157 @@
+"""
+Script para medir cómo escala el servidor con clientes concurrentes:
+levanta uvicorn con una base de datos SQLite temporal (tablero en vivo más un
+historial grande de sesiones completadas) y mide peticiones por segundo y
+latencia con 1, 2, 4, 8 y 16 clientes a la vez
+
+Uso: python benchmark_concurrencia.py [sesiones_historial] [segundos_por_nivel]
+No toca kelly_app.db
+"""
+import asyncio
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+PUERTO = 3991
+BASE = f"http://127.0.0.1:{PUERTO}"
+NIVELES = [1, 2, 4, 8, 16, 32]
+# Lecturas del dashboard: tablero en vivo, historial paginado (recorre todo el historial
+# dentro de SQLite), detalle de una sesión y estado del servidor
+RUTAS = ["/api/info-session/live", "/api/info-session/?status=completed&limit=20", "/api/info-session/1", "/health"]
+# Sesiones en el tablero en vivo (el resto es historial completado)
+SESIONES_EN_VIVO = 50
+# Segundos sin respuesta para contar una petición como error
+TIEMPO_MAXIMO = 30
+# Rendimiento mínimo con muchos clientes, relativo a un solo cliente
+ESCALA_MINIMA = 0.75
+
+def preparar_base(url: str, sesiones: int):
+    """Crea las tablas, el tablero en vivo y el historial (en otro proceso para no compartir el motor)"""
+    codigo = f"""
+from sqlalchemy import insert
+from app.database import Base, SessionLocal, engine
+from app.models.info_session import InfoSession
+from app.models.recruiter import Recruiter
+import app.models
+Base.metadata.create_all(bind=engine)
+db = SessionLocal()
+recruiters = [Recruiter(name=f"Recruiter {{i}}", email=f"r{{i}}@kelly.test") for i in range(5)]
+db.add_all(recruiters)
+db.flush()
+for i in range({SESIONES_EN_VIVO}):
+    session = InfoSession(
+        first_name=f"Nombre{{i}}", last_name="Prueba", email=f"n{{i}}@kelly.test", phone="305",
+        zip_code="33101", session_type="new-hire", time_slot="8:30 AM",
+        status="registered", assigned_recruiter_id=recruiters[i % 5].id
+    )
+    db.add(session)
+db.commit()
+historial = [
+    dict(first_name=f"Hist{{i}}", last_name="Prueba", email=f"h{{i}}@kelly.test", phone="305", zip_code="33101",
+         session_type="new-hire", time_slot="1:30 PM", status="completed", change_seq={SESIONES_EN_VIVO} + i,
+         assigned_recruiter_id=recruiters[i % 5].id)
+    for i in range({sesiones})
+]
+db.execute(insert(InfoSession), historial)
+db.commit()
+db.close()
+"""
+    subprocess.run([sys.executable, "-c", codigo], check=True, cwd=Path(url[len("sqlite:///"):]).parent, env=dict(os.environ, DATABASE_URL=url))
+
+async def cliente(http: httpx.AsyncClient, fin: float, tiempos: dict, errores: list, desfase: int):
+    """Un cliente que repite las rutas en orden hasta que se acaba el tiempo"""
+    i = desfase
+    while time.perf_counter() < fin:
+        ruta = RUTAS[i % len(RUTAS)]
+        i += 1
+        inicio = time.perf_counter()
+        try:
+            respuesta = await http.get(BASE + ruta)
+        except httpx.HTTPError as e:
+            # Servidor bloqueado (p. ej. esperando una conexión del pool en el event loop)
+            errores.append(type(e).__name__)
+            continue
+        tiempos[ruta].append((time.perf_counter() - inicio) * 1000)
+        if respuesta.status_code != 200:
+            errores.append(respuesta.status_code)
+
+async def medir(concurrentes: int, segundos: float):
+    tiempos, errores = {ruta: [] for ruta in RUTAS}, []
+    limites = httpx.Limits(max_connections=concurrentes, max_keepalive_connections=concurrentes)
+    async with httpx.AsyncClient(limits=limites, timeout=TIEMPO_MAXIMO) as http:
+        fin = time.perf_counter() + segundos
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente(http, fin, tiempos, errores, n) for n in range(concurrentes)))
+        duracion = time.perf_counter() - inicio
+    todos = sorted(t for valores in tiempos.values() for t in valores) or [TIEMPO_MAXIMO * 1000]
+    return {
+        "rps": len(todos) / duracion,
+        "p50": statistics.median(todos),
+        "p95": todos[int(len(todos) * 0.95) - 1],
+        "p50_ruta": {ruta: statistics.median(valores) for ruta, valores in tiempos.items() if valores},
+        "errores": len(errores),
+    }
+
+def esperar_servidor(proceso: subprocess.Popen):
+    for _ in range(100):
+        if proceso.poll() is not None:
+            raise RuntimeError("uvicorn terminó antes de arrancar")
+        try:
+            if httpx.get(BASE + "/health").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("uvicorn no respondió")
+
+def main():
+    sesiones = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    segundos = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    # Copia del backend: las migraciones de main.py abren kelly_app.db junto a main.py
+    directorio = tempfile.mkdtemp()
+    backend = Path(__file__).parent
+    shutil.copytree(backend / "app", Path(directorio) / "app", ignore=shutil.ignore_patterns("__pycache__"))
+    shutil.copy(backend / "main.py", directorio)
+    url = f"sqlite:///{Path(directorio) / 'kelly_app.db'}"
+
+    print(f"📊 Concurrencia con {SESIONES_EN_VIVO} sesiones en vivo y {sesiones} en el historial, {segundos:.0f} s por nivel")
+    preparar_base(url, sesiones)
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PUERTO), "--log-level", "warning"],
+        cwd=directorio, env=dict(os.environ, DATABASE_URL=url), stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT
+    )
+    try:
+        esperar_servidor(proceso)
+        resultados = {}
+        for concurrentes in NIVELES:
+            resultados[concurrentes] = r = asyncio.run(medir(concurrentes, segundos))
+            print(f"  {concurrentes:>2} clientes: {r['rps']:7.1f} req/s   p50 {r['p50']:6.1f} ms   p95 {r['p95']:6.1f} ms   errores {r['errores']}")
+            print("      " + "   ".join(f"{ruta.split('?')[0]} {p50:.1f} ms" for ruta, p50 in r["p50_ruta"].items()))
+    finally:
+        proceso.terminate()
+        try:
+            proceso.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proceso.kill()
+
+    escala = resultados[NIVELES[-1]]["rps"] / resultados[1]["rps"]
+    print(f"  Rendimiento con {NIVELES[-1]} clientes: {escala:.2f}x el de 1 cliente ({os.cpu_count()} CPU)")
+    if os.cpu_count() == 1:
+        print("  ℹ️  Con un solo CPU el rendimiento no puede crecer; se verifica que no se bloquee ni se degrade")
+    if any(r["errores"] for r in resultados.values()):
+        print("❌ Hubo peticiones con error o sin respuesta")
+        sys.exit(1)
+    if escala < ESCALA_MINIMA:
+        print("❌ El rendimiento se degrada al aumentar los clientes")
+        sys.exit(1)
+    print("✅ El servidor atiende todos los niveles de concurrencia sin errores ni bloqueos")
+
+if __name__ == "__main__":
+    main()
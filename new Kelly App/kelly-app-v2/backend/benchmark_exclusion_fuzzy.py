@@ -0,0 +1,90 @@
+"""
+Script para medir la búsqueda difusa (fuzzy) en la lista de exclusión:
+construye el índice con una lista sintética y mide la latencia de cada
+verificación de nombre con errores de escritura, acentos y apellidos invertidos
+
+Uso: python benchmark_exclusion_fuzzy.py [nombres] [presupuesto_ms]
+No toca kelly_app.db
+"""
+import random
+import statistics
+import sys
+import time
+
+from app.services.exclusion_index import ExclusionEntry, ExclusionIndex
+from app.services.name_matching import EXCLUSION_FUZZY_THRESHOLD, name_keys
+
+SYLLABLES = ["AL", "BER", "CA", "DE", "EL", "FER", "GA", "HER", "IS", "JO", "KA", "LO", "MA", "NA", "OR",
+             "PE", "QUI", "RO", "SAN", "TO", "VA", "ZA", "NEZ", "LEZ", "RIA", "DRO", "CHEZ", "RES", "TIN", "SON"]
+FIRST_NAMES = ["JOSÉ", "MARÍA", "JUAN", "ANA", "LUIS", "CARMEN", "JAMES", "MARY", "ROBERT", "LINDA", "MICHAEL",
+               "PATRICIA", "DAVID", "JENNIFER", "CARLOS", "SOFÍA", "JORGE", "LUCÍA", "PEDRO", "ELENA"]
+
+def apellido() -> str:
+    """Apellido sintético de 2 o 3 sílabas (muchos apellidos distintos, como en la lista real)"""
+    return "".join(random.choice(SYLLABLES) for _ in range(random.randint(2, 3)))
+
+def generar_entradas(nombres: int):
+    """Entradas con las claves ya calculadas, como quedan guardadas al subir el archivo"""
+    entradas = []
+    for i in range(nombres):
+        nombre = f"{random.choice(FIRST_NAMES)} {apellido()}"
+        if i % 3 == 0:
+            nombre += f"-{apellido()}"
+        normalizado, fonetico = name_keys(nombre)
+        entradas.append(ExclusionEntry(id=i + 1, name=nombre, name_normalized=normalizado, name_phonetic=fonetico))
+    return entradas
+
+def con_error(texto: str) -> str:
+    """Introduce un error de escritura (cambio, omisión o duplicado de una letra)"""
+    posicion = random.randrange(len(texto))
+    tipo = random.choice(["cambio", "omision", "duplicado"])
+    if tipo == "cambio":
+        return texto[:posicion] + random.choice("AEIOUSZ") + texto[posicion + 1:]
+    if tipo == "omision" and len(texto) > 3:
+        return texto[:posicion] + texto[posicion + 1:]
+    return texto[:posicion] + texto[posicion] + texto[posicion:]
+
+def generar_consulta(entrada: ExclusionEntry):
+    """Consulta (nombre, apellido) derivada de una entrada: sin acentos, con errores o apellidos invertidos"""
+    tokens = entrada.name_normalized.split()
+    nombre, apellidos = tokens[0], tokens[1:]
+    variante = random.choice(["error", "invertido", "sin_acentos"])
+    if variante == "error":
+        apellidos = [con_error(apellidos[0])] + apellidos[1:]
+    elif variante == "invertido":
+        apellidos = list(reversed(apellidos))
+    return nombre.title(), "-".join(apellidos).title()
+
+def main():
+    nombres = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    presupuesto_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 50.0
+    random.seed(42)
+
+    print(f"📊 Búsqueda difusa en una lista de {nombres} nombres (umbral {EXCLUSION_FUZZY_THRESHOLD})")
+    entradas = generar_entradas(nombres)
+    inicio = time.perf_counter()
+    indice = ExclusionIndex(entradas)
+    print(f"  Índice construido en {time.perf_counter() - inicio:.2f} s")
+
+    consultas = [(entrada, generar_consulta(entrada)) for entrada in random.sample(entradas, 500)]
+    tiempos = []
+    encontrados = 0
+    for entrada, (nombre, apellidos) in consultas:
+        inicio = time.perf_counter()
+        resultados = indice.search_fuzzy(nombre, apellidos, EXCLUSION_FUZZY_THRESHOLD)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        if any(resultado.id == entrada.id for resultado, _ in resultados):
+            encontrados += 1
+
+    tiempos.sort()
+    p50 = statistics.median(tiempos)
+    p95 = tiempos[int(len(tiempos) * 0.95) - 1]
+    print(f"  Latencia p50 {p50:.2f} ms, p95 {p95:.2f} ms, máx {tiempos[-1]:.2f} ms")
+    print(f"  Encontrados {encontrados}/{len(consultas)} nombres con errores")
+    if p95 > presupuesto_ms:
+        print(f"❌ p95 por encima del presupuesto de {presupuesto_ms:.0f} ms")
+        sys.exit(1)
+    print(f"✅ p95 dentro del presupuesto de {presupuesto_ms:.0f} ms")
+
+if __name__ == "__main__":
+    main()
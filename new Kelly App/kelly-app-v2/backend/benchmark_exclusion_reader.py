@@ -0,0 +1,62 @@
+"""
+Script para medir la memoria al leer un archivo de lista de exclusión:
+pd.read_excel del archivo completo contra la lectura por bloques
+(openpyxl en modo read-only / csv) que usa el upload
+
+Uso: python benchmark_exclusion_reader.py [filas]
+"""
+import io
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from app.services.exclusion_reader import iter_exclusion_chunks
+from app.services.exclusion_ingest import prepare_exclusion_records
+from benchmark_exclusion_upload import generar_dataframe
+
+def medir(nombre: str, funcion) -> None:
+    """Ejecuta una lectura y muestra el tiempo y el pico de memoria de Python"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    filas = funcion()
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {nombre:<16} {segundos:7.2f} s  pico {pico / 1024 / 1024:8.1f} MB  ({filas} filas)")
+
+def lectura_completa(path: Path) -> int:
+    """Camino anterior: bytes completos + DataFrame completo"""
+    contents = path.read_bytes()
+    df = pd.read_excel(io.BytesIO(contents)) if path.suffix == ".xlsx" else pd.read_csv(io.BytesIO(contents))
+    df.columns = df.columns.str.strip().str.lower()
+    records, _ = prepare_exclusion_records(df)
+    return len(records)
+
+def lectura_por_bloques(path: Path) -> int:
+    """Camino nuevo: un bloque de filas en memoria a la vez"""
+    total = 0
+    for df, first_row_number in iter_exclusion_chunks(str(path)):
+        records, _ = prepare_exclusion_records(df, first_row_number=first_row_number)
+        total += len(records)
+    return total
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    df = generar_dataframe(filas)
+    with tempfile.TemporaryDirectory() as tmp:
+        for extension in (".xlsx", ".csv"):
+            path = Path(tmp) / f"lista{extension}"
+            if extension == ".xlsx":
+                df.to_excel(path, index=False)
+            else:
+                df.to_csv(path, index=False)
+            print(f"📊 {path.name}: {filas} filas, {path.stat().st_size / 1024 / 1024:.1f} MB en disco")
+            medir("completo", lambda: lectura_completa(path))
+            medir("por bloques", lambda: lectura_por_bloques(path))
+
+if __name__ == "__main__":
+    main()
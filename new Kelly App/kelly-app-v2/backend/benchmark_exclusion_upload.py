@@ -0,0 +1,101 @@
+"""
+Script para comparar la carga de la lista de exclusión:
+el camino anterior (iterrows + db.add por fila) contra la ingesta en bloque
+(columnas vectorizadas + inserts por lotes)
+
+Uso: python benchmark_exclusion_upload.py [filas]
+Usa bases de datos SQLite temporales, no toca kelly_app.db
+"""
+import sys
+import tempfile
+import time
+import random
+from pathlib import Path
+
+import pandas as pd
+from dateutil import parser
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.exclusion_list import ExclusionList
+from app.services.exclusion_ingest import ingest_exclusion_frame
+
+FIRST_NAMES = ["john", "maria", "jose", "ana", "luis", "carmen", "james", "mary", "robert", "linda"]
+LAST_NAMES = ["smith", "garcia", "rodriguez", "lopez", "johnson", "williams", "brown", "perez", "diaz", "lee"]
+
+def generar_dataframe(filas: int) -> pd.DataFrame:
+    """Genera un DataFrame con el mismo formato que el Excel de la lista PC/RR"""
+    random.seed(42)
+    return pd.DataFrame({
+        "name": [f"{random.choice(FIRST_NAMES)} {random.choice(LAST_NAMES)} {i}" for i in range(filas)],
+        "code": [random.choice(["PC", "RR", None]) for _ in range(filas)],
+        "dob": [f"{random.randint(1950, 2004)}-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}" if i % 7 else None for i in range(filas)],
+        "ssn": [float(random.randint(1000, 9999)) if i % 5 else None for i in range(filas)],
+    })
+
+def carga_anterior(db, df: pd.DataFrame):
+    """Copia del camino anterior de upload_exclusion_list (para comparar)"""
+    added_count = 0
+    errors = []
+    for index, row in df.iterrows():
+        try:
+            name = str(row.get('name', '')).strip()
+            if not name or name == 'nan':
+                continue
+            code = str(row.get('code', '')).strip() if pd.notna(row.get('code')) else None
+            code = code if code and code != 'nan' else None
+            ssn = str(row.get('ssn', '')).strip() if pd.notna(row.get('ssn')) else None
+            ssn = ssn if ssn and ssn != 'nan' else None
+            dob = None
+            if pd.notna(row.get('dob')):
+                try:
+                    dob_value = row.get('dob')
+                    if isinstance(dob_value, str):
+                        dob = parser.parse(dob_value).date()
+                    elif hasattr(dob_value, 'date'):
+                        dob = dob_value.date()
+                    else:
+                        dob = pd.to_datetime(dob_value).date()
+                except:
+                    pass
+            db.add(ExclusionList(name=name.upper(), code=code, dob=dob, ssn=ssn))
+            added_count += 1
+        except Exception as e:
+            errors.append(f"Row {index + 2}: {str(e)}")
+    db.commit()
+    return added_count, errors
+
+def carga_en_bloque(db, df: pd.DataFrame):
+    """Camino nuevo: ingest_exclusion_frame + commit"""
+    result = ingest_exclusion_frame(db, df)
+    db.commit()
+    return result
+
+def medir(nombre: str, funcion, df: pd.DataFrame, directorio: Path) -> float:
+    """Ejecuta una carga contra una base de datos nueva y devuelve los segundos"""
+    engine = create_engine(f"sqlite:///{directorio / (nombre + '.db')}")
+    Base.metadata.create_all(bind=engine, tables=[ExclusionList.__table__])
+    db = sessionmaker(bind=engine)()
+    try:
+        inicio = time.perf_counter()
+        added, errors = funcion(db, df)
+        segundos = time.perf_counter() - inicio
+    finally:
+        db.close()
+        engine.dispose()
+    print(f"  {nombre:<10} {segundos:8.2f} s  ({added} filas, {len(errors)} errores)")
+    return segundos
+
+def main():
+    filas = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    df = generar_dataframe(filas)
+    print(f"📊 Carga de lista de exclusión con {filas} filas")
+    with tempfile.TemporaryDirectory() as tmp:
+        directorio = Path(tmp)
+        anterior = medir("anterior", carga_anterior, df, directorio)
+        bloque = medir("bloque", carga_en_bloque, df, directorio)
+    print(f"✅ Aceleración: {anterior / bloque:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Script para medir la latencia del registro en el kiosco (POST /api/info-session/register):
+levanta uvicorn con una base de datos SQLite temporal con historial y mide p50/p99
+con un solo kiosco registrando uno tras otro y con ráfagas de 30 kioscos a la vez
+
+Mide también el camino anterior (ORM add/commit y recarga de la sesión), montado solo
+en la copia temporal como /register-orm, para poder repetir la comparación
+
+Uso: python benchmark_registro.py [registros_un_kiosco] [ráfagas] [sesiones_historial]
+No toca kelly_app.db
+"""
+import asyncio
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+PUERTO = 3992
+BASE = f"http://127.0.0.1:{PUERTO}"
+KIOSCOS_RAFAGA = 30
+HORARIOS = ["8:30 AM", "1:30 PM"]
+# Segundos sin respuesta para contar un registro como error
+TIEMPO_MAXIMO = 30
+
+def preparar_base(url: str, sesiones: int):
+    """Crea las tablas y el historial de sesiones completadas (en otro proceso para no compartir el motor)"""
+    codigo = f"""
+from sqlalchemy import insert
+from app.database import Base, SessionLocal, engine
+from app.models.info_session import InfoSession
+import app.models
+Base.metadata.create_all(bind=engine)
+db = SessionLocal()
+historial = [
+    dict(first_name=f"Hist{{i}}", last_name="Prueba", email=f"h{{i}}@kelly.test", phone="305", zip_code="33101",
+         session_type="new-hire", time_slot="1:30 PM", status="completed", change_seq=i + 1)
+    for i in range({sesiones})
+]
+if historial:
+    db.execute(insert(InfoSession), historial)
+db.commit()
+db.close()
+"""
+    subprocess.run([sys.executable, "-c", codigo], check=True, cwd=Path(url[len("sqlite:///"):]).parent, env=dict(os.environ, DATABASE_URL=url))
+
+# Registro como era antes de register_session: inicializar recruiters en cada registro,
+# add + commit por el ORM y recargar la sesión con su recruiter para la respuesta
+REGISTRO_ORM = """
+from fastapi import Depends, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from main import app
+from app.database import get_db
+from app.api.info_session import InfoSessionRegistration, InfoSessionResponse, load_board_session
+from app.models.info_session import InfoSession
+from app.services.business_day import business_today
+from app.services.event_broker import publish_event
+from app.services.exclusion_service import get_exclusion_match_snapshot
+from app.services.lobby_queue import track_session
+from app.services.recruiter_service import get_next_recruiter, initialize_default_recruiters, release_recruiter
+from app.services.step_catalog import step_items
+
+@app.post("/api/info-session/register-orm", status_code=status.HTTP_201_CREATED)
+async def registrar_orm(registration: InfoSessionRegistration, db: AsyncSession = Depends(get_db)):
+    await db.run_sync(initialize_default_recruiters)
+    exclusion_match = await db.run_sync(get_exclusion_match_snapshot, registration.first_name, registration.last_name)
+    assignment_date = business_today()
+    recruiter = await db.run_sync(get_next_recruiter, registration.time_slot, assignment_date)
+    info_session = InfoSession(
+        **registration.model_dump(),
+        is_in_exclusion_list=exclusion_match is not None,
+        exclusion_warning_shown=exclusion_match is not None,
+        exclusion_match=exclusion_match,
+        status="registered",
+        assigned_recruiter_id=recruiter.id if recruiter else None,
+        business_date=assignment_date
+    )
+    db.add(info_session)
+    try:
+        await db.commit()
+    except Exception:
+        if recruiter:
+            release_recruiter(recruiter.id, registration.time_slot, assignment_date)
+        raise
+    info_session = await load_board_session(db, info_session.id)
+    publish_event("sessions", "session.created", {"session_id": info_session.id, "status": info_session.status})
+    await db.run_sync(track_session, info_session)
+    response_data = InfoSessionResponse.model_validate(info_session).model_dump()
+    response_data["assigned_recruiter_name"] = recruiter.name if recruiter else None
+    response_data["steps"] = step_items(info_session.steps_version, info_session.steps_completed)
+    return response_data
+"""
+
+# Nombre -> ruta medida
+CAMINOS = {
+    "nuevo (un INSERT)": "/api/info-session/register",
+    "anterior (ORM)": "/api/info-session/register-orm",
+}
+
+def formulario(n: int) -> dict:
+    return {
+        "first_name": f"Visitante{n}", "last_name": "Registro", "email": f"v{n}@kellyeducation.com", "phone": "3055550000",
+        "zip_code": "33101", "session_type": "new-hire", "time_slot": HORARIOS[n % len(HORARIOS)]
+    }
+
+async def registrar(http: httpx.AsyncClient, ruta: str, n: int, tiempos: list, errores: list):
+    inicio = time.perf_counter()
+    try:
+        respuesta = await http.post(BASE + ruta, json=formulario(n))
+    except httpx.HTTPError as e:
+        errores.append(type(e).__name__)
+        return
+    tiempos.append((time.perf_counter() - inicio) * 1000)
+    if respuesta.status_code != 201:
+        errores.append(respuesta.status_code)
+
+async def un_kiosco(ruta: str, registros: int, inicio: int):
+    tiempos, errores = [], []
+    async with httpx.AsyncClient(timeout=TIEMPO_MAXIMO) as http:
+        for n in range(inicio, inicio + registros):
+            await registrar(http, ruta, n, tiempos, errores)
+    return tiempos, errores
+
+async def rafagas(ruta: str, cantidad: int, inicio: int):
+    """KIOSCOS_RAFAGA registros a la vez, cantidad veces (cada ráfaga espera a la anterior)"""
+    tiempos, errores = [], []
+    limites = httpx.Limits(max_connections=KIOSCOS_RAFAGA, max_keepalive_connections=KIOSCOS_RAFAGA)
+    async with httpx.AsyncClient(limits=limites, timeout=TIEMPO_MAXIMO) as http:
+        for rafaga in range(cantidad):
+            primero = inicio + rafaga * KIOSCOS_RAFAGA
+            await asyncio.gather(*(registrar(http, ruta, n, tiempos, errores) for n in range(primero, primero + KIOSCOS_RAFAGA)))
+    return tiempos, errores
+
+def percentil(valores: list, p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[max(0, int(round(len(ordenados) * p / 100)) - 1)]
+
+def esperar_servidor(proceso: subprocess.Popen):
+    for _ in range(100):
+        if proceso.poll() is not None:
+            raise RuntimeError("uvicorn terminó antes de arrancar")
+        try:
+            if httpx.get(BASE + "/health").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("uvicorn no respondió")
+
+def main():
+    registros = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    cantidad_rafagas = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    sesiones = int(sys.argv[3]) if len(sys.argv) > 3 else 20000
+    # Copia del backend: las migraciones de main.py abren kelly_app.db junto a main.py
+    directorio = tempfile.mkdtemp()
+    backend = Path(__file__).parent
+    shutil.copytree(backend / "app", Path(directorio) / "app", ignore=shutil.ignore_patterns("__pycache__"))
+    shutil.copy(backend / "main.py", directorio)
+    (Path(directorio) / "registro_orm.py").write_text(REGISTRO_ORM)
+    url = f"sqlite:///{Path(directorio) / 'kelly_app.db'}"
+
+    print(f"📊 Registro con {sesiones} sesiones en el historial")
+    preparar_base(url, sesiones)
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "registro_orm:app", "--port", str(PUERTO), "--log-level", "warning"],
+        cwd=directorio, env=dict(os.environ, DATABASE_URL=url), stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT
+    )
+    try:
+        esperar_servidor(proceso)
+        resultados = {}
+        siguiente = 0
+        for camino, ruta in CAMINOS.items():
+            # Un registro de calentamiento (índice de exclusión, contadores del día)
+            asyncio.run(un_kiosco(ruta, 1, siguiente))
+            siguiente += 1
+            resultados[f"{camino}, un kiosco"] = asyncio.run(un_kiosco(ruta, registros, siguiente))
+            siguiente += registros
+            resultados[f"{camino}, ráfagas de {KIOSCOS_RAFAGA}"] = asyncio.run(rafagas(ruta, cantidad_rafagas, siguiente))
+            siguiente += cantidad_rafagas * KIOSCOS_RAFAGA
+    finally:
+        proceso.terminate()
+        try:
+            proceso.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proceso.kill()
+
+    hubo_errores = False
+    for nombre, (tiempos, errores) in resultados.items():
+        if not tiempos:
+            print(f"  {nombre:<38} sin registros completados   errores {len(errores)}")
+            hubo_errores = True
+            continue
+        print(
+            f"  {nombre:<38} {len(tiempos):>4} registros   p50 {statistics.median(tiempos):6.1f} ms   "
+            f"p99 {percentil(tiempos, 99):6.1f} ms   máx {max(tiempos):6.1f} ms   errores {len(errores)}"
+        )
+        hubo_errores = hubo_errores or bool(errores)
+    if hubo_errores:
+        print("❌ Hubo registros con error o sin respuesta")
+        sys.exit(1)
+    print("✅ Todos los registros se guardaron")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Script para probar escrituras concurrentes en SQLite (ráfaga de registros de las 8:30 AM):
+varios procesos, cada uno con varios hilos registrando sesiones a la vez mientras otro
+hilo lee el historial como lo haría el dashboard. Compara el perfil "default" de SQLite
+con el perfil "tuned" de app.database (WAL, busy_timeout, synchronous=NORMAL, ...)
+
+Uso: python estres_escrituras_sqlite.py [procesos] [hilos_por_proceso] [registros_por_hilo]
+No toca kelly_app.db
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PERFILES = ["default", "tuned"]
+# Sesiones completadas que el lector recorre en cada consulta
+HISTORIAL = 50000
+
+PREPARAR = f"""
+from sqlalchemy import insert
+from app.database import Base, SessionLocal, engine
+from app.models.info_session import InfoSession
+import app.models
+Base.metadata.create_all(bind=engine)
+db = SessionLocal()
+db.execute(insert(InfoSession), [
+    dict(first_name=f"Hist{{i}}", last_name="Prueba", email=f"h{{i}}@kelly.test", phone="305", zip_code="33101",
+         session_type="new-hire", time_slot="1:30 PM", status="completed", change_seq=i)
+    for i in range({HISTORIAL})
+])
+db.commit()
+db.close()
+"""
+
+# Un proceso trabajador: hilos que registran sesiones y un hilo que lee mientras tanto
+TRABAJADOR = """
+import json, sys, threading, time
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+from app.database import SessionLocal
+from app.models.info_session import InfoSession
+import app.models
+
+proceso, hilos, registros = int(sys.argv[1]), int(sys.argv[2]), int(sys.argv[3])
+latencias, bloqueos, otros = [], [], []
+terminado = threading.Event()
+
+def registrar(hilo):
+    for n in range(registros):
+        inicio = time.perf_counter()
+        db = SessionLocal()
+        try:
+            session = InfoSession(
+                first_name=f"P{proceso}H{hilo}", last_name=f"R{n}", email=f"p{proceso}h{hilo}r{n}@kelly.test",
+                phone="305", zip_code="33101", session_type="new-hire", time_slot="8:30 AM", status="registered"
+            )
+            db.add(session)
+            db.commit()
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        except OperationalError as e:
+            db.rollback()
+            (bloqueos if "locked" in str(e) else otros).append(str(e.orig))
+        finally:
+            db.close()
+
+def leer():
+    while not terminado.is_set():
+        db = SessionLocal()
+        try:
+            db.execute(select(InfoSession.status, func.count()).group_by(InfoSession.status)).all()
+        except OperationalError as e:
+            (bloqueos if "locked" in str(e) else otros).append(str(e.orig))
+        finally:
+            db.close()
+
+lector = threading.Thread(target=leer)
+lector.start()
+escritores = [threading.Thread(target=registrar, args=(h,)) for h in range(hilos)]
+for t in escritores:
+    t.start()
+for t in escritores:
+    t.join()
+terminado.set()
+lector.join()
+print(json.dumps({"latencias": latencias, "bloqueos": len(bloqueos), "otros": otros[:3]}))
+"""
+
+def entorno(url: str, perfil: str) -> dict:
+    return dict(os.environ, DATABASE_URL=url, SQLITE_PROFILE=perfil)
+
+def contar_registradas(url: str, perfil: str) -> int:
+    codigo = (
+        "from app.database import SessionLocal\nfrom app.models.info_session import InfoSession\nimport app.models\n"
+        "db = SessionLocal()\nprint(db.query(InfoSession).filter(InfoSession.status == 'registered').count())\n"
+    )
+    salida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True,
+                            cwd=Path(__file__).parent, env=entorno(url, perfil))
+    return int(salida.stdout.strip())
+
+def probar(perfil: str, procesos: int, hilos: int, registros: int) -> dict:
+    directorio = tempfile.mkdtemp()
+    url = f"sqlite:///{Path(directorio) / 'estres.db'}"
+    backend = Path(__file__).parent
+    subprocess.run([sys.executable, "-c", PREPARAR], check=True, cwd=backend, env=entorno(url, perfil))
+
+    inicio = time.perf_counter()
+    trabajadores = [
+        subprocess.Popen([sys.executable, "-c", TRABAJADOR, str(p), str(hilos), str(registros)],
+                         cwd=backend, env=entorno(url, perfil), stdout=subprocess.PIPE, text=True)
+        for p in range(procesos)
+    ]
+    resultados = [json.loads(t.communicate()[0].strip().splitlines()[-1]) for t in trabajadores]
+    duracion = time.perf_counter() - inicio
+
+    latencias = sorted(l for r in resultados for l in r["latencias"])
+    return {
+        "escritas": len(latencias),
+        "en_base": contar_registradas(url, perfil),
+        "bloqueos": sum(r["bloqueos"] for r in resultados),
+        "otros": [e for r in resultados for e in r["otros"]],
+        "por_segundo": len(latencias) / duracion,
+        "p50": statistics.median(latencias) if latencias else 0,
+        "p95": latencias[int(len(latencias) * 0.95) - 1] if latencias else 0,
+    }
+
+def main():
+    procesos = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    hilos = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    registros = int(sys.argv[3]) if len(sys.argv) > 3 else 25
+    esperadas = procesos * hilos * registros
+
+    print(f"📊 {procesos} procesos x {hilos} hilos x {registros} registros = {esperadas} escrituras, con lectores concurrentes")
+    resultados = {}
+    for perfil in PERFILES:
+        resultados[perfil] = r = probar(perfil, procesos, hilos, registros)
+        print(f"  {perfil:>8}: {r['escritas']}/{esperadas} escritas   {r['por_segundo']:7.1f} escrituras/s   "
+              f"p50 {r['p50']:7.1f} ms   p95 {r['p95']:7.1f} ms   'database is locked': {r['bloqueos']}")
+        for error in r["otros"]:
+            print(f"      otro error: {error}")
+
+    tuned = resultados["tuned"]
+    if tuned["bloqueos"] or tuned["otros"]:
+        print("❌ El perfil tuned tuvo errores de escritura")
+        sys.exit(1)
+    if tuned["escritas"] != esperadas or tuned["en_base"] != esperadas:
+        print(f"❌ Faltan registros: {tuned['en_base']} en la base de {esperadas}")
+        sys.exit(1)
+    print("✅ Todas las escrituras concurrentes terminaron sin 'database is locked' con el perfil tuned")
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,28 @@
 Kelly Education Front Desk - Backend API
 FastAPI application running on port 3026
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+import asyncio
 import uvicorn
 
-from app.api import info_session, admin, announcements, info_session_config, new_hire_orientation_config, recruiter, auth, visits, exclusion_list, row_template
-from app.database import engine, Base, SessionLocal
+from app.api import info_session, admin, announcements, info_session_config, new_hire_orientation_config, recruiter, auth, visits, exclusion_list, row_template, events, archive, sync
+from app.database import engine, Base, SessionLocal, optimize_database, SQLITE_OPTIMIZE_INTERVAL_HOURS
 from app.services.user_service import initialize_default_admin
+from app.services.recruiter_service import initialize_default_recruiters
+from app.services.exclusion_index import rebuild_exclusion_index
+from app.services.exclusion_versions import ensure_active_version
+from app.services.exclusion_ingest import backfill_exclusion_name_keys
+from app.services.exclusion_service import rematch_info_sessions
+from app.services.business_day import business_date
+from app.services.archive_service import ARCHIVE_INTERVAL_HOURS, VISIT_ARCHIVES, run_archive
+from app.models.archive import ArchivedInfoSession
+from app.models.info_session import InfoSession
+from app.services.step_catalog import steps_mask
+from datetime import datetime
+from sqlalchemy.schema import CreateIndex, CreateTable
 import sqlite3
 from pathlib import Path
 
@@ -29,11 +43,149 @@ try:
             cursor.execute("ALTER TABLE info_sessions ADD COLUMN generated_row TEXT")
             conn.commit()
             print("✅ Campo 'generated_row' agregado exitosamente")
+        if 'exclusion_match' not in columns:
+            print("📝 Agregando campo 'exclusion_match' a la tabla info_sessions...")
+            cursor.execute("ALTER TABLE info_sessions ADD COLUMN exclusion_match JSON")
+            conn.commit()
+            print("✅ Campo 'exclusion_match' agregado exitosamente")
+        if 'change_seq' not in columns:
+            print("📝 Agregando campo 'change_seq' a la tabla info_sessions...")
+            cursor.execute("ALTER TABLE info_sessions ADD COLUMN change_seq INTEGER")
+            # Existing sessions get increasing values so delta sync cursors work right away
+            cursor.execute("UPDATE info_sessions SET change_seq = id")
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_info_sessions_change_seq ON info_sessions (change_seq)")
+            conn.commit()
+            print("✅ Campo 'change_seq' agregado exitosamente")
+        cursor.execute("PRAGMA table_info(exclusion_list)")
+        columns = [col[1] for col in cursor.fetchall()]
+        if columns and 'version_id' not in columns:
+            print("📝 Agregando campo 'version_id' a la tabla exclusion_list...")
+            cursor.execute("ALTER TABLE exclusion_list ADD COLUMN version_id INTEGER REFERENCES exclusion_list_versions(id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_exclusion_list_version_id ON exclusion_list (version_id)")
+            conn.commit()
+            print("✅ Campo 'version_id' agregado exitosamente")
+        if columns and 'name_normalized' not in columns:
+            print("📝 Agregando campos 'name_normalized' y 'name_phonetic' a la tabla exclusion_list...")
+            cursor.execute("ALTER TABLE exclusion_list ADD COLUMN name_normalized VARCHAR(255)")
+            cursor.execute("ALTER TABLE exclusion_list ADD COLUMN name_phonetic VARCHAR(255)")
+            conn.commit()
+            print("✅ Campos 'name_normalized' y 'name_phonetic' agregados exitosamente")
+        for table in ("info_sessions", "new_hire_orientations", "badges", "fingerprints", "team_visits"):
+            cursor.execute(f"PRAGMA table_info({table})")
+            columns = [col[1] for col in cursor.fetchall()]
+            if columns and 'business_date' not in columns:
+                print(f"📝 Agregando campo 'business_date' a la tabla {table}...")
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN business_date DATE")
+                # Existing rows get the office date of their created_at (stored in UTC)
+                rows = cursor.execute(f"SELECT id, created_at FROM {table} WHERE created_at IS NOT NULL").fetchall()
+                cursor.executemany(
+                    f"UPDATE {table} SET business_date = ? WHERE id = ?",
+                    [(business_date(datetime.fromisoformat(created_at)).isoformat(), row_id) for row_id, created_at in rows]
+                )
+                conn.commit()
+                print(f"✅ Campo 'business_date' agregado exitosamente ({len(rows)} filas)")
         conn.close()
+        # Indexes declared on the models (create_all only adds them to new tables)
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
 except Exception as e:
-    print(f"⚠️  Warning: Could not add generated_row field: {e}")
+    print(f"⚠️  Warning: Could not add generated_row/exclusion_match/change_seq/version_id/name key/business_date fields or indexes: {e}")
     print("   The field will be added automatically on next database creation.")
 
+# Step progress moves from info_session_steps rows to a bitmask on the session (migration)
+# Sessions registered before the step catalog used its version 1 steps. The old rows
+# (with each step's completed_at) are kept, renamed to *_legacy; drop those tables by
+# hand once they are no longer needed
+try:
+    db_path = Path(__file__).parent / "kelly_app.db"
+    if db_path.exists():
+        conn = sqlite3.connect(str(db_path))
+        cursor = conn.cursor()
+        for table, steps_table in (("info_sessions", "info_session_steps"), ("info_sessions_archive", "info_session_steps_archive")):
+            cursor.execute(f"PRAGMA table_info({table})")
+            columns = [col[1] for col in cursor.fetchall()]
+            if not columns:
+                continue
+            if 'steps_completed' not in columns:
+                print(f"📝 Agregando campos 'steps_version' y 'steps_completed' a la tabla {table}...")
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN steps_version INTEGER NOT NULL DEFAULT 1")
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN steps_completed INTEGER NOT NULL DEFAULT 0")
+                conn.commit()
+                print(f"✅ Campos 'steps_version' y 'steps_completed' agregados exitosamente")
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?", (steps_table,))
+            if not cursor.fetchone():
+                continue
+            legacy_table = f"{steps_table}_legacy"
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = ?", (legacy_table,))
+            if cursor.fetchone():
+                print(f"⚠️  {steps_table} y {legacy_table} existen los dos; no se migra {steps_table}")
+                continue
+            print(f"📝 Pasando el progreso de {steps_table} a {table}.steps_completed...")
+            completed = {}
+            for session_id, step_name in cursor.execute(f"SELECT info_session_id, step_name FROM {steps_table} WHERE is_completed = 1").fetchall():
+                completed.setdefault(session_id, []).append(step_name)
+            cursor.executemany(
+                f"UPDATE {table} SET steps_completed = ? WHERE id = ?",
+                [(steps_mask(1, names), session_id) for session_id, names in completed.items()]
+            )
+            # Same transaction as the update: the table is only set aside once its progress is stored
+            cursor.execute(f"ALTER TABLE {steps_table} RENAME TO {legacy_table}")
+            conn.commit()
+            print(f"✅ Progreso de {len(completed)} sesiones guardado; tabla {steps_table} renombrada a {legacy_table}")
+        conn.close()
+except Exception as e:
+    print(f"⚠️  Warning: Could not move step progress to steps_completed: {e}")
+
+# Hot tables get AUTOINCREMENT ids (migration): archived rows keep their id in the
+# *_archive tables, so an id must never be handed out again once its row was archived.
+# SQLite cannot add AUTOINCREMENT to a table, so each one is rebuilt in one transaction
+try:
+    db_path = Path(__file__).parent / "kelly_app.db"
+    if db_path.exists():
+        conn = sqlite3.connect(str(db_path), isolation_level=None)
+        cursor = conn.cursor()
+        for hot_model, archive_model in ((InfoSession, ArchivedInfoSession), *VISIT_ARCHIVES.values()):
+            table, archive_name = hot_model.__table__, archive_model.__table__.name
+            row = cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table.name,)).fetchone()
+            if not row or "AUTOINCREMENT" in row[0].upper():
+                continue
+            print(f"📝 Reconstruyendo la tabla {table.name} con ids AUTOINCREMENT...")
+            existing = {col[1] for col in cursor.execute(f"PRAGMA table_info({table.name})").fetchall()}
+            columns = ", ".join(column.name for column in table.columns if column.name in existing)
+            new_table = f"{table.name}_autoincrement"
+            cursor.execute("BEGIN")
+            try:
+                create = str(CreateTable(table).compile(dialect=engine.dialect))
+                cursor.execute(create.replace(f"CREATE TABLE {table.name} (", f"CREATE TABLE {new_table} (", 1))
+                cursor.execute(f"INSERT INTO {new_table} ({columns}) SELECT {columns} FROM {table.name}")
+                cursor.execute(f"DROP TABLE {table.name}")
+                cursor.execute(f"ALTER TABLE {new_table} RENAME TO {table.name}")
+                # Rows that already got the id of an archived row move past every id in use
+                newest = cursor.execute(
+                    f"SELECT max(coalesce((SELECT max(id) FROM {table.name}), 0), coalesce((SELECT max(id) FROM {archive_name}), 0))"
+                ).fetchone()[0]
+                reused = [row_id for (row_id,) in cursor.execute(
+                    f"SELECT id FROM {table.name} WHERE id IN (SELECT id FROM {archive_name}) ORDER BY id"
+                ).fetchall()]
+                for row_id in reused:
+                    newest += 1
+                    cursor.execute(f"UPDATE {table.name} SET id = ? WHERE id = ?", (newest, row_id))
+                cursor.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table.name,))
+                cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table.name, newest))
+                for index in table.indexes:
+                    cursor.execute(str(CreateIndex(index).compile(dialect=engine.dialect)))
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            if reused:
+                print(f"⚠️  {len(reused)} filas de {table.name} tenían el id de una fila archivada; ahora van de {newest - len(reused) + 1} a {newest}")
+            print(f"✅ Tabla {table.name} reconstruida; los ids ya no se reutilizan")
+        conn.close()
+except Exception as e:
+    print(f"⚠️  Warning: Could not rebuild the session and visit tables with AUTOINCREMENT ids: {e}")
+
 # Initialize default admin user (non-blocking)
 try:
     db = SessionLocal()
@@ -45,10 +197,79 @@ except Exception as e:
     print(f"⚠️  Warning: Could not initialize admin user: {e}")
     print("   You can create the admin user manually later or fix the database.")
 
+# Seed the default recruiters once here instead of on every registration
+try:
+    db = SessionLocal()
+    try:
+        initialize_default_recruiters(db)
+    finally:
+        db.close()
+except Exception as e:
+    print(f"⚠️  Warning: Could not initialize default recruiters: {e}")
+    print("   Registrations are saved without a recruiter until recruiters are added.")
+
+# Build the in-memory exclusion list index from the active version (rebuilt on upload/clear/rollback)
+try:
+    db = SessionLocal()
+    try:
+        ensure_active_version(db)
+        # Rows loaded before fuzzy matching keys were stored get them once
+        keyed = backfill_exclusion_name_keys(db)
+        if keyed:
+            print(f"✅ Computed fuzzy matching keys for {keyed} exclusion list names")
+        exclusion_index = rebuild_exclusion_index(db)
+        print(f"✅ Exclusion list index built: {len(exclusion_index)} names")
+        # Sessions flagged before matches were stored get their snapshot once
+        backfilled = rematch_info_sessions(db, only_missing=True)
+        if backfilled:
+            print(f"✅ Stored exclusion match for {backfilled} info sessions")
+    finally:
+        db.close()
+except Exception as e:
+    print(f"⚠️  Warning: Could not build exclusion list index: {e}")
+    print("   The index will be built on the first exclusion check.")
+
+async def periodic_optimize(interval_hours: float):
+    """Run PRAGMA optimize every interval_hours in a worker thread"""
+    while True:
+        await asyncio.sleep(interval_hours * 3600)
+        try:
+            await asyncio.to_thread(optimize_database)
+        except Exception as e:
+            print(f"⚠️  Warning: Database optimize failed: {e}")
+
+async def periodic_archive(interval_hours: float):
+    """Move old sessions and visits to the archive now and then every interval_hours, in a worker thread"""
+    while True:
+        try:
+            moved = await asyncio.to_thread(run_archive)
+            if any(moved.values()):
+                print(f"✅ Archived: {', '.join(f'{count} {table}' for table, count in moved.items() if count)}")
+        except Exception as e:
+            print(f"⚠️  Warning: Archiving failed: {e}")
+        await asyncio.sleep(interval_hours * 3600)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Planner statistics are refreshed at startup and then periodically
+    try:
+        await asyncio.to_thread(optimize_database)
+    except Exception as e:
+        print(f"⚠️  Warning: Database optimize failed: {e}")
+    maintenance = []
+    if SQLITE_OPTIMIZE_INTERVAL_HOURS > 0:
+        maintenance.append(asyncio.create_task(periodic_optimize(SQLITE_OPTIMIZE_INTERVAL_HOURS)))
+    if ARCHIVE_INTERVAL_HOURS > 0:
+        maintenance.append(asyncio.create_task(periodic_archive(ARCHIVE_INTERVAL_HOURS)))
+    yield
+    for task in maintenance:
+        task.cancel()
+
 app = FastAPI(
     title="Kelly Education Front Desk API",
     description="Backend API for Kelly Education Miami Dade Front Desk",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
 # CORS configuration
@@ -74,6 +295,9 @@ app.include_router(new_hire_orientation_config.router, prefix="/api/new-hire-ori
 app.include_router(recruiter.router, prefix="/api/recruiter", tags=["Recruiter"])
 app.include_router(exclusion_list.router, prefix="/api/exclusion-list", tags=["Exclusion List"])
 app.include_router(row_template.router, prefix="/api/row-template", tags=["Row Template"])
+app.include_router(events.router, prefix="/api/events", tags=["Events"])
+app.include_router(archive.router, prefix="/api/archive", tags=["Archive"])
+app.include_router(sync.router, prefix="/api/sync", tags=["Offline Sync"])
 
 @app.get("/")
 async def root():
@@ -0,0 +1,180 @@
+"""
+Script para simular la espera en el lobby con cada estrategia de asignación de recruiters:
+repite las llegadas del historial de info_sessions (hora de registro y duración de cada
+atención) y asigna con las mismas funciones que usa el backend (balanced y soonest-free)
+
+Uso: python simular_asignacion.py [ruta_a_la_base.db]
+Sin ruta usa kelly_app.db si tiene historial suficiente, y si no, un historial sintético
+Abre la base en modo solo lectura, no toca kelly_app.db
+"""
+import random
+import sqlite3
+import statistics
+import sys
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.services.recruiter_service import (
+    ASSIGNMENT_STRATEGIES, SERVICE_AVERAGE_WINDOW, RecruiterLoad, service_minutes
+)
+
+# Sesiones con duración conocida necesarias para usar el historial real
+MINIMO_HISTORIAL = 50
+SEMILLA = 7
+
+@dataclass
+class Visita:
+    llegada: datetime
+    horario: str
+    tamano: float  # Duración relativa a la media de su recruiter en el historial
+
+@dataclass
+class RecruiterSimulado:
+    """Un recruiter con su fila; mismo id y nombre que espera RecruiterLoad"""
+    id: int
+    name: str
+    minutos_medios: float  # Velocidad real (media del historial)
+    fila: deque = field(default_factory=deque)
+    libre_desde: datetime = datetime.min
+    inicio_actual: datetime = datetime.min
+    recientes: deque = field(default_factory=lambda: deque(maxlen=SERVICE_AVERAGE_WINDOW))
+
+def leer_historial(ruta: Path):
+    """Llegadas por día y media de atención por recruiter, desde una base SQLite"""
+    conexion = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True)
+    try:
+        filas = conexion.execute(
+            "SELECT s.assigned_recruiter_id, r.name, s.time_slot, s.created_at, s.started_at, s.completed_at, s.duration_minutes "
+            "FROM info_sessions s JOIN recruiters r ON r.id = s.assigned_recruiter_id WHERE s.created_at IS NOT NULL"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        # Base sin las tablas todavía
+        filas = []
+    finally:
+        conexion.close()
+    leer = lambda valor: datetime.fromisoformat(valor) if valor else None
+    atenciones = []
+    for recruiter_id, nombre, horario, creada, inicio, fin, duracion in filas:
+        minutos = service_minutes(leer(inicio), leer(fin), duracion)
+        if minutos:
+            atenciones.append((recruiter_id, nombre, horario, leer(creada), minutos))
+    return atenciones
+
+def historial_sintetico():
+    """20 días con ráfagas a las 8:30 y 1:30; cada recruiter con su propio ritmo"""
+    azar = random.Random(SEMILLA)
+    ritmos = {1: ("Rapido", 12), 2: ("Agil", 16), 3: ("Medio", 20), 4: ("Pausado", 26), 5: ("Lento", 34)}
+    atenciones = []
+    for dia in range(20):
+        fecha = datetime(2026, 3, 2) + timedelta(days=dia)
+        for horario, hora, llegadas in (("8:30 AM", 8, 25), ("1:30 PM", 13, 15)):
+            for n in range(llegadas):
+                recruiter_id = azar.choice(list(ritmos))
+                nombre, ritmo = ritmos[recruiter_id]
+                creada = fecha.replace(hour=hora, minute=20) + timedelta(minutes=azar.uniform(0, 40))
+                atenciones.append((recruiter_id, nombre, horario, creada, ritmo * azar.lognormvariate(0, 0.35)))
+    return atenciones
+
+def preparar(atenciones):
+    """Visitas por día (en orden de llegada) y recruiters con su media histórica"""
+    por_recruiter = defaultdict(list)
+    nombres = {}
+    for recruiter_id, nombre, _, _, minutos in atenciones:
+        por_recruiter[recruiter_id].append(minutos)
+        nombres[recruiter_id] = nombre
+    medias = {recruiter_id: statistics.mean(valores) for recruiter_id, valores in por_recruiter.items()}
+    dias = defaultdict(list)
+    for recruiter_id, _, horario, creada, minutos in atenciones:
+        dias[creada.date()].append(Visita(llegada=creada, horario=horario, tamano=minutos / medias[recruiter_id]))
+    for visitas in dias.values():
+        visitas.sort(key=lambda visita: visita.llegada)
+    return [dias[dia] for dia in sorted(dias)], medias, nombres
+
+def atender_hasta(recruiter: RecruiterSimulado, hasta: datetime, esperas: list):
+    """Atiende la fila del recruiter hasta ese momento (registra la espera de cada visita)"""
+    while recruiter.fila:
+        visita = recruiter.fila[0]
+        inicio = max(recruiter.libre_desde, visita.llegada)
+        if inicio > hasta:
+            return
+        recruiter.fila.popleft()
+        minutos = visita.tamano * recruiter.minutos_medios
+        esperas.append((inicio - visita.llegada).total_seconds() / 60)
+        recruiter.inicio_actual = inicio
+        recruiter.libre_desde = inicio + timedelta(minutes=minutos)
+        recruiter.recientes.append(minutos)
+
+def simular(estrategia: str, dias, medias, nombres):
+    """Espera (minutos) de cada visita asignando con la estrategia dada"""
+    random.seed(SEMILLA)
+    opciones = ASSIGNMENT_STRATEGIES[estrategia]
+    esperas = []
+    recruiters = {recruiter_id: RecruiterSimulado(id=recruiter_id, name=nombres[recruiter_id], minutos_medios=media) for recruiter_id, media in medias.items()}
+    for recruiter in recruiters.values():
+        # Promedios de días anteriores, como los que lee el backend
+        recruiter.recientes.append(recruiter.minutos_medios)
+    for visitas in dias:
+        asignadas = defaultdict(lambda: defaultdict(int))
+        for recruiter in recruiters.values():
+            recruiter.libre_desde = datetime.min
+        for visita in visitas:
+            ahora = visita.llegada
+            for recruiter in recruiters.values():
+                atender_hasta(recruiter, ahora, esperas)
+            cargas = []
+            for recruiter in recruiters.values():
+                ocupado = recruiter.libre_desde > ahora
+                # balanced solo asigna a quien no está atendiendo
+                if ocupado and not opciones.include_busy:
+                    continue
+                promedio = statistics.mean(recruiter.recientes)
+                transcurrido = (ahora - recruiter.inicio_actual).total_seconds() / 60
+                cargas.append(RecruiterLoad(
+                    recruiter=recruiter,
+                    slot_assignments=asignadas[recruiter.id][visita.horario],
+                    day_assignments=sum(asignadas[recruiter.id].values()),
+                    waiting=len(recruiter.fila),
+                    remaining_minutes=max(0.0, promedio - transcurrido) if ocupado else 0.0,
+                    average_minutes=promedio
+                ))
+            if not cargas:
+                # Todos atendiendo: en el backend la sesión queda sin recruiter hasta que termina
+                # los pasos del kiosco; aquí balanced elige entre todos para no perder la visita
+                cargas = [
+                    RecruiterLoad(recruiter=r, slot_assignments=asignadas[r.id][visita.horario], day_assignments=sum(asignadas[r.id].values()))
+                    for r in recruiters.values()
+                ]
+            elegido = opciones.pick(cargas).recruiter
+            asignadas[elegido.id][visita.horario] += 1
+            elegido.fila.append(visita)
+        for recruiter in recruiters.values():
+            atender_hasta(recruiter, datetime.max, esperas)
+    return esperas
+
+def main():
+    ruta = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent / "kelly_app.db"
+    atenciones = leer_historial(ruta) if ruta.exists() else []
+    if len(atenciones) < MINIMO_HISTORIAL:
+        print(f"ℹ️  {ruta.name}: historial insuficiente ({len(atenciones)} atenciones con duración); se usa un historial sintético")
+        atenciones = historial_sintetico()
+    dias, medias, nombres = preparar(atenciones)
+    print(f"📊 {len(atenciones)} visitas en {len(dias)} días, {len(medias)} recruiters "
+          f"(media de atención: {', '.join(f'{nombres[r]} {m:.0f} min' for r, m in sorted(medias.items()))})")
+
+    resultados = {}
+    for estrategia in ASSIGNMENT_STRATEGIES:
+        esperas = sorted(simular(estrategia, dias, medias, nombres))
+        resultados[estrategia] = statistics.mean(esperas)
+        print(f"  {estrategia:<13} espera media {statistics.mean(esperas):6.1f} min   "
+              f"p95 {esperas[int(len(esperas) * 0.95) - 1]:6.1f} min   máxima {esperas[-1]:6.1f} min")
+
+    mejora = resultados["balanced"] - resultados["soonest-free"]
+    if mejora < 0:
+        print(f"❌ soonest-free espera {-mejora:.1f} min más en promedio que balanced con este historial")
+        sys.exit(1)
+    print(f"✅ soonest-free reduce la espera media en {mejora:.1f} min ({mejora / resultados['balanced'] * 100:.0f}%)")
+
+if __name__ == "__main__":
+    main()
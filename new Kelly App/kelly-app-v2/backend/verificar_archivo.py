@@ -0,0 +1,141 @@
+"""
+Script para verificar que el archivo de sesiones y visitas no reutiliza ids: archiva,
+registra filas nuevas, las envejece y vuelve a archivar (los ids archivados no se
+entregan otra vez, así que el segundo archivo no choca con el primero). Además prueba
+la migración de main.py sobre una base con las tablas antiguas (sin AUTOINCREMENT) y
+una fila que ya tiene el id de una archivada
+
+Uso: python verificar_archivo.py
+Usa una base de datos SQLite temporal, no toca kelly_app.db
+"""
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+directorio = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(directorio) / 'archivo.db'}"
+
+from app.database import Base, SessionLocal, engine
+from app.models.archive import ArchivedBadge, ArchivedInfoSession
+from app.models.info_session import InfoSession
+from app.models.visit import Badge
+from app.services.archive_service import ARCHIVE_AFTER_DAYS, archive_old_records
+
+HOY = date.today()
+VIEJO = HOY - timedelta(days=ARCHIVE_AFTER_DAYS + 10)
+
+# Base con las tablas de antes: sin AUTOINCREMENT, un badge archivado con id 1 y
+# un badge activo que ya recibió ese mismo id
+BASE_ANTIGUA = """
+from app.database import Base, engine
+from app.models.visit import Badge
+from app.models.info_session import InfoSession
+for tabla in (Badge.__table__, InfoSession.__table__):
+    tabla.dialect_options["sqlite"]["autoincrement"] = False
+Base.metadata.create_all(bind=engine)
+with engine.begin() as conn:
+    conn.exec_driver_sql("INSERT INTO badges_archive (id, first_name, last_name, email, phone, appointment_time, status, business_date) "
+                         "VALUES (1, 'Archivado', 'Viejo', 'viejo@kellyeducation.com', '305', '10:00 AM', 'completed', '2020-01-06')")
+    conn.exec_driver_sql("INSERT INTO badges (id, first_name, last_name, email, phone, appointment_time, status, business_date) "
+                         "VALUES (1, 'Activo', 'Nuevo', 'nuevo@kellyeducation.com', '305', '10:00 AM', 'registered', date('now'))")
+"""
+
+def badge(n: int, dia: date) -> Badge:
+    return Badge(first_name=f"Nombre{n}", last_name="Archivo", email=f"archivo{n}@kellyeducation.com",
+                 phone="305", appointment_time="10:00 AM", status="completed", business_date=dia)
+
+def sesion(n: int, dia: date) -> InfoSession:
+    return InfoSession(first_name=f"Nombre{n}", last_name="Archivo", email=f"archivo{n}@kellyeducation.com",
+                       phone="305", zip_code="33101", session_type="new-hire", time_slot="8:30 AM",
+                       status="completed", business_date=dia)
+
+def ronda(db, n: int) -> list:
+    """Registra badges y sesiones de hoy, los envejece y archiva; errores encontrados"""
+    errores = []
+    badges = [badge(n * 10 + i, HOY) for i in range(3)]
+    sesiones = [sesion(n * 10 + i, HOY) for i in range(3)]
+    db.add_all(badges + sesiones)
+    db.commit()
+    archivados = {fila.id for fila in db.query(ArchivedBadge).all()}
+    reusados = archivados & {fila.id for fila in badges}
+    if reusados:
+        errores.append(f"ronda {n}: badges nuevos con ids ya archivados {sorted(reusados)}")
+    sesiones_archivadas = {fila.id for fila in db.query(ArchivedInfoSession).all()}
+    reusados = sesiones_archivadas & {fila.id for fila in sesiones}
+    if reusados:
+        errores.append(f"ronda {n}: sesiones nuevas con ids ya archivados {sorted(reusados)}")
+
+    # Envejecer todo (la sesión con el change_seq más reciente se queda: guarda el cursor de sync)
+    for fila in badges + sesiones:
+        fila.business_date = VIEJO
+    db.commit()
+    try:
+        movidos = archive_old_records(db)
+    except Exception as e:
+        errores.append(f"ronda {n}: el archivo falló: {e}")
+        return errores
+    if movidos["badges"] != len(badges) or movidos["info_sessions"] < len(sesiones) - 1:
+        errores.append(f"ronda {n}: se movieron {movidos}")
+    return errores
+
+def verificar_migracion() -> list:
+    """Corre las migraciones de main.py sobre una copia del backend con las tablas antiguas"""
+    errores = []
+    copia = Path(tempfile.mkdtemp())
+    backend = Path(__file__).parent
+    shutil.copytree(backend / "app", copia / "app", ignore=shutil.ignore_patterns("__pycache__"))
+    shutil.copy(backend / "main.py", copia)
+    entorno = dict(os.environ, DATABASE_URL=f"sqlite:///{copia / 'kelly_app.db'}")
+    subprocess.run([sys.executable, "-c", BASE_ANTIGUA], check=True, cwd=copia, env=entorno)
+    salida = subprocess.run([sys.executable, "-c", "import main"], cwd=copia, env=entorno, capture_output=True, text=True)
+    if salida.returncode != 0:
+        return [f"importar main falló: {salida.stderr[-300:]}"]
+
+    conn = sqlite3.connect(str(copia / "kelly_app.db"))
+    try:
+        for tabla in ("info_sessions", "badges", "fingerprints", "new_hire_orientations", "team_visits"):
+            sql = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (tabla,)).fetchone()
+            if not sql or "AUTOINCREMENT" not in sql[0].upper():
+                errores.append(f"migración: {tabla} sigue sin AUTOINCREMENT")
+        filas = conn.execute("SELECT id, first_name FROM badges").fetchall()
+        if filas != [(2, "Activo")]:
+            errores.append(f"migración: el badge activo quedó como {filas}, se esperaba el id 2")
+        secuencia = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'badges'").fetchone()
+        if not secuencia or secuencia[0] < 2:
+            errores.append(f"migración: sqlite_sequence de badges es {secuencia}")
+        indices = {fila[0] for fila in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'badges'")}
+        if "ix_badges_day_status" not in indices:
+            errores.append("migración: faltan los índices de badges")
+    finally:
+        conn.close()
+    return errores
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    errores = []
+    try:
+        for n in range(1, 4):
+            errores += ronda(db, n)
+        archivados = db.query(ArchivedBadge).count()
+        print(f"📊 Tres rondas de registrar, envejecer y archivar: {archivados} badges archivados")
+    finally:
+        db.close()
+
+    print("📝 Migrando una base con las tablas sin AUTOINCREMENT...")
+    errores += verificar_migracion()
+
+    for error in errores:
+        print(f"  ❌ {error}")
+    if errores:
+        print(f"❌ {len(errores)} problemas con los ids archivados")
+        sys.exit(1)
+    print("✅ Los ids archivados no se reutilizan y cada archivo posterior funciona")
+
+if __name__ == "__main__":
+    main()
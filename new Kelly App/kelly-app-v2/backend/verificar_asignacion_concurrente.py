@@ -0,0 +1,129 @@
+"""
+Script para verificar que la asignación de recruiters es justa con registros simultáneos:
+levanta uvicorn con una base de datos SQLite temporal y dispara 200 registros desde
+200 hilos a la vez (todos en el mismo horario); cada recruiter debe quedar con la
+misma cantidad de sesiones (diferencia máxima de 1)
+
+Uso: python verificar_asignacion_concurrente.py [registros]
+No toca kelly_app.db
+"""
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+PUERTO = 3992
+BASE = f"http://127.0.0.1:{PUERTO}"
+HORARIO = "8:30 AM"
+
+def preparar_base(directorio: Path, url: str):
+    """Tablas y recruiters por defecto (en otro proceso para no compartir el motor)"""
+    codigo = """
+from app.database import Base, SessionLocal, engine
+from app.services.recruiter_service import initialize_default_recruiters
+import app.models
+Base.metadata.create_all(bind=engine)
+db = SessionLocal()
+initialize_default_recruiters(db)
+db.close()
+"""
+    subprocess.run([sys.executable, "-c", codigo], check=True, cwd=directorio, env=dict(os.environ, DATABASE_URL=url))
+
+def esperar_servidor(proceso: subprocess.Popen):
+    for _ in range(100):
+        if proceso.poll() is not None:
+            raise RuntimeError("uvicorn terminó antes de arrancar")
+        try:
+            if httpx.get(BASE + "/health").status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        threading.Event().wait(0.2)
+    raise RuntimeError("uvicorn no respondió")
+
+def registrar_a_la_vez(cantidad: int):
+    """Un hilo por registro; todos esperan en una barrera y envían al mismo tiempo"""
+    barrera = threading.Barrier(cantidad)
+    asignados, errores = [], []
+
+    def registrar(n: int):
+        datos = {
+            "first_name": f"Concurrente{n}", "last_name": "Prueba", "email": f"concurrente{n}@kellyeducation.com",
+            "phone": "305", "zip_code": "33101", "session_type": "new-hire", "time_slot": HORARIO
+        }
+        with httpx.Client(timeout=60) as http:
+            barrera.wait()
+            try:
+                respuesta = http.post(BASE + "/api/info-session/register", json=datos)
+            except httpx.HTTPError as e:
+                errores.append(type(e).__name__)
+                return
+        if respuesta.status_code != 201:
+            errores.append(respuesta.status_code)
+        else:
+            asignados.append(respuesta.json()["assigned_recruiter_name"])
+
+    hilos = [threading.Thread(target=registrar, args=(n,)) for n in range(cantidad)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return asignados, errores
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    # Copia del backend: las migraciones de main.py abren kelly_app.db junto a main.py
+    directorio = Path(tempfile.mkdtemp())
+    backend = Path(__file__).parent
+    shutil.copytree(backend / "app", directorio / "app", ignore=shutil.ignore_patterns("__pycache__"))
+    shutil.copy(backend / "main.py", directorio)
+    url = f"sqlite:///{directorio / 'kelly_app.db'}"
+
+    preparar_base(directorio, url)
+    proceso = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PUERTO), "--log-level", "warning"],
+        cwd=directorio, env=dict(os.environ, DATABASE_URL=url), stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT
+    )
+    try:
+        esperar_servidor(proceso)
+        print(f"📊 {cantidad} registros simultáneos en el horario {HORARIO}")
+        asignados, errores = registrar_a_la_vez(cantidad)
+    finally:
+        proceso.terminate()
+        try:
+            proceso.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proceso.kill()
+
+    # Reparto guardado en la base (recruiters sin sesiones cuentan con 0)
+    conexion = sqlite3.connect(str(directorio / "kelly_app.db"))
+    reparto = dict(conexion.execute(
+        "SELECT r.name, COUNT(s.id) FROM recruiters r "
+        "LEFT JOIN info_sessions s ON s.assigned_recruiter_id = r.id AND s.time_slot = ? GROUP BY r.id",
+        (HORARIO,)
+    ).fetchall())
+    sin_recruiter = conexion.execute("SELECT COUNT(*) FROM info_sessions WHERE assigned_recruiter_id IS NULL").fetchone()[0]
+    conexion.close()
+    for nombre, sesiones in sorted(reparto.items()):
+        print(f"  {nombre:<20} {sesiones}")
+    if errores:
+        print(f"❌ {len(errores)} registros fallaron: {Counter(errores).most_common(3)}")
+        sys.exit(1)
+    if sin_recruiter or sum(reparto.values()) != cantidad or None in asignados:
+        print("❌ Hay registros sin recruiter asignado o que no se guardaron")
+        sys.exit(1)
+    diferencia = max(reparto.values()) - min(reparto.values())
+    if diferencia > 1:
+        print(f"❌ Reparto desigual: diferencia de {diferencia} sesiones entre recruiters")
+        sys.exit(1)
+    print("✅ Todos los recruiters quedaron con la misma cantidad de sesiones (diferencia máxima 1)")
+
+if __name__ == "__main__":
+    main()
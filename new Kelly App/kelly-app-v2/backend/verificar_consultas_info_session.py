@@ -0,0 +1,113 @@
+"""
+Script para verificar que los listados de info sessions y la asignación de
+recruiter hacen un número fijo de consultas SQL, sin importar cuántas sesiones
+ni cuántos recruiters haya (sin consultas N+1)
+
+Uso: python verificar_consultas_info_session.py
+Usa una base de datos SQLite temporal, no toca kelly_app.db
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+directorio = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(directorio) / 'consultas.db'}"
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.api import info_session
+from app.database import Base, SessionLocal, async_engine, engine
+from app.models.info_session import InfoSession
+from app.models.recruiter import Recruiter
+from app.services.recruiter_service import get_next_recruiter, reset_assignment_ledger
+
+ENDPOINTS = ["/api/info-session/live", "/api/info-session/completed", "/api/info-session/"]
+
+app = FastAPI()
+app.include_router(info_session.router, prefix="/api/info-session")
+client = TestClient(app)
+
+# Los endpoints usan el motor async; sus sentencias pasan por el motor sync que lo envuelve
+consultas = []
+event.listen(async_engine.sync_engine, "before_cursor_execute", lambda *args: consultas.append(args[2]))
+
+def crear_sesiones(cantidad: int):
+    """Agrega sesiones abiertas y completadas, cada una con recruiter y pasos completados"""
+    db = SessionLocal()
+    try:
+        recruiters = db.query(Recruiter).all()
+        if not recruiters:
+            recruiters = [Recruiter(name=f"Recruiter {i}", email=f"r{i}@kelly.test") for i in range(3)]
+            db.add_all(recruiters)
+            db.flush()
+        for i in range(cantidad):
+            session = InfoSession(
+                first_name=f"Nombre{i}", last_name="Prueba", email=f"n{i}@kelly.test", phone="305",
+                zip_code="33101", session_type="new-hire", time_slot="8:30 AM",
+                status="completed" if i % 2 else "registered",
+                assigned_recruiter_id=recruiters[i % len(recruiters)].id, steps_completed=i % 8
+            )
+            db.add(session)
+        db.commit()
+    finally:
+        db.close()
+
+def contar(url: str) -> int:
+    """Número de sentencias SQL que ejecuta una petición"""
+    consultas.clear()
+    respuesta = client.get(url)
+    assert respuesta.status_code == 200, respuesta.text
+    return len(consultas)
+
+def contar_asignacion(recruiters: int) -> int:
+    """Consultas de get_next_recruiter con al menos esa cantidad de recruiters disponibles (cargando los conteos del día)"""
+    db = SessionLocal()
+    try:
+        faltan = recruiters - db.query(Recruiter).count()
+        db.add_all([Recruiter(name=f"Extra {i}", email=f"extra{i}@kelly.test") for i in range(faltan)])
+        db.commit()
+        reset_assignment_ledger()
+        sincronas = []
+        escuchar = lambda *args: sincronas.append(args[2])
+        event.listen(engine, "before_cursor_execute", escuchar)
+        try:
+            get_next_recruiter(db, "8:30 AM")
+        finally:
+            event.remove(engine, "before_cursor_execute", escuchar)
+        return len(sincronas)
+    finally:
+        db.close()
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    conteos = {}
+    creadas = 0
+    for total in (4, 40):
+        crear_sesiones(total - creadas)
+        creadas = total
+        conteos[total] = {url: contar(url) for url in ENDPOINTS}
+    sesion_id = SessionLocal().query(InfoSession.id).first()[0]
+    detalle = contar(f"/api/info-session/{sesion_id}")
+    asignacion = {recruiters: contar_asignacion(recruiters) for recruiters in (3, 30)}
+
+    ok = True
+    print("📊 Consultas SQL por petición")
+    for url in ENDPOINTS:
+        valores = [conteos[total][url] for total in conteos]
+        fijo = len(set(valores)) == 1
+        ok = ok and fijo
+        print(f"  {'✅' if fijo else '❌'} {url:<32} " + ", ".join(f"{total} sesiones: {conteos[total][url]}" for total in conteos))
+    print(f"  ✅ /api/info-session/{{id}}            {detalle} consultas")
+    fijo = len(set(asignacion.values())) == 1
+    ok = ok and fijo
+    print(f"  {'✅' if fijo else '❌'} {'asignación de recruiter':<32} " + ", ".join(f"{total} recruiters: {asignacion[total]}" for total in asignacion))
+    if not ok:
+        print("❌ El número de consultas crece con las sesiones o los recruiters (N+1)")
+        sys.exit(1)
+    print("✅ Número de consultas fijo en todos los listados y en la asignación")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Script para verificar los planes de consulta (EXPLAIN QUERY PLAN) de los endpoints del
+tablero, de los recruiters, de la asignación y de las visitas: llena una base SQLite temporal
+con meses de historial, ejecuta cada endpoint, captura su SQL y falla si alguna sentencia
+recorre completa (SCAN) una tabla grande en vez de buscar por un índice
+
+Un SCAN solo se acepta en los listados completos sin filtro (sin WHERE) que recorren un
+índice en el orden pedido, porque devuelven la tabla entera por diseño
+
+Uso: python verificar_planes_consultas.py [días_de_historial]
+Usa una base de datos SQLite temporal, no toca kelly_app.db
+"""
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+directorio = tempfile.mkdtemp()
+ruta_base = Path(directorio) / "planes.db"
+os.environ["DATABASE_URL"] = f"sqlite:///{ruta_base}"
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert, select
+
+from app.api import info_session, recruiter, visits
+from app.api.auth import get_current_user
+from app.database import Base, SessionLocal, async_engine, engine
+from app.models.info_session import InfoSession
+from app.models.recruiter import Recruiter
+from app.models.user import User
+from app.models.visit import Badge, Fingerprint, NewHireOrientation, TeamVisit
+from app.services.business_day import business_date, business_today
+from app.services.recruiter_service import get_next_recruiter, reset_assignment_ledger
+
+# Tablas que crecen con el uso (recruiters, usuarios y configuración son pequeñas)
+TABLAS_GRANDES = {"info_sessions", "new_hire_orientations", "badges", "fingerprints", "team_visits"}
+SESIONES_POR_DIA = 40
+VISITAS_POR_DIA = 10
+HORARIOS = ["8:30 AM", "1:30 PM"]
+SEMILLA = 7
+
+app = FastAPI()
+app.include_router(info_session.router, prefix="/api/info-session")
+app.include_router(recruiter.router, prefix="/api/recruiter")
+app.include_router(visits.router, prefix="/api/visits")
+client = TestClient(app)
+
+# Sentencias de la petición en curso: los endpoints usan el motor async (pasa por su motor sync)
+# y la asignación usa el motor sync
+capturadas = []
+capturar = lambda conn, cursor, sentencia, parametros, context, executemany: capturadas.append((sentencia, parametros))
+event.listen(async_engine.sync_engine, "before_cursor_execute", capturar)
+event.listen(engine, "before_cursor_execute", capturar)
+
+def poblar(dias: int) -> dict:
+    """Historial de sesiones y visitas repartidas en los últimos días; hoy queda con sesiones abiertas"""
+    azar = random.Random(SEMILLA)
+    ahora = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        recruiters = [Recruiter(name=f"Recruiter {i}", email=f"recruiter{i}@kellyeducation.com", status="available") for i in range(5)]
+        usuario = User(email="planes@kellyeducation.com", password_hash="x", full_name="Planes", role="frontdesk")
+        db.add_all(recruiters + [usuario])
+        db.commit()
+        sesiones, visitas = [], []
+        for dia in range(dias):
+            for n in range(SESIONES_POR_DIA):
+                creada = ahora - timedelta(days=dia, minutes=azar.randint(0, 600))
+                hoy = dia == 0
+                estado = azar.choice(["registered", "in-progress", "completed"]) if hoy else "completed"
+                inicio = creada + timedelta(minutes=azar.randint(5, 60)) if estado != "registered" else None
+                fin = inicio + timedelta(minutes=azar.randint(10, 40)) if estado == "completed" else None
+                sesiones.append({
+                    "first_name": f"Nombre{dia}_{n}", "last_name": "Prueba", "email": f"n{dia}_{n}@kellyeducation.com",
+                    "phone": "305", "zip_code": "33101", "session_type": "new-hire", "time_slot": azar.choice(HORARIOS),
+                    "status": estado, "assigned_recruiter_id": azar.choice(recruiters).id,
+                    "created_at": creada, "business_date": business_date(creada),
+                    "started_at": inicio, "completed_at": fin, "duration_minutes": int((fin - inicio).total_seconds() / 60) if fin else None,
+                    "change_seq": len(sesiones) + 1, "steps_completed": 7 if estado == "completed" else azar.randint(0, 7)
+                })
+            for n in range(VISITAS_POR_DIA):
+                creada = ahora - timedelta(days=dia, minutes=azar.randint(0, 600))
+                visitas.append({"creada": creada, "recruiter": azar.choice(recruiters).id, "n": f"{dia}_{n}"})
+        db.execute(insert(InfoSession), sesiones)
+        ids = db.scalars(select(InfoSession.id)).all()
+        comunes = lambda v: {
+            "first_name": "Visita", "last_name": v["n"], "email": f"v{v['n']}@kellyeducation.com", "phone": "305",
+            "assigned_recruiter_id": v["recruiter"], "created_at": v["creada"], "business_date": business_date(v["creada"])
+        }
+        db.execute(insert(NewHireOrientation), [dict(comunes(v), time_slot=azar.choice(HORARIOS)) for v in visitas])
+        db.execute(insert(Badge), [dict(comunes(v), appointment_time="10:00 AM") for v in visitas])
+        db.execute(insert(Fingerprint), [dict(comunes(v), appointment_time="11:00 AM", fingerprint_type="regular") for v in visitas])
+        db.execute(insert(TeamVisit), [
+            {"visitor_name": f"Visita {v['n']}", "team": "Payroll", "team_member_id": usuario.id, "reason": "Consulta",
+             "created_at": v["creada"], "business_date": business_date(v["creada"])}
+            for v in visitas
+        ])
+        db.commit()
+        en_espera = db.scalar(select(InfoSession.id).where(
+            InfoSession.business_date == business_today(), InfoSession.status == "registered"
+        ))
+        return {
+            "recruiter": recruiters[0].id, "sesion": ids[len(ids) // 2], "en_espera": en_espera,
+            "cursor": len(sesiones) - 5, "usuario": db.get(User, usuario.id), "total": len(sesiones)
+        }
+    finally:
+        db.close()
+
+def planes(sentencias) -> list:
+    """(sentencia, filas del plan) de cada SELECT capturado"""
+    conexion = sqlite3.connect(str(ruta_base))
+    try:
+        return [
+            (sentencia, [fila[3] for fila in conexion.execute("EXPLAIN QUERY PLAN " + sentencia, parametros or ())])
+            for sentencia, parametros in sentencias if sentencia.lstrip().upper().startswith("SELECT")
+        ]
+    finally:
+        conexion.close()
+
+def recorridos_completos(sentencia: str, plan: list) -> list:
+    """Filas SCAN sobre tablas grandes que no se aceptan (los alias de SQLAlchemy terminan en _1, _2...)"""
+    sin_filtro = " WHERE " not in sentencia.upper()
+    malas = []
+    for detalle in plan:
+        encontrado = re.match(r"SCAN (\w+)(.*)", detalle)
+        if not encontrado or re.sub(r"_\d+$", "", encontrado.group(1)) not in TABLAS_GRANDES:
+            continue
+        if sin_filtro and "INDEX" in encontrado.group(2):
+            continue
+        malas.append(detalle)
+    return malas
+
+def main():
+    dias = int(sys.argv[1]) if len(sys.argv) > 1 else 90
+    Base.metadata.create_all(bind=engine)
+    datos = poblar(dias)
+    # Estadísticas del planificador, como las que deja PRAGMA optimize en producción
+    with engine.connect() as conexion:
+        conexion.exec_driver_sql("ANALYZE")
+    app.dependency_overrides[get_current_user] = lambda: datos["usuario"]
+    hoy = business_today().isoformat()
+
+    def peticion(url: str):
+        respuesta = client.get(url)
+        assert respuesta.status_code == 200, f"{url}: {respuesta.status_code} {respuesta.text}"
+
+    def asignacion():
+        reset_assignment_ledger()
+        db = SessionLocal()
+        try:
+            get_next_recruiter(db, HORARIOS[0], strategy="soonest-free")
+        finally:
+            db.close()
+
+    casos = [
+        ("tablero en vivo", lambda: peticion("/api/info-session/live")),
+        ("tablero en vivo (cambios)", lambda: peticion(f"/api/info-session/live?since={datos['cursor']}")),
+        ("tablero de completadas", lambda: peticion("/api/info-session/completed")),
+        ("detalle de sesión", lambda: peticion(f"/api/info-session/{datos['sesion']}")),
+        ("posición en la fila", lambda: peticion(f"/api/info-session/{datos['en_espera']}/queue")),
+        ("listado de sesiones", lambda: peticion("/api/info-session/?limit=100")),
+        ("sesiones por estado", lambda: peticion("/api/info-session/?status=completed&limit=100")),
+        ("sesiones del día", lambda: peticion(f"/api/info-session/?business_date={hoy}")),
+        ("sesiones del recruiter", lambda: peticion(f"/api/recruiter/{datos['recruiter']}/assigned-sessions")),
+        ("sesiones del recruiter por estado", lambda: peticion(f"/api/recruiter/{datos['recruiter']}/assigned-sessions?status=in-progress")),
+        ("asignación (conteos del día)", asignacion),
+    ]
+    for ruta in ("new-hire-orientation", "badges", "fingerprints", "team-visit"):
+        casos.append((f"visitas {ruta}", lambda ruta=ruta: peticion(f"/api/visits/{ruta}")))
+        casos.append((f"visitas {ruta} del día", lambda ruta=ruta: peticion(f"/api/visits/{ruta}?business_date={hoy}")))
+    casos.append(("visitas asignadas a mí", lambda: peticion("/api/visits/team-visit/my-visits")))
+
+    print(f"📊 {datos['total']} sesiones en {dias} días y {dias * VISITAS_POR_DIA} visitas de cada tipo")
+    fallas = 0
+    for nombre, ejecutar in casos:
+        capturadas.clear()
+        ejecutar()
+        resultado = planes(capturadas)
+        malas = [(sentencia, detalle) for sentencia, plan in resultado for detalle in recorridos_completos(sentencia, plan)]
+        ordenes = sum(1 for _, plan in resultado for detalle in plan if "TEMP B-TREE" in detalle)
+        if malas:
+            fallas += 1
+            print(f"  ❌ {nombre}")
+            for sentencia, detalle in malas:
+                print(f"       {detalle}\n       en: {' '.join(sentencia.split())[:160]}")
+        else:
+            extra = f" (ℹ️  {ordenes} ordenamiento(s) en memoria sobre filas ya filtradas)" if ordenes else ""
+            print(f"  ✅ {nombre:<36} {len(resultado)} consultas{extra}")
+    if fallas:
+        print(f"❌ {fallas} endpoint(s) recorren completa una tabla grande")
+        sys.exit(1)
+    print("✅ Ninguna consulta recorre completa una tabla grande")
+
+if __name__ == "__main__":
+    main()
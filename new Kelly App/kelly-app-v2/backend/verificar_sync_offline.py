@@ -0,0 +1,142 @@
+"""
+Script para verificar que la sincronización offline (POST /api/sync/batch) devuelve
+a cada elemento su propia fila: manda un lote mezclado (sesiones con horas de captura
+desordenadas, los cuatro tipos de visita y elementos rechazados intercalados) y
+compara cada resultado con la fila guardada con ese id
+
+Uso: python verificar_sync_offline.py [sesiones]
+Usa una base de datos SQLite temporal, no toca kelly_app.db
+"""
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+directorio = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(directorio) / 'sync.db'}"
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import sync
+from app.database import Base, SessionLocal, engine
+from app.models.exclusion_list import ExclusionList
+from app.models.info_session import InfoSession
+from app.models.recruiter import Recruiter
+from app.services.exclusion_index import rebuild_exclusion_index
+from app.services.recruiter_service import initialize_default_recruiters
+from app.services.sync_service import VISIT_MODELS
+
+app = FastAPI()
+app.include_router(sync.router, prefix="/api/sync")
+client = TestClient(app)
+
+HORARIOS = ["8:30 AM", "1:30 PM"]
+EXCLUIDO = ("Maria", "Excluida")
+
+def preparar_base():
+    """Tablas, recruiters por defecto y un nombre en la lista de exclusión"""
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        initialize_default_recruiters(db)
+        db.add(ExclusionList(name=" ".join(EXCLUIDO).upper(), code="PC"))
+        db.commit()
+        rebuild_exclusion_index(db)
+    finally:
+        db.close()
+
+def elemento(kind: str, n: int, capturado: datetime) -> dict:
+    """Elemento del lote con un dato único (email o nombre del visitante) para encontrar su fila"""
+    persona = {"first_name": f"Nombre{n}", "last_name": "Sync", "email": f"sync{n}@kellyeducation.com", "phone": "305"}
+    datos = {
+        "info-session": dict(persona, zip_code="33101", session_type="new-hire", time_slot=HORARIOS[n % 2]),
+        "new-hire-orientation": dict(persona, time_slot=HORARIOS[n % 2]),
+        "badges": dict(persona, appointment_time="10:00 AM"),
+        "fingerprints": dict(persona, appointment_time="11:00 AM", fingerprint_type="regular"),
+        "team-visit": {"visitor_name": f"Visitante{n}", "team": "Payroll", "reason": "Consulta"},
+    }[kind]
+    if kind == "info-session" and n % 10 == 0:
+        datos.update(first_name=EXCLUIDO[0], last_name=EXCLUIDO[1])
+    return {"kind": kind, "created_at": capturado.isoformat(), "client_id": f"c{n}", "data": datos}
+
+def armar_lote(sesiones: int):
+    """Lote mezclado: horas de captura desordenadas y un rechazo cada 7 elementos"""
+    ahora = datetime.utcnow()
+    kinds = ["info-session"] * sesiones + [kind for kind in VISIT_MODELS for _ in range(sesiones // 4)]
+    random.shuffle(kinds)
+    items = []
+    for n, kind in enumerate(kinds):
+        items.append(elemento(kind, n, ahora - timedelta(minutes=random.randint(1, 3 * 24 * 60))))
+        if n % 7 == 0:
+            items.append({"kind": "badges", "created_at": ahora.isoformat(), "client_id": f"r{n}", "data": {"first_name": "Incompleto"}})
+    return items
+
+def verificar(items: list, respuesta: dict) -> list:
+    """Diferencias entre cada resultado y la fila guardada con su id"""
+    errores = []
+    db = SessionLocal()
+    try:
+        recruiters = {recruiter.id: recruiter.name for recruiter in db.query(Recruiter).all()}
+        for item, resultado in zip(items, respuesta["results"]):
+            if resultado["client_id"] != item["client_id"]:
+                errores.append(f"resultado {resultado['index']}: client_id {resultado['client_id']} en lugar de {item['client_id']}")
+                continue
+            if resultado["status"] != "created":
+                if item["client_id"].startswith("c"):
+                    errores.append(f"{item['client_id']}: rechazado {resultado.get('errors')}")
+                continue
+            model = InfoSession if item["kind"] == "info-session" else VISIT_MODELS[item["kind"]]
+            fila = db.get(model, resultado["id"])
+            if fila is None:
+                errores.append(f"{item['client_id']}: no hay fila {item['kind']} con id {resultado['id']}")
+                continue
+            esperado = item["data"].get("email") or item["data"]["visitor_name"]
+            guardado = getattr(fila, "email", None) if "email" in item["data"] else fila.visitor_name
+            if guardado != esperado:
+                errores.append(f"{item['client_id']}: el id {resultado['id']} es de {guardado}, no de {esperado}")
+                continue
+            if fila.created_at.replace(tzinfo=None) != datetime.fromisoformat(item["created_at"]):
+                errores.append(f"{item['client_id']}: created_at {fila.created_at} en lugar de {item['created_at']}")
+            if model is InfoSession:
+                excluido = (item["data"]["first_name"], item["data"]["last_name"]) == EXCLUIDO
+                if resultado["assigned_recruiter_id"] != fila.assigned_recruiter_id:
+                    errores.append(f"{item['client_id']}: recruiter {resultado['assigned_recruiter_id']} en la respuesta, {fila.assigned_recruiter_id} en la fila")
+                elif resultado["assigned_recruiter_name"] != recruiters.get(fila.assigned_recruiter_id):
+                    errores.append(f"{item['client_id']}: nombre de recruiter {resultado['assigned_recruiter_name']} no corresponde")
+                if resultado["is_in_exclusion_list"] != excluido or bool(fila.is_in_exclusion_list) != excluido:
+                    errores.append(f"{item['client_id']}: exclusión {resultado['is_in_exclusion_list']}/{fila.is_in_exclusion_list}, se esperaba {excluido}")
+
+        # change_seq sigue el orden de captura
+        filas = db.query(InfoSession).order_by(InfoSession.change_seq).all()
+        if any(anterior.created_at > siguiente.created_at for anterior, siguiente in zip(filas, filas[1:])):
+            errores.append("change_seq no sigue el orden de captura de las sesiones")
+    finally:
+        db.close()
+    return errores
+
+def main():
+    sesiones = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    random.seed(25)
+    preparar_base()
+    items = armar_lote(sesiones)
+    print(f"📊 Lote offline de {len(items)} elementos ({sesiones} sesiones, visitas y rechazos intercalados)")
+    respuesta = client.post("/api/sync/batch", json={"items": items})
+    if respuesta.status_code != 200:
+        print(f"❌ La sincronización respondió {respuesta.status_code}: {respuesta.text[:300]}")
+        sys.exit(1)
+    datos = respuesta.json()
+    print(f"  Guardados {datos['created']}, rechazados {datos['rejected']}")
+
+    errores = verificar(items, datos)
+    for error in errores[:20]:
+        print(f"  ❌ {error}")
+    if errores:
+        print(f"❌ {len(errores)} resultados no corresponden a su fila")
+        sys.exit(1)
+    print("✅ Cada resultado tiene el id, recruiter y exclusión de su propio elemento")
+
+if __name__ == "__main__":
+    main()
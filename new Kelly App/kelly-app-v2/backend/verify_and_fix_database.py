@@ -74,7 +74,7 @@ def verify_database():
                 print(f"   • ID {id}: {first_name} {last_name} ({email}) - {status} - {created_at}")
         
         # Verificar otras tablas importantes
-        tables = ['users', 'recruiters', 'exclusion_list', 'info_session_steps']
+        tables = ['users', 'recruiters', 'exclusion_list', 'info_sessions_archive']
         print("\n📚 Otras tablas:")
         for table in tables:
             try:
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react'
 import { useNavigate } from 'react-router-dom'
-import { completeStep, completeInfoSession, getInfoSession } from '../services/api'
-import type { InfoSessionWithSteps } from '../types'
+import { completeStep, completeInfoSession, getInfoSession, getQueuePosition, subscribeToEvents } from '../services/api'
+import type { InfoSessionWithSteps, QueuePosition } from '../types'
 
 interface Props {
   sessionData: InfoSessionWithSteps
@@ -15,8 +15,9 @@ function InfoSessionWelcome({ sessionData, onSessionCompleted }: Props) {
   const [isCompleting, setIsCompleting] = useState(false)
   const [isCompleted, setIsCompleted] = useState(false)
   const [currentSessionData, setCurrentSessionData] = useState(sessionData)
+  const [queuePosition, setQueuePosition] = useState<QueuePosition | null>(null)
 
-  // Sync with backend periodically to get latest state
+  // Sync with backend whenever this session changes (e.g. a recruiter completes a step)
   useEffect(() => {
     const syncSession = async () => {
       try {
@@ -36,13 +37,25 @@ function InfoSessionWelcome({ sessionData, onSessionCompleted }: Props) {
       }
     }
 
+    const refreshQueuePosition = async () => {
+      try {
+        setQueuePosition(await getQueuePosition(sessionData.id))
+      } catch (error) {
+        console.error('Error loading queue position:', error)
+      }
+    }
+
     // Sync immediately
     syncSession()
+    refreshQueuePosition()
     
-    // Sync every 5 seconds
-    const interval = setInterval(syncSession, 5000)
-    
-    return () => clearInterval(interval)
+    return subscribeToEvents(['sessions'], (event) => {
+      if (event.type === 'resync' || event.type === 'sessions.rematched' || event.data.session_id === sessionData.id) {
+        syncSession()
+      }
+      // Any session starting or finishing can move this visitor up the line
+      refreshQueuePosition()
+    })
   }, [sessionData.id, isCompleted, onSessionCompleted])
 
   useEffect(() => {
@@ -136,6 +149,17 @@ function InfoSessionWelcome({ sessionData, onSessionCompleted }: Props) {
             </p>
           </div>
 
+          {queuePosition && queuePosition.position !== null && queuePosition.position > 0 && queuePosition.estimated_wait_minutes !== null && (
+            <div className="mb-6 p-4 bg-blue-50 border-l-4 border-blue-500 rounded-lg">
+              <p className="text-blue-800 font-semibold">
+                {queuePosition.waiting_ahead === 0
+                  ? 'You are next in line for your recruiter'
+                  : `${queuePosition.waiting_ahead} ${queuePosition.waiting_ahead === 1 ? 'person' : 'people'} ahead of you`}
+                {' · '}Estimated wait: {queuePosition.estimated_wait_minutes < 1 ? 'less than a minute' : `about ${queuePosition.estimated_wait_minutes} min`}
+              </p>
+            </div>
+          )}
+
           <div className="mb-8">
             <h2 className="text-2xl font-bold mb-4 text-gray-800">
               Follow the steps below and check each step as you complete each stage:
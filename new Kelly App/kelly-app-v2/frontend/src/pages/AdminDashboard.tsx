@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react'
 import { useNavigate } from 'react-router-dom'
-import { getUsers, createUser, deleteUser, getCurrentUser, uploadExclusionList, clearExclusionList } from '../services/api'
+import { getUsers, createUser, deleteUser, getCurrentUser, uploadExclusionList, getExclusionUploadJob, clearExclusionList, rollbackExclusionList } from '../services/api'
+import type { ExclusionUploadJob } from '../services/api'
 import type { User } from '../types'
 
 function AdminDashboard() {
@@ -18,6 +19,7 @@ function AdminDashboard() {
   const [success, setSuccess] = useState<string | null>(null)
   const [showExclusionUpload, setShowExclusionUpload] = useState(false)
   const [uploading, setUploading] = useState(false)
+  const [uploadJob, setUploadJob] = useState<ExclusionUploadJob | null>(null)
 
   useEffect(() => {
     checkAuthAndLoad()
@@ -118,8 +120,9 @@ function AdminDashboard() {
     const file = e.target.files?.[0]
     if (!file) return
 
-    if (!file.name.endsWith('.xlsx') && !file.name.endsWith('.xls')) {
-      setError('Please upload an Excel file (.xlsx or .xls)')
+    const fileName = file.name.toLowerCase()
+    if (!fileName.endsWith('.xlsx') && !fileName.endsWith('.xls') && !fileName.endsWith('.csv')) {
+      setError('Please upload an Excel file (.xlsx or .xls) or a CSV file (.csv)')
       return
     }
 
@@ -128,16 +131,29 @@ function AdminDashboard() {
     setSuccess(null)
 
     try {
-      const result = await uploadExclusionList(file)
-      setSuccess(`Exclusion list uploaded successfully! ${result.added} records added.`)
-      if (result.errors && result.errors.length > 0) {
-        setError(`Some rows had errors: ${result.errors.slice(0, 3).join(', ')}`)
+      const started = await uploadExclusionList(file)
+      // The upload runs as a background job on the server: poll its progress
+      let job = await getExclusionUploadJob(started.job_id)
+      setUploadJob(job)
+      while (job.status === 'queued' || job.status === 'running') {
+        await new Promise((resolve) => setTimeout(resolve, 1000))
+        job = await getExclusionUploadJob(started.job_id)
+        setUploadJob(job)
+      }
+      if (job.status === 'failed') {
+        setError(job.error || 'Error uploading file')
+      } else {
+        setSuccess(`Exclusion list uploaded successfully! ${job.added} records added.`)
+        if (job.errors && job.errors.length > 0) {
+          setError(`Some rows had errors: ${job.errors.slice(0, 3).join(', ')}`)
+        }
+        setShowExclusionUpload(false)
       }
-      setShowExclusionUpload(false)
     } catch (err: any) {
       setError(err.response?.data?.detail || 'Error uploading file')
     } finally {
       setUploading(false)
+      setUploadJob(null)
       // Reset file input
       e.target.value = ''
     }
@@ -156,6 +172,21 @@ function AdminDashboard() {
     }
   }
 
+  const handleRollbackExclusionList = async () => {
+    if (!confirm('Restore the previous exclusion list? The current list will be kept as the previous version.')) {
+      return
+    }
+
+    setError(null)
+    setSuccess(null)
+    try {
+      const result = await rollbackExclusionList()
+      setSuccess(result.message)
+    } catch (err: any) {
+      setError(err.response?.data?.detail || 'Error restoring previous exclusion list')
+    }
+  }
+
   if (loading) {
     return (
       <div className="min-h-screen bg-gray-100 py-8 flex items-center justify-center">
@@ -236,14 +267,14 @@ function AdminDashboard() {
           <div className="bg-white rounded-lg shadow-lg p-6 mb-6">
             <h2 className="text-2xl font-bold mb-4">Exclusion List (PC/RR List)</h2>
             <p className="text-gray-600 mb-4">
-              Upload an Excel file with columns: <strong>name</strong>, <strong>Code</strong>, <strong>DOB</strong>, <strong>SSN</strong>
+              Upload an Excel or CSV file with columns: <strong>name</strong>, <strong>Code</strong>, <strong>DOB</strong>, <strong>SSN</strong>
             </p>
             <div className="flex gap-4 items-center">
               <label className="bg-orange-600 hover:bg-orange-700 text-white font-bold py-2 px-6 rounded-lg cursor-pointer">
-                {uploading ? 'Uploading...' : '📤 Upload Excel File'}
+                {uploading ? 'Uploading...' : '📤 Upload Excel/CSV File'}
                 <input
                   type="file"
-                  accept=".xlsx,.xls"
+                  accept=".xlsx,.xls,.csv"
                   onChange={handleFileUpload}
                   disabled={uploading}
                   className="hidden"
@@ -255,10 +286,29 @@ function AdminDashboard() {
               >
                 🗑️ Clear List
               </button>
+              <button
+                onClick={handleRollbackExclusionList}
+                className="bg-gray-600 hover:bg-gray-700 text-white font-bold py-2 px-6 rounded-lg"
+              >
+                ↩️ Restore Previous List
+              </button>
             </div>
             {uploading && (
               <div className="mt-4">
-                <div className="animate-pulse text-gray-600">Processing file...</div>
+                <div className="animate-pulse text-gray-600">
+                  {uploadJob && uploadJob.status === 'running'
+                    ? `Processing file... ${uploadJob.rows_processed}${uploadJob.total_rows ? ` / ${uploadJob.total_rows}` : ''} rows`
+                    : 'Processing file...'}
+                  {uploadJob?.eta_seconds != null && ` (about ${uploadJob.eta_seconds}s left)`}
+                </div>
+                {uploadJob?.percent != null && (
+                  <div className="w-full bg-gray-200 rounded-full h-2 mt-2">
+                    <div
+                      className="bg-orange-600 h-2 rounded-full"
+                      style={{ width: `${uploadJob.percent}%` }}
+                    ></div>
+                  </div>
+                )}
               </div>
             )}
           </div>
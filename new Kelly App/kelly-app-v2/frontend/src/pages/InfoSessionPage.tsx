@@ -1,6 +1,6 @@
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import { useNavigate } from 'react-router-dom'
-import { registerInfoSession, checkExclusion, getInfoSession } from '../services/api'
+import { registerInfoSession, checkExclusion, getInfoSession, newIdempotencyKey } from '../services/api'
 import InfoSessionWelcome from '../components/InfoSessionWelcome'
 import InfoSessionForm from '../components/InfoSessionForm'
 import type { InfoSessionRegistration, InfoSessionWithSteps } from '../types'
@@ -14,6 +14,8 @@ function InfoSessionPage() {
   const [sessionData, setSessionData] = useState<InfoSessionWithSteps | null>(null)
   const [exclusionWarning, setExclusionWarning] = useState<string | null>(null)
   const [loading, setLoading] = useState(true)
+  // Idempotency key of the registration being submitted; resubmitting the same form after an error reuses it
+  const pendingRegistration = useRef<{ key: string; body: string } | null>(null)
 
   // Load saved session on mount
   useEffect(() => {
@@ -77,7 +79,14 @@ function InfoSessionPage() {
       }
 
       // Register the session
-      const registered = await registerInfoSession(formData)
+      const body = JSON.stringify(formData)
+      let pending = pendingRegistration.current
+      if (!pending || pending.body !== body) {
+        pending = { key: newIdempotencyKey(), body }
+        pendingRegistration.current = pending
+      }
+      const registered = await registerInfoSession(formData, pending.key)
+      pendingRegistration.current = null
       setSessionData(registered)
       setStep('welcome')
       
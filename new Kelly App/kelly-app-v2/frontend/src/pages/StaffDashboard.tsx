@@ -1,5 +1,6 @@
-import React, { useState, useEffect } from 'react'
-import { getLiveInfoSessions, getCompletedInfoSessions, getNewHireOrientations, getBadges, getFingerprints, getMyVisits, getCurrentUser, notifyTeamVisit } from '../services/api'
+import React, { useState, useEffect, useRef } from 'react'
+import { getLiveInfoSessionsDelta, getCompletedInfoSessions, getNewHireOrientations, getBadges, getFingerprints, getMyVisits, getCurrentUser, notifyTeamVisit, subscribeToEvents } from '../services/api'
+import type { LiveEvent } from '../services/api'
 import type { InfoSessionWithSteps } from '../types'
 import { formatMiamiTime, getMiamiDateKey, formatMiamiDateDisplay } from '../utils/dateUtils'
 
@@ -15,15 +16,41 @@ function StaffDashboard() {
   const [myVisits, setMyVisits] = useState<any[]>([])
   const [loading, setLoading] = useState(true)
   const [currentUser, setCurrentUser] = useState<any>(null)
+  // Delta sync cursor for the live board (0 = load the whole board)
+  const liveCursor = useRef(0)
 
   useEffect(() => {
     checkAuth()
     loadData()
-    // Set up polling for live updates every 5 seconds
-    const interval = setInterval(loadData, 5000)
-    return () => clearInterval(interval)
+    // Reload only when the server pushes a change for the open tab
+    return subscribeToEvents(['sessions', 'visits'], (event) => {
+      if (event.type === 'resync') {
+        liveCursor.current = 0
+        loadData()
+      } else if (isRelevantEvent(event)) {
+        loadData()
+      }
+    })
   }, [activeTab])
 
+  // Visit kind shown by each visits tab
+  const visitKinds: { [key: string]: string } = {
+    'new-hire-orientation': 'new-hire-orientation',
+    'badges': 'badge',
+    'fingerprints': 'fingerprint',
+    'my-visits': 'team-visit',
+  }
+
+  const isRelevantEvent = (event: LiveEvent) => {
+    if (event.data.topic === 'sessions') {
+      return activeTab === 'info-session' || activeTab === 'info-session-completed'
+    }
+    if (event.type === 'visits.archived' || event.type === 'visits.synced') {
+      return activeTab in visitKinds
+    }
+    return event.data.topic === 'visits' && visitKinds[activeTab] === event.data.kind
+  }
+
   const checkAuth = async () => {
     const token = localStorage.getItem('token')
     if (!token) {
@@ -46,8 +73,20 @@ function StaffDashboard() {
       setLoading(true)
       switch (activeTab) {
         case 'info-session':
-          const live = await getLiveInfoSessions()
-          setLiveSessions(live)
+          const delta = await getLiveInfoSessionsDelta(liveCursor.current)
+          liveCursor.current = delta.cursor
+          if (delta.full) {
+            setLiveSessions(delta.sessions)
+          } else if (delta.sessions.length > 0 || delta.removed.length > 0) {
+            setLiveSessions((current) => {
+              const changedIds = new Set(delta.sessions.map((session) => session.id))
+              const removedIds = new Set(delta.removed)
+              return current
+                .filter((session) => !changedIds.has(session.id) && !removedIds.has(session.id))
+                .concat(delta.sessions)
+                .sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime())
+            })
+          }
           break
         case 'info-session-completed':
           const completed = await getCompletedInfoSessions()
@@ -83,7 +122,7 @@ function StaffDashboard() {
     // Group sessions by date
     const groupedSessions: { [key: string]: InfoSessionWithSteps[] } = {}
     liveSessions.forEach((session) => {
-      const dateKey = getMiamiDateKey(session.created_at)
+      const dateKey = session.business_date || getMiamiDateKey(session.created_at)
       if (!groupedSessions[dateKey]) {
         groupedSessions[dateKey] = []
       }
@@ -96,7 +135,7 @@ function StaffDashboard() {
     return (
       <div className="space-y-4">
         <div className="bg-green-50 border-l-4 border-green-500 p-4 mb-4">
-          <p className="text-green-800 font-bold">🟢 Live Registration - Updates every 5 seconds</p>
+          <p className="text-green-800 font-bold">🟢 Live Registration - Updates automatically</p>
         </div>
         {liveSessions.length === 0 ? (
           <p className="text-center py-8 text-gray-500">No active registrations</p>
@@ -204,7 +243,7 @@ function StaffDashboard() {
     // Group sessions by date (based on created_at)
     const groupedSessions: { [key: string]: InfoSessionWithSteps[] } = {}
     completedSessions.forEach((session) => {
-      const dateKey = getMiamiDateKey(session.created_at)
+      const dateKey = session.business_date || getMiamiDateKey(session.created_at)
       if (!groupedSessions[dateKey]) {
         groupedSessions[dateKey] = []
       }
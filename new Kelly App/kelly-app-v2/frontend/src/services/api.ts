@@ -1,5 +1,5 @@
 import axios from 'axios'
-import type { InfoSessionRegistration, InfoSessionWithSteps, Announcement } from '../types'
+import type { InfoSessionRegistration, InfoSessionWithSteps, Announcement, QueuePosition, ArchivedInfoSession, ArchivedInfoSessionWithSteps, ArchivePage, ArchiveSearch, OfflineItem, OfflineBatchResult } from '../types'
 
 const API_BASE_URL = (import.meta as any).env?.VITE_API_URL || 'http://localhost:3026/api'
 
@@ -38,11 +38,32 @@ api.interceptors.response.use(
   }
 )
 
+// Times a registration is sent again after a timeout or network error
+const REGISTER_RETRIES = 2
+
+// Key for one registration; crypto.randomUUID only exists on https/localhost
+export const newIdempotencyKey = (): string =>
+  typeof crypto !== 'undefined' && typeof crypto.randomUUID === 'function'
+    ? crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`
+
+// Retries reuse the Idempotency-Key, so a request that was saved but timed out is not registered twice
 export const registerInfoSession = async (
-  data: InfoSessionRegistration
+  data: InfoSessionRegistration,
+  idempotencyKey: string = newIdempotencyKey()
 ): Promise<InfoSessionWithSteps> => {
-  const response = await api.post('/info-session/register', data)
-  return response.data
+  for (let attempt = 0; ; attempt++) {
+    try {
+      const response = await api.post('/info-session/register', data, {
+        headers: { 'Idempotency-Key': idempotencyKey },
+      })
+      return response.data
+    } catch (error: any) {
+      if (error.response || attempt >= REGISTER_RETRIES) {
+        throw error
+      }
+    }
+  }
 }
 
 export const getInfoSession = async (id: number): Promise<InfoSessionWithSteps> => {
@@ -50,6 +71,19 @@ export const getInfoSession = async (id: number): Promise<InfoSessionWithSteps>
   return response.data
 }
 
+// Place in the recruiter's lobby queue; null once the session is no longer waiting or in progress
+export const getQueuePosition = async (sessionId: number): Promise<QueuePosition | null> => {
+  try {
+    const response = await api.get(`/info-session/${sessionId}/queue`)
+    return response.data
+  } catch (error: any) {
+    if (error.response?.status === 404) {
+      return null
+    }
+    throw error
+  }
+}
+
 export const completeStep = async (sessionId: number, stepName: string): Promise<void> => {
   await api.patch(`/info-session/${sessionId}/steps/${stepName}/complete`)
 }
@@ -84,6 +118,34 @@ export const checkExclusion = async (
   }
 }
 
+export interface ExclusionBatchResult {
+  first_name: string
+  last_name: string
+  is_in_exclusion_list: boolean
+  matches: Array<{ id: number; name: string; code: string | null; ssn: string | null; dob: string | null; notes: string | null }>
+  warning_message: string | null
+}
+
+export const checkExclusionBatch = async (
+  names: Array<{ first_name: string; last_name: string }>
+): Promise<{ results: ExclusionBatchResult[]; total: number; flagged: number; fuzzy: boolean }> => {
+  const response = await api.post('/info-session/exclusion-check/batch', { names })
+  return response.data
+}
+
+export const checkExclusionBatchCsv = async (
+  file: File
+): Promise<{ results: ExclusionBatchResult[]; total: number; flagged: number; fuzzy: boolean }> => {
+  const formData = new FormData()
+  formData.append('file', file)
+  const response = await api.post('/info-session/exclusion-check/batch/csv', formData, {
+    headers: {
+      'Content-Type': 'multipart/form-data',
+    },
+  })
+  return response.data
+}
+
 export const getAnnouncements = async (activeOnly: boolean = true): Promise<Announcement[]> => {
   const response = await api.get('/announcements/', { params: { active_only: activeOnly } })
   return response.data
@@ -297,6 +359,19 @@ export const getLiveInfoSessions = async (): Promise<InfoSessionWithSteps[]> =>
   return response.data
 }
 
+export interface LiveInfoSessionsDelta {
+  cursor: number
+  full: boolean
+  sessions: InfoSessionWithSteps[]
+  removed: number[]
+}
+
+// Only the live sessions changed after `since` (0 = the whole board)
+export const getLiveInfoSessionsDelta = async (since: number): Promise<LiveInfoSessionsDelta> => {
+  const response = await api.get('/info-session/live', { params: { since } })
+  return response.data
+}
+
 export const getCompletedInfoSessions = async (): Promise<InfoSessionWithSteps[]> => {
   const response = await api.get('/info-session/completed')
   return response.data
@@ -322,6 +397,37 @@ export const getMyVisits = async (): Promise<any[]> => {
   return response.data
 }
 
+// Archive (sessions and visits older than the archive horizon, staff only)
+export const searchArchivedInfoSessions = async (search: ArchiveSearch = {}): Promise<ArchivePage<ArchivedInfoSession>> => {
+  const response = await api.get('/archive/info-sessions', { params: search })
+  return response.data
+}
+
+export const getArchivedInfoSession = async (id: number): Promise<ArchivedInfoSessionWithSteps> => {
+  const response = await api.get(`/archive/info-sessions/${id}`)
+  return response.data
+}
+
+export const searchArchivedVisits = async (
+  kind: 'new-hire-orientation' | 'badges' | 'fingerprints' | 'team-visit',
+  search: Omit<ArchiveSearch, 'recruiter_id'> = {}
+): Promise<ArchivePage<any>> => {
+  const response = await api.get(`/archive/visits/${kind}`, { params: search })
+  return response.data
+}
+
+// Offline backlog: everything the kiosk collected while the network was down, in one request.
+// Rejected items come back with their errors; a retry with the same key is not saved twice
+export const syncOfflineBatch = async (
+  items: OfflineItem[],
+  idempotencyKey: string = newIdempotencyKey()
+): Promise<OfflineBatchResult> => {
+  const response = await api.post('/sync/batch', { items }, {
+    headers: { 'Idempotency-Key': idempotencyKey },
+  })
+  return response.data
+}
+
 export const notifyTeamVisit = async (visitId: number): Promise<void> => {
   await api.patch(`/visits/team-visit/${visitId}/notify`)
 }
@@ -337,10 +443,28 @@ export const getCurrentUser = async (): Promise<any> => {
 }
 
 // Exclusion List API
-export const uploadExclusionList = async (file: File): Promise<{
-  message: string
+export interface ExclusionUploadJob {
+  id: string
+  filename: string | null
+  status: 'queued' | 'running' | 'completed' | 'failed'
+  total_rows: number | null
+  rows_processed: number
   added: number
-  errors?: string[] | null
+  errors: string[] | null
+  error: string | null
+  version_id: number | null
+  rematched: number
+  percent: number | null
+  eta_seconds: number | null
+  created_at: string
+  started_at: string | null
+  finished_at: string | null
+}
+
+export const uploadExclusionList = async (file: File, rematchOpenSessions: boolean = false): Promise<{
+  message: string
+  job_id: string
+  status: string
 }> => {
   const formData = new FormData()
   formData.append('file', file)
@@ -349,10 +473,16 @@ export const uploadExclusionList = async (file: File): Promise<{
     headers: {
       'Content-Type': 'multipart/form-data',
     },
+    params: { rematch_open_sessions: rematchOpenSessions },
   })
   return response.data
 }
 
+export const getExclusionUploadJob = async (jobId: string): Promise<ExclusionUploadJob> => {
+  const response = await api.get(`/exclusion-list/jobs/${jobId}`)
+  return response.data
+}
+
 export const getExclusionList = async (): Promise<{
   items: any[]
   total: number
@@ -368,6 +498,14 @@ export const clearExclusionList = async (): Promise<{
   return response.data
 }
 
+export const rollbackExclusionList = async (): Promise<{
+  message: string
+  version_id: number
+}> => {
+  const response = await api.post('/exclusion-list/rollback')
+  return response.data
+}
+
 // Row Template API
 export interface ColumnDefinition {
   id?: number
@@ -440,3 +578,38 @@ export const generateRow = async (templateId: number, data: Record<string, any>)
   return response.data
 }
 
+
+// Live updates (Server-Sent Events)
+export type EventTopic = 'sessions' | 'recruiters' | 'visits'
+
+export interface LiveEvent {
+  type: string
+  data: { topic: EventTopic; [key: string]: any }
+}
+
+const LIVE_EVENT_TYPES = [
+  'session.created',
+  'session.updated',
+  'step.completed',
+  'sessions.rematched',
+  'sessions.archived',
+  'sessions.synced',
+  'recruiter.status',
+  'visit.created',
+  'visit.updated',
+  'visits.archived',
+  'visits.synced',
+  'resync',
+]
+
+// Opens the event stream; EventSource reconnects by itself and the server replays
+// missed events ('resync' means they are gone and the data must be reloaded).
+// Returns a function that closes the stream.
+export const subscribeToEvents = (topics: EventTopic[], onEvent: (event: LiveEvent) => void): (() => void) => {
+  const source = new EventSource(`${API_BASE_URL}/events/stream?topics=${topics.join(',')}`)
+  const handler = (message: MessageEvent) => {
+    onEvent({ type: message.type, data: message.data ? JSON.parse(message.data) : {} })
+  }
+  LIVE_EVENT_TYPES.forEach((type) => source.addEventListener(type, handler as EventListener))
+  return () => source.close()
+}
@@ -46,6 +46,7 @@ export interface InfoSession {
   completed_at?: string | null
   duration_minutes?: number | null
   created_at: string
+  business_date?: string | null  // YYYY-MM-DD office date (Miami time)
 }
 
 export interface InfoSessionWithSteps extends InfoSession {
@@ -60,6 +61,73 @@ export interface Announcement {
   display_order: number
 }
 
+export interface QueuePosition {
+  session_id: number
+  status: string
+  recruiter_id: number | null
+  time_slot: string
+  position: number | null  // 1 = next for the recruiter, 0 = already with the recruiter
+  waiting_ahead: number
+  average_service_minutes: number | null
+  estimated_wait_minutes: number | null
+  estimated_start: string | null
+}
+
+// Sessions and visits moved out of the hot tables (GET /api/archive/...)
+export interface ArchivedInfoSession extends InfoSession {
+  archived_at: string | null
+}
+
+export interface ArchivedInfoSessionWithSteps extends ArchivedInfoSession {
+  steps: InfoSessionStep[]
+}
+
+export interface ArchivePage<T> {
+  items: T[]
+  skip: number
+  limit: number
+  has_more: boolean
+}
+
+export interface ArchiveSearch {
+  name?: string
+  email?: string
+  recruiter_id?: number
+  date_from?: string  // YYYY-MM-DD office date
+  date_to?: string
+  skip?: number
+  limit?: number
+}
+
+// Offline kiosk backlog (POST /api/sync/batch)
+export type OfflineItemKind = 'info-session' | 'new-hire-orientation' | 'badges' | 'fingerprints' | 'team-visit'
+
+export interface OfflineItem {
+  kind: OfflineItemKind
+  created_at: string  // ISO time the kiosk collected it
+  client_id?: string  // Echoed back in the item's result
+  data: { [field: string]: any }  // Same fields as the live endpoint
+}
+
+export interface OfflineItemResult {
+  index: number
+  client_id: string | null
+  kind: string
+  status: 'created' | 'rejected'
+  id: number | null
+  business_date: string | null
+  assigned_recruiter_id: number | null
+  assigned_recruiter_name: string | null
+  is_in_exclusion_list: boolean | null
+  errors: string[] | null
+}
+
+export interface OfflineBatchResult {
+  created: number
+  rejected: number
+  results: OfflineItemResult[]
+}
+
 export interface Recruiter {
   id: number
   name: string